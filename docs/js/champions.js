@@ -41,8 +41,7 @@ document.addEventListener('DOMContentLoaded', () => {
     const headRow = document.getElementById('champions-head-row');
     const body = document.getElementById('champions-body');
 
-    fetch('data/champions.csv', { cache: 'no-store' })
-        .then(r => r.text())
+    fetchData('champions.csv')
         .then(text => renderTable(text, headRow, body))
         .catch(err => {
             console.error('Erreur chargement champions:', err);
@@ -0,0 +1,75 @@
+// Accès aux fichiers de docs/data.
+// L'URL de chaque fichier porte le hash de son contenu (data/manifest.json
+// pour les fichiers à la racine, data/manifests/<dossier>.json pour les
+// autres, écrits par generate_data_manifest.py) : le navigateur peut garder
+// un fichier en cache tant qu'il ne change pas. Chaque fichier n'est
+// téléchargé, et chaque résultat parsé calculé, qu'une fois par page.
+
+const DATA_MANIFEST_URL = 'data/manifest.json';
+
+let dataManifestPromise = null;
+const dataCache = new Map();
+
+function loadDataManifest() {
+    if (!dataManifestPromise) {
+        // Seul fichier revalidé à chaque visite (petit, et 304 s'il n'a pas changé).
+        dataManifestPromise = fetch(DATA_MANIFEST_URL, { cache: 'no-cache' })
+            .then(r => (r.ok ? r.json() : null))
+            .catch(() => null);
+    }
+    return dataManifestPromise;
+}
+
+// Manifeste d'un dossier, versionné par le hash que donne data/manifest.json :
+// téléchargé seulement par les pages qui lisent ce dossier. null s'il manque.
+function loadDirManifest(manifest, dir) {
+    const hash = manifest?.dirs?.[dir];
+    if (!hash) return Promise.resolve(null);
+    return memoizeData(`manifest:${dir}`, async () => {
+        const url = `data/manifests/${dir}.json?v=${hash}`;
+        const resp = await fetch(url);
+        if (!resp.ok) throw new Error(`HTTP ${resp.status} : ${url}`);
+        return resp.json();
+    }).catch(() => null);
+}
+
+async function dataUrl(path) {
+    const manifest = await loadDataManifest();
+    const slash = path.lastIndexOf('/');
+    const files = slash < 0
+        ? manifest?.files
+        : (await loadDirManifest(manifest, path.slice(0, slash)))?.files;
+    const hash = files?.[path.slice(slash + 1)];
+    return hash ? `data/${path}?v=${hash}` : `data/${path}`;
+}
+
+// Hors manifeste, l'URL n'est pas versionnée : on revalide.
+function dataFetchOptions(url) {
+    return url.includes('?v=') ? {} : { cache: 'no-cache' };
+}
+
+function memoizeData(key, load) {
+    if (!dataCache.has(key)) {
+        // Un échec n'est pas mémorisé : le prochain appel réessaie.
+        dataCache.set(key, load().catch((err) => {
+            dataCache.delete(key);
+            throw err;
+        }));
+    }
+    return dataCache.get(key);
+}
+
+// Contenu de data/<path> : 'text', 'json' ou 'arrayBuffer'.
+function fetchData(path, as = 'text') {
+    return memoizeData(`${as}:${path}`, async () => {
+        const url = await dataUrl(path);
+        const resp = await fetch(url, dataFetchOptions(url));
+        if (!resp.ok) throw new Error(`HTTP ${resp.status} : ${url}`);
+        return resp[as]();
+    });
+}
+
+// parse(contenu de data/<path>), calculé une seule fois par `name`.
+function parsedData(path, name, parse, as = 'text') {
+    return memoizeData(`${name}:${path}`, () => fetchData(path, as).then(parse));
+}
@@ -10,8 +10,7 @@ document.addEventListener('DOMContentLoaded', () => {
     // Charger les années disponibles
     async function loadYears() {
         try {
-            const response = await fetch('data/historique.csv');
-            const data = await response.text();
+            const data = await fetchData('historique.csv');
             const rows = data.split('\n');
             if (rows.length > 0) {
                 const header = rows[0].split(',');
@@ -39,10 +38,9 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
     // Charger les données pour une année spécifique
-                                    years = header.slice(3); // Les années commencent à partir de la 4ème colonne
+    async function loadDeuxiemePiloteData(year) {
         try {
-            const response = await fetch(`data/${year}/deuxieme_pilote.csv`);
-            const data = await response.text();
+            const data = await fetchData(`${year}/deuxieme_pilote.csv`);
             const rows = data.split('\n').map(row => row.split(','));
             const header = rows[0];
 
@@ -1,6 +1,11 @@
-function parseCsv(text) {
-    const lines = text.split('\n').filter(l => l.trim() !== '');
-    return lines.map(line => line.split(','));
+// Largeur utile du graphique (viewBox de 1000, marges de 40) : au-delà d'un
+// point par unité, les points supplémentaires ne se voient pas.
+const CHART_MAX_POINTS = 920;
+
+// Points utiles pour la largeur affichée : ~un par pixel, au plus CHART_MAX_POINTS.
+function chartPointBudget(container) {
+    const pixels = Math.ceil((container.clientWidth || 0) * (globalThis.devicePixelRatio || 1));
+    return pixels > 0 ? Math.min(CHART_MAX_POINTS, pixels) : CHART_MAX_POINTS;
 }
 
 function getQueryParam(name) {
@@ -39,7 +44,7 @@ function addGapRects(svg, points, xScale, pad, width, height, gapShadeRaces) {
         const prev = points[i - 1];
         const curr = points[i];
         const gapRaces = curr.raceNo - prev.raceNo;
-        if (gapRaces >= gapShadeRaces) {
+        if (curr.gapBefore && gapRaces >= gapShadeRaces) {
             const left = xScale(prev.raceNo);
             const right = xScale(curr.raceNo);
 
@@ -145,9 +150,7 @@ function addMainLine(svg, points, xScale, yScale) {
         const p = points[i];
         const x = xScale(p.raceNo);
         const y = yScale(p.elo);
-        const isFirst = i === 0;
-        const gapRaces = isFirst ? 1 : (p.raceNo - points[i - 1].raceNo);
-        const cmd = (isFirst || gapRaces > 1) ? 'M' : 'L';
+        const cmd = (i === 0 || p.gapBefore) ? 'M' : 'L';
         mainD += `${cmd} ${x} ${y} `;
     }
 
@@ -162,8 +165,7 @@ function addOffLines(svg, points, xScale, yScale) {
     for (let i = 1; i < points.length; i++) {
         const prev = points[i - 1];
         const curr = points[i];
-        const gap = curr.raceNo - prev.raceNo;
-        if (gap > 1) {
+        if (curr.gapBefore) {
             const xPrev = xScale(prev.raceNo);
             const xCurr = xScale(curr.raceNo);
             const yPrev = yScale(prev.elo);
@@ -225,9 +227,8 @@ function renderEloChart(container, points) {
     // Tooltip removed (no dots) - details are available in the table
 }
 
-async function loadIndexData() {
-    const resp = await fetch('data/elo/index.json', { cache: 'no-store' });
-    return resp.json();
+function loadIndexData() {
+    return fetchData('elo/index.json', 'json');
 }
 
 function findDriverName(indexData, driverId) {
@@ -235,54 +236,20 @@ function findDriverName(indexData, driverId) {
     return driverMeta ? driverMeta.name : driverId;
 }
 
-function getColumnIndex(header, name) {
-    return header.indexOf(name);
-}
-
-function parsePointFromRow(indices, r) {
-    const date = indices.idxDate >= 0 ? (r[indices.idxDate] || '') : '';
-    const round = indices.idxRound >= 0 ? (r[indices.idxRound] || '') : '';
-    const gp = indices.idxGrandPrix >= 0 ? (r[indices.idxGrandPrix] || '') : '';
-
-    const eloAfter = indices.idxEloAfter >= 0 ? Number.parseFloat(r[indices.idxEloAfter]) : Number.NaN;
-    if (!Number.isFinite(eloAfter)) return null;
-
-    const raceNo = indices.idxCareerRaceNumber >= 0 ? Number.parseInt(r[indices.idxCareerRaceNumber], 10) : Number.NaN;
-    if (!Number.isFinite(raceNo)) return null;
-
-    let team = '';
-    if (indices.idxConstructorName >= 0) team = r[indices.idxConstructorName] || '';
-    else if (indices.idxConstructorId >= 0) team = r[indices.idxConstructorId] || '';
-
-    return {
-        elo: eloAfter,
-        team,
-        raceNo,
-        teamKey: team,
-        label: `${date} (R${round} ${gp}) : ${eloAfter.toFixed(2)}`,
-    };
-}
-
-function buildPointsFromDriverCsv(rows) {
-    const header = rows[0] || [];
-    const indices = {
-        idxDate: getColumnIndex(header, 'date'),
-        idxRound: getColumnIndex(header, 'round'),
-        idxGrandPrix: getColumnIndex(header, 'grandPrixId'),
-        idxEloAfter: getColumnIndex(header, 'eloAfter'),
-        idxConstructorName: getColumnIndex(header, 'constructorName'),
-        idxConstructorId: getColumnIndex(header, 'constructorId'),
-        idxCareerRaceNumber: getColumnIndex(header, 'careerRaceNumber'),
-    };
-
+// Points du graphique ; la série peut être sous-échantillonnée, d'où gapBefore
+// (absence juste avant le point) plutôt qu'un écart entre numéros de course.
+function seriesToPoints(series) {
     const points = [];
-    for (let i = 1; i < rows.length; i++) {
-        const r = rows[i];
-        const p = parsePointFromRow(indices, r);
-        if (p) points.push(p);
+    for (let i = 0; i < series.raceNo.length; i++) {
+        const team = series.teams[series.team[i]] || '';
+        points.push({
+            elo: series.elo[i],
+            team,
+            raceNo: series.raceNo[i],
+            teamKey: team,
+            gapBefore: series.gapBefore[i] === 1,
+        });
     }
-
-    points.sort((a, b) => a.raceNo - b.raceNo);
     return points;
 }
 
@@ -335,10 +302,12 @@ async function initDriverPage() {
 
     // Charge uniquement ce qui est nécessaire pour le graph au démarrage.
     // Le tableau des résultats est chargé/affiché à la demande.
-    const resp = await fetch(`data/elo/drivers/${driverId}.csv`, { cache: 'no-store' });
-    const csvText = await resp.text();
-    const points = buildPointsFromDriverCsv(parseCsv(csvText));
-    renderEloChart(chartContainer, points);
+    // Le graph vient de la série précalculée du pilote (elo/series/<id>.json,
+    // déjà sous-échantillonnée), avec repli sur history.bin puis sur son CSV ;
+    // lecture et sous-échantillonnage se font dans le Worker (elo_loader.js).
+    // Le CSV complet n'est téléchargé qu'à l'ouverture du tableau.
+    const series = await loadDriverSeries(driverId, chartPointBudget(chartContainer));
+    renderEloChart(chartContainer, seriesToPoints(series));
 
     let tableLoaded = false;
 
@@ -349,10 +318,7 @@ async function initDriverPage() {
         resultsToggle.disabled = true;
 
         try {
-            const r = await fetch(`data/elo/drivers/${driverId}.csv`, { cache: 'no-store' });
-            const t = await r.text();
-            const rows = parseCsv(t);
-            renderTable(rows, headRow, body);
+            renderTable(await loadCsvRows(`elo/drivers/${driverId}.csv`), headRow, body);
             tableLoaded = true;
             resultsPanel.hidden = false;
             resultsToggle.textContent = 'Masquer les résultats';
@@ -180,8 +180,7 @@ document.addEventListener('DOMContentLoaded', () => {
         body.innerHTML = '';
     }
 
-    function renderTable(csvText) {
-        const rows = parseCsv(csvText);
+    function renderTable(rows) {
         if (!rows.length) {
             clearTable();
             return;
@@ -221,19 +220,25 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
 
+    // Ignore une réponse arrivée après un changement de sélection.
+    let tableRequest = 0;
+
+    function loadTableRows(path) {
+        const request = ++tableRequest;
+        return loadCsvRows(path).then((rows) => {
+            if (request === tableRequest) renderTable(rows);
+        });
+    }
+
     function loadDriver(driverId) {
         clearTable();
-        fetch(`data/elo/drivers/${driverId}.csv`, { cache: 'no-store' })
-            .then(r => r.text())
-            .then(renderTable)
+        loadTableRows(`elo/drivers/${driverId}.csv`)
             .catch(err => console.error('Erreur chargement pilote ELO:', err));
     }
 
     function loadRace(year, raceFile) {
         clearTable();
-        fetch(`data/elo/races/${year}/${raceFile}`, { cache: 'no-store' })
-            .then(r => r.text())
-            .then(renderTable)
+        loadTableRows(`elo/races/${year}/${raceFile}`)
             .catch(err => console.error('Erreur chargement course ELO:', err));
     }
 
@@ -241,12 +246,8 @@ document.addEventListener('DOMContentLoaded', () => {
         clearTable();
         if (!ageChart) return;
         clearElement(ageChart);
-        fetch('data/elo/elo_by_age.csv', { cache: 'no-store' })
-            .then(r => r.text())
-            .then((t) => {
-                const points = parseAgeCurve(t);
-                renderAgeChart(ageChart, points);
-            })
+        parsedData('elo/elo_by_age.csv', 'ageCurve', parseAgeCurve)
+            .then(points => renderAgeChart(ageChart, points))
             .catch(err => {
                 console.error('Erreur chargement ELO par âge:', err);
                 ageChart.textContent = 'Erreur de chargement.';
@@ -274,8 +275,7 @@ document.addEventListener('DOMContentLoaded', () => {
         yearSelector.innerHTML = '';
         raceSelector.innerHTML = '';
 
-        const racesByYear = indexData?.racesByYear || {};
-        const years = Object.keys(racesByYear).sort((a, b) => a.localeCompare(b, 'fr'));
+        const years = (indexData?.years || []).map(y => String(y.year)).sort((a, b) => a.localeCompare(b, 'fr'));
         raceYears = years;
 
         for (const y of years) {
@@ -304,9 +304,17 @@ document.addEventListener('DOMContentLoaded', () => {
         yearNextBtn.disabled = idx < 0 || idx >= raceYears.length - 1;
     }
 
-    function populateRacesForYear(year) {
+    async function populateRacesForYear(year) {
         raceSelector.innerHTML = '';
-        const races = indexData?.racesByYear?.[year] || [];
+        let races = [];
+        try {
+            // Courses de la saison (data/elo/index/<année>.json), chargées à la demande.
+            races = ((await fetchData(`elo/index/${year}.json`, 'json')).races || []).slice();
+        } catch (err) {
+            console.error('Erreur chargement courses ELO:', err);
+        }
+        // Une autre année a été choisie pendant le chargement.
+        if (yearSelector.value !== year) return;
 
         races.sort((a, b) => (a.round || 0) - (b.round || 0));
 
@@ -389,8 +397,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
     setView(viewSelector.value);
 
-    fetch('data/elo/index.json', { cache: 'no-store' })
-        .then(r => r.json())
+    fetchData('elo/index.json', 'json')
         .then(data => {
             indexData = data;
             populateDrivers();
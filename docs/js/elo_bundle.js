@@ -0,0 +1,27 @@
+// Lecture de data/elo/history.bin : tout l'historique ELO en colonnes typées.
+// Format : 'F1ELOBN1', longueur de l'en-tête (uint32 LE), en-tête JSON, puis
+// chaque colonne alignée sur 8 octets (little-endian).
+
+const ELO_BUNDLE_MAGIC = 'F1ELOBN1';
+
+function parseEloBundle(buffer) {
+    const bytes = new Uint8Array(buffer);
+    const magic = String.fromCharCode(...bytes.subarray(0, 8));
+    if (magic !== ELO_BUNDLE_MAGIC) throw new Error('history.bin invalide');
+
+    const headerLen = new DataView(buffer).getUint32(8, true);
+    const header = JSON.parse(new TextDecoder().decode(bytes.subarray(12, 12 + headerLen)));
+    const base = Math.ceil((12 + headerLen) / 8) * 8;
+
+    const rows = {};
+    const races = {};
+    header.columns.forEach((c) => {
+        const Ctor = globalThis[c.type];
+        const arr = new Ctor(buffer, base + c.offset, c.length);
+        if (c.table === 'rows') rows[c.name] = arr;
+        else races[c.name] = arr;
+    });
+
+    const driverById = new Map(header.drivers.map(d => [d.id, d]));
+    return { header, rows, races, driverById };
+}
@@ -0,0 +1,85 @@
+// Chargement des données ELO via js/elo_worker.js : le téléchargement et le
+// parsing se font hors du thread principal, qui reste fluide même quand
+// plusieurs pilotes se chargent. Sans Worker (navigateur, file://, erreur
+// de chargement du script), les mêmes fonctions tournent sur la page.
+
+const ELO_WORKER_URL = 'js/elo_worker.js?v=20261018f';
+
+let eloWorker = null;
+let eloWorkerFailed = false;
+let nextEloRequest = 1;
+const eloRequests = new Map();
+
+function getEloWorker() {
+    if (eloWorkerFailed || typeof Worker === 'undefined') return null;
+    if (eloWorker) return eloWorker;
+
+    try {
+        eloWorker = new Worker(ELO_WORKER_URL);
+    } catch (e) {
+        console.warn('Worker ELO indisponible, chargement sur la page.', e);
+        eloWorkerFailed = true;
+        return null;
+    }
+    eloWorker.onmessage = ({ data }) => {
+        const request = eloRequests.get(data.id);
+        if (!request) return;
+        eloRequests.delete(data.id);
+        if (data.error) request.reject(new Error(data.error));
+        else request.resolve(data.result);
+    };
+    eloWorker.onerror = (e) => {
+        // Script du Worker introuvable ou invalide : on bascule sur la page.
+        console.warn('Worker ELO en erreur, chargement sur la page.', e);
+        eloWorkerFailed = true;
+        eloWorker.terminate();
+        eloWorker = null;
+        const pending = [...eloRequests.values()];
+        eloRequests.clear();
+        pending.forEach(request => request.fallback());
+    };
+    return eloWorker;
+}
+
+// Exécute `task` dans le Worker, ou `fallback()` sur la page.
+function runEloTask(task, message, fallback) {
+    const worker = getEloWorker();
+    if (!worker) return fallback();
+
+    return new Promise((resolve, reject) => {
+        const id = nextEloRequest++;
+        eloRequests.set(id, {
+            resolve,
+            reject,
+            fallback: () => fallback().then(resolve, reject),
+        });
+        worker.postMessage({ id, task, ...message });
+    });
+}
+
+// URL absolue : le Worker résout les URL relatives depuis js/.
+async function absoluteDataUrl(path) {
+    return new URL(await dataUrl(path), document.baseURI).href;
+}
+
+// Série du graphique d'un pilote (voir elo_series.js), réduite à maxPoints.
+function loadDriverSeries(driverId, maxPoints) {
+    return memoizeData(`series${maxPoints}:${driverId}`, async () => {
+        const message = {
+            driverId,
+            maxPoints,
+            seriesUrl: await absoluteDataUrl(`elo/series/${driverId}.json`),
+            bundleUrl: await absoluteDataUrl('elo/history.bin'),
+            csvUrl: await absoluteDataUrl(`elo/drivers/${driverId}.csv`),
+        };
+        return runEloTask('driverSeries', message, () => computeDriverSeries(message));
+    });
+}
+
+// Lignes d'un CSV de data/, parsé une seule fois par page.
+function loadCsvRows(path) {
+    return memoizeData(`rows:${path}`, async () => {
+        const url = await absoluteDataUrl(path);
+        return runEloTask('csvRows', { url }, () => fetchCsvRows(url));
+    });
+}
@@ -0,0 +1,256 @@
+// Série ELO d'un pilote pour le graphique, en tableaux typés :
+//   raceNo (Int32Array), elo (Float64Array), team (Uint16Array, index dans
+//   teams) et gapBefore (Uint8Array : 1 si le pilote a manqué des courses
+//   juste avant ce point).
+// Chargé (après data.js et elo_bundle.js) par les pages, en repli sans
+// Worker, et par js/elo_worker.js.
+
+function parseCsvRows(text) {
+    const lines = text.split('\n').filter(l => l.trim() !== '');
+    return lines.map(line => line.split(','));
+}
+
+async function fetchCsvRows(url) {
+    const resp = await fetch(url, dataFetchOptions(url));
+    if (!resp.ok) throw new Error(`HTTP ${resp.status} : ${url}`);
+    return parseCsvRows(await resp.text());
+}
+
+function buildSeries(entries) {
+    const n = entries.length;
+    const series = {
+        raceNo: new Int32Array(n),
+        elo: new Float64Array(n),
+        team: new Uint16Array(n),
+        gapBefore: new Uint8Array(n),
+        teams: [],
+    };
+    const teamIndex = new Map();
+    entries.forEach((e, i) => {
+        if (!teamIndex.has(e.team)) {
+            teamIndex.set(e.team, series.teams.length);
+            series.teams.push(e.team);
+        }
+        series.raceNo[i] = e.raceNo;
+        series.elo[i] = e.elo;
+        series.team[i] = teamIndex.get(e.team);
+        series.gapBefore[i] = i > 0 && e.raceNo - entries[i - 1].raceNo > 1 ? 1 : 0;
+    });
+    return series;
+}
+
+function seriesFromBundle(bundle, driverId) {
+    const d = bundle.driverById.get(driverId);
+    if (!d) return null;
+
+    const { rows, races, header } = bundle;
+    const s = header.strings;
+    const entries = [];
+    for (let i = d.offset; i < d.offset + d.count; i++) {
+        const c = rows.constructor[i];
+        entries.push({
+            raceNo: races.careerRaceNumber[rows.race[i]],
+            elo: rows.eloAfter[i],
+            team: s.constructorNames[c] || s.constructors[c] || '',
+        });
+    }
+    return buildSeries(entries);
+}
+
+function seriesFromCsvRows(rows) {
+    const header = rows[0] || [];
+    const idxElo = header.indexOf('eloAfter');
+    const idxRace = header.indexOf('careerRaceNumber');
+    const idxTeamName = header.indexOf('constructorName');
+    const idxTeamId = header.indexOf('constructorId');
+
+    const entries = [];
+    for (let i = 1; i < rows.length; i++) {
+        const r = rows[i];
+        const elo = idxElo >= 0 ? Number.parseFloat(r[idxElo]) : Number.NaN;
+        const raceNo = idxRace >= 0 ? Number.parseInt(r[idxRace], 10) : Number.NaN;
+        if (!Number.isFinite(elo) || !Number.isFinite(raceNo)) continue;
+
+        let team = '';
+        if (idxTeamName >= 0) team = r[idxTeamName] || '';
+        else if (idxTeamId >= 0) team = r[idxTeamId] || '';
+        entries.push({ raceNo, elo, team });
+    }
+    entries.sort((a, b) => a.raceNo - b.raceNo);
+    return buildSeries(entries);
+}
+
+// Série précalculée (data/elo/series/<id>.json, écrite par
+// generate_elo_pilotes.py) : le plus petit niveau d'au moins maxPoints points,
+// sinon le plus détaillé.
+function seriesFromSidecar(sidecar, maxPoints) {
+    const levels = sidecar?.levels || [];
+    if (!levels.length) return null;
+    const level = levels.find(l => l.maxPoints >= maxPoints) || levels[levels.length - 1];
+
+    const n = level.race.length;
+    const series = {
+        raceNo: new Int32Array(n),
+        elo: Float64Array.from(level.elo),
+        team: new Uint16Array(n),
+        gapBefore: new Uint8Array(n),
+        teams: sidecar.teams,
+    };
+    let raceNo = 0;
+    level.race.forEach((delta, i) => {
+        raceNo += delta;
+        series.raceNo[i] = raceNo;
+    });
+    level.stints.forEach(([start, team], k) => {
+        const end = k + 1 < level.stints.length ? level.stints[k + 1][0] : n;
+        series.team.fill(team, start, end);
+    });
+    level.gaps.forEach((i) => { series.gapBefore[i] = 1; });
+    return series;
+}
+
+async function fetchSidecar(url) {
+    const resp = await fetch(url, dataFetchOptions(url));
+    if (!resp.ok) throw new Error(`HTTP ${resp.status} : ${url}`);
+    return resp.json();
+}
+
+// Indices choisis par Largest-Triangle-Three-Buckets entre start et end
+// (inclus, toujours gardés) : `threshold` points qui conservent les pics et
+// les creux de la courbe.
+function lttbIndices(x, y, start, end, threshold) {
+    const len = end - start + 1;
+    const out = [];
+    if (threshold >= len) {
+        for (let i = start; i <= end; i++) out.push(i);
+        return out;
+    }
+    if (threshold <= 2) return len > 1 ? [start, end] : [start];
+
+    const every = (len - 2) / (threshold - 2);
+    let a = start;
+    out.push(start);
+    for (let i = 0; i < threshold - 2; i++) {
+        // Moyenne du seau suivant (le dernier point pour le dernier seau).
+        const avgStart = start + Math.floor((i + 1) * every) + 1;
+        const avgEnd = Math.min(start + Math.floor((i + 2) * every) + 1, end + 1);
+        let avgX = 0;
+        let avgY = 0;
+        for (let j = avgStart; j < avgEnd; j++) {
+            avgX += x[j];
+            avgY += y[j];
+        }
+        avgX /= avgEnd - avgStart;
+        avgY /= avgEnd - avgStart;
+
+        // Point du seau courant formant le plus grand triangle avec a et la moyenne.
+        const rangeStart = start + Math.floor(i * every) + 1;
+        const rangeEnd = start + Math.floor((i + 1) * every) + 1;
+        let maxArea = -1;
+        let next = rangeStart;
+        for (let j = rangeStart; j < rangeEnd; j++) {
+            const area = Math.abs((x[a] - avgX) * (y[j] - y[a]) - (x[a] - x[j]) * (avgY - y[a]));
+            if (area > maxArea) {
+                maxArea = area;
+                next = j;
+            }
+        }
+        out.push(next);
+        a = next;
+    }
+    out.push(end);
+    return out;
+}
+
+function pickSeries(series, indices) {
+    const pick = (arr) => {
+        const out = new arr.constructor(indices.length);
+        indices.forEach((src, i) => { out[i] = arr[src]; });
+        return out;
+    };
+    return {
+        raceNo: pick(series.raceNo),
+        elo: pick(series.elo),
+        team: pick(series.team),
+        gapBefore: pick(series.gapBefore),
+        teams: series.teams,
+    };
+}
+
+// Au plus ~maxPoints points. Les extrémités de chaque absence et de chaque
+// passage dans une équipe sont toujours gardées, donc les coupures de la
+// courbe, les zones grisées et les bandes d'équipe restent exactes ; LTTB
+// répartit le reste entre elles.
+function downsampleSeries(series, maxPoints) {
+    const n = series.raceNo.length;
+    if (n <= maxPoints) return series;
+
+    const anchor = new Uint8Array(n);
+    anchor[0] = 1;
+    anchor[n - 1] = 1;
+    for (let i = 1; i < n; i++) {
+        if (series.gapBefore[i] || series.team[i] !== series.team[i - 1]) {
+            anchor[i - 1] = 1;
+            anchor[i] = 1;
+        }
+    }
+    const anchors = [];
+    anchor.forEach((a, i) => { if (a) anchors.push(i); });
+
+    const budget = Math.max(0, maxPoints - anchors.length);
+    const interior = n - anchors.length;
+    const keep = [];
+    for (let k = 0; k + 1 < anchors.length; k++) {
+        const start = anchors[k];
+        const end = anchors[k + 1];
+        const inner = interior ? Math.floor((budget * (end - start - 1)) / interior) : 0;
+        keep.push(...lttbIndices(series.raceNo, series.elo, start, end, inner + 2).slice(0, -1));
+    }
+    keep.push(n - 1);
+    return pickSeries(series, keep);
+}
+
+function seriesTransferables(series) {
+    return [series.raceNo.buffer, series.elo.buffer, series.team.buffer, series.gapBefore.buffer];
+}
+
+// history.bin parsé une fois par URL (donc par version).
+const eloBundles = new Map();
+
+function eloBundleAt(url) {
+    if (!eloBundles.has(url)) {
+        eloBundles.set(url, fetch(url, dataFetchOptions(url))
+            .then((resp) => {
+                if (!resp.ok) throw new Error(`HTTP ${resp.status} : ${url}`);
+                return resp.arrayBuffer();
+            })
+            .then(parseEloBundle)
+            .catch((err) => {
+                eloBundles.delete(url);
+                throw err;
+            }));
+    }
+    return eloBundles.get(url);
+}
+
+// Série du graphique d'un pilote : la série précalculée (quelques centaines
+// d'octets), sinon history.bin, sinon son CSV.
+async function computeDriverSeries({ seriesUrl, bundleUrl, csvUrl, driverId, maxPoints }) {
+    let series = null;
+    try {
+        series = seriesFromSidecar(await fetchSidecar(seriesUrl), maxPoints);
+    } catch (e) {
+        console.warn('Série précalculée indisponible, lecture de history.bin.', e);
+    }
+    if (!series || !series.raceNo.length) {
+        try {
+            series = seriesFromBundle(await eloBundleAt(bundleUrl), driverId);
+        } catch (e) {
+            console.warn('history.bin indisponible, lecture du CSV.', e);
+        }
+    }
+    if (!series || !series.raceNo.length) {
+        series = seriesFromCsvRows(await fetchCsvRows(csvUrl));
+    }
+    return downsampleSeries(series, maxPoints);
+}
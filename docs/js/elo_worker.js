@@ -0,0 +1,28 @@
+// Web Worker des pages ELO : téléchargement, parsing des CSV / de history.bin
+// et sous-échantillonnage des séries, hors du thread principal.
+// Messages : { id, task, ... } -> { id, result } ou { id, error } ; les
+// tableaux typés des séries sont transférés, pas copiés (voir elo_loader.js).
+
+importScripts('data.js?v=20261018e', 'elo_bundle.js?v=20261018c', 'elo_series.js?v=20261018f');
+
+const ELO_WORKER_TASKS = {
+    async driverSeries(message) {
+        const series = await computeDriverSeries(message);
+        return { result: series, transfer: seriesTransferables(series) };
+    },
+    async csvRows({ url }) {
+        return { result: await fetchCsvRows(url), transfer: [] };
+    },
+};
+
+self.onmessage = async ({ data }) => {
+    const { id, task } = data;
+    try {
+        const run = ELO_WORKER_TASKS[task];
+        if (!run) throw new Error(`Tâche inconnue : ${task}`);
+        const { result, transfer } = await run(data);
+        self.postMessage({ id, result }, transfer);
+    } catch (err) {
+        self.postMessage({ id, error: String(err?.message || err) });
+    }
+};
@@ -24,8 +24,8 @@ document.addEventListener('DOMContentLoaded', () => {
 
     // Charger le mapping des pilotes (ELO) + le fichier CSV historique
     Promise.all([
-        fetch('data/elo/index.json').then(r => r.json()).catch(() => null),
-        fetch('data/historique.csv').then(response => response.text())
+        fetchData('elo/index.json', 'json').catch(() => null),
+        fetchData('historique.csv')
     ])
         .then(([indexData, data]) => {
             driverNameToId = buildDriverNameToId(indexData);
@@ -14,16 +14,14 @@ document.addEventListener('DOMContentLoaded', () => {
     const prevBtn = document.getElementById('qualif-prev');
     const nextBtn = document.getElementById('qualif-next');
     let driverNameToId = {};
-    let eloIndexData = null;
     let years = [];
 
     // Charger le mapping pilotes (ELO) + les années disponibles dynamiquement
     Promise.all([
-        fetch('data/elo/index.json', { cache: 'no-store' }).then(r => r.json()).catch(() => null),
-        fetch('data/historique.csv').then(response => response.text())
+        fetchData('elo/index.json', 'json').catch(() => null),
+        fetchData('historique.csv')
     ])
         .then(([indexData, data]) => {
-            eloIndexData = indexData;
             driverNameToId = buildDriverNameToId(indexData);
 
             const rows = data.split('\n');
@@ -91,13 +89,16 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
     function loadQualificationsData(year) {
-        fetch(`data/${year}/qualifications.csv`, { cache: 'no-store' })
-            .then(response => response.text())
-            .then(data => {
+        Promise.all([
+            fetchData(`${year}/qualifications.csv`),
+            // Courses de la saison (ordre des manches), absentes si l'ELO ne couvre pas l'année.
+            fetchData(`elo/index/${year}.json`, 'json').catch(() => null)
+        ])
+            .then(([data, yearIndex]) => {
                 let rows = data.split('\n').map(row => row.split(','));
                 let header = rows[0];
 
-                const reordered = reorderQualificationColumns(header, rows, eloIndexData, year);
+                const reordered = reorderQualificationColumns(header, rows, yearIndex?.races);
                 header = reordered.header;
                 rows = reordered.rows;
                 const tableBody = document.getElementById('qualifications-body');
@@ -158,9 +159,8 @@ function guessGpColumnKey(grandPrixId) {
     return `${prefix}R`;
 }
 
-function reorderQualificationColumns(header, rows, indexData, year) {
+function reorderQualificationColumns(header, rows, races) {
     if (!header?.length || !rows?.length) return { header, rows };
-    const races = indexData?.racesByYear?.[String(year)] || [];
     if (!Array.isArray(races) || races.length === 0) return { header, rows };
 
     const fixed = ['Pilote', 'Rang', 'Points'];
@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+import argparse
+import glob
+import itertools
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional
+
+import yaml
+
+from elo.csv_out import write_driver_csv, write_race_csv
+from elo.elo_math import compute_course_update, numpy_available
+from elo.f1db_io import iter_races, parse_race_rows
+from elo.hash_manifest import HashManifest
+from elo.ranking import RaceIds, rank_race
+from elo.snapshot import read_snapshot, scan_source_tree
+from elo.synthetic import write_synthetic_f1db
+from generate_synthetic_f1db import add_synthetic_arguments, synthetic_config_from_args
+from run_pipeline import STAGES
+
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+@dataclass
+class BenchResult:
+    name: str
+    kind: str  # 'micro' | 'script'
+    seconds: float
+    items: int = 0
+    exit_code: int = 0
+
+    @property
+    def per_item_us(self) -> Optional[float]:
+        return self.seconds / self.items * 1e6 if self.items else None
+
+
+def timed(fn: Callable[[], int], repeat: int) -> tuple:
+    """Best wall time of `repeat` calls; fn returns the number of items handled."""
+    best = float("inf")
+    items = 0
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        items = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, items
+
+
+def make_workspace(work_dir: str, yaml_dir: str) -> None:
+    """Fake repository layout so every generator runs with its default paths."""
+
+    shutil.copytree(
+        SCRIPTS_DIR,
+        os.path.join(work_dir, "src", "scripts"),
+        ignore=shutil.ignore_patterns(".cache", "__pycache__"),
+    )
+    os.makedirs(os.path.join(work_dir, "data", "f1db", "src"), exist_ok=True)
+    os.symlink(yaml_dir, os.path.join(work_dir, "data", "f1db", "src", "data"))
+    os.makedirs(os.path.join(work_dir, "docs", "data"), exist_ok=True)
+
+
+def run_scripts(work_dir: str, stage_names: Optional[List[str]]) -> List[BenchResult]:
+    results = []
+    scripts_dir = os.path.join(work_dir, "src", "scripts")
+    for stage in STAGES:
+        if stage_names and stage.name not in stage_names:
+            continue
+        started = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, os.path.join(scripts_dir, stage.script), *stage.args],
+            cwd=os.path.join(work_dir, stage.cwd),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        elapsed = time.perf_counter() - started
+        if proc.returncode != 0:
+            print(f"{stage.script} a échoué:\n{proc.stderr}", file=sys.stderr)
+        results.append(BenchResult(stage.script, "script", elapsed, exit_code=proc.returncode))
+    return results
+
+
+def run_micro(yaml_dir: str, work_dir: str, repeat: int) -> List[BenchResult]:
+    results: List[BenchResult] = []
+
+    def add(name: str, fn: Callable[[], int]) -> None:
+        seconds, items = timed(fn, repeat)
+        results.append(BenchResult(name, "micro", seconds, items))
+
+    rel_paths, _ = scan_source_tree(yaml_dir)
+    add("scan_source_tree", lambda: len(scan_source_tree(yaml_dir)[0]))
+    # A fresh manifest every time: measures full hashing, never saved.
+    add("hash_files", lambda: len(HashManifest(os.devnull).hash_files(yaml_dir, rel_paths)))
+
+    def load_all_yaml() -> int:
+        for rel in rel_paths:
+            with open(os.path.join(yaml_dir, rel), "r", encoding="utf-8") as f:
+                yaml.safe_load(f)
+        return len(rel_paths)
+
+    add("yaml_load", load_all_yaml)
+
+    # The snapshot compiled by compile_f1db_snapshot.py in the workspace.
+    snapshot_paths = glob.glob(os.path.join(work_dir, "src", "scripts", ".cache", "f1db_snapshot-*.pickle"))
+    snapshot = read_snapshot(snapshot_paths[0]) if snapshot_paths else None
+    if snapshot is None:
+        print("Snapshot introuvable: lance aussi l'étape 'snapshot'.", file=sys.stderr)
+        return results
+    add("read_snapshot", lambda: len(read_snapshot(snapshot_paths[0]).file_hashes))
+
+    races = iter_races(snapshot, [int(y) for y in snapshot.years()])
+    race_rows = [parse_race_rows(snapshot, meta) for meta in races]
+    add("load_race_data", lambda: len([parse_race_rows(snapshot, meta) for meta in races]))
+
+    ids = RaceIds()
+    ranked_races = [rank_race(rows, ids) for rows in race_rows]
+    add("rank_race", lambda: len([rank_race(rows, ids) for rows in race_rows]))
+
+    def elo_pass(engine: str) -> Callable[[], int]:
+        def run() -> int:
+            ratings: Dict[str, float] = {}
+            entries = 0
+            for race in ranked_races:
+                for d in race.driver_ids():
+                    ratings.setdefault(d, 1500.0)
+                compute_course_update(race, ratings, k=24.0, engine=engine)
+                entries += len(race)
+            return entries
+
+        return run
+
+    add("compute_course_update[python]", elo_pass("python"))
+    if numpy_available():
+        add("compute_course_update[numpy]", elo_pass("numpy"))
+
+    ratings: Dict[str, float] = {}
+    elo_by_race = []
+    for race in ranked_races:
+        for d in race.driver_ids():
+            ratings.setdefault(d, 1500.0)
+        elo_by_race.append(compute_course_update(race, ratings, k=24.0)[0])
+
+    out_root = os.path.join(work_dir, "bench_out")
+    names = snapshot.driver_names()
+    runs = itertools.count()
+
+    def fresh_dir() -> str:
+        # A new directory per call: every file is really written.
+        return os.path.join(out_root, f"run-{next(runs)}")
+
+    def write_races(out_dir: str) -> int:
+        for i, (meta, race, elo_rows) in enumerate(zip(races, ranked_races, elo_by_race), 1):
+            write_race_csv(
+                os.path.join(out_dir, "races", str(meta.year), f"{meta.round:02d}-{meta.grand_prix_id}.csv"),
+                meta={"year": meta.year, "round": meta.round, "date": meta.date,
+                      "grandPrixId": meta.grand_prix_id, "officialName": meta.official_name,
+                      "careerRaceNumber": i},
+                race=race,
+                driver_id_to_name=names,
+                elo_rows=elo_rows,
+                k_used=24.0,
+            )
+        return len(races)
+
+    unchanged_dir = os.path.join(out_root, "unchanged")
+    write_races(unchanged_dir)
+    add("write_race_csv", lambda: write_races(fresh_dir()))
+    # Same bytes as on disk: measures the compare-and-skip path.
+    add("write_race_csv[unchanged]", lambda: write_races(unchanged_dir))
+
+    rows_by_driver: Dict[str, List[Dict[str, object]]] = defaultdict(list)
+    for i, (meta, race, elo_rows) in enumerate(zip(races, ranked_races, elo_by_race), 1):
+        for j, d in enumerate(race.driver_ids()):
+            er = elo_rows.get(d)
+            if er is None:
+                continue
+            rows_by_driver[d].append(
+                {"date": meta.date, "careerRaceNumber": i, "constructorId": race.constructor_id(j),
+                 "positionRaw": race.position_raw[j], "eloBefore": round(er.elo_before, 6),
+                 "eloAfter": round(er.elo_after, 6), "eloDelta": round(er.elo_delta, 6)}
+            )
+
+    def write_drivers(out_dir: str) -> int:
+        for driver_id, rows in rows_by_driver.items():
+            write_driver_csv(os.path.join(out_dir, "drivers", f"{driver_id}.csv"), rows)
+        return len(rows_by_driver)
+
+    write_drivers(unchanged_dir)
+    add("write_driver_csv", lambda: write_drivers(fresh_dir()))
+    add("write_driver_csv[unchanged]", lambda: write_drivers(unchanged_dir))
+    return results
+
+
+def print_table(results: List[BenchResult]) -> None:
+    print(f"{'Étape':<40} {'Durée (s)':>10} {'Éléments':>10} {'µs/élément':>12}")
+    for r in results:
+        per_item = f"{r.per_item_us:12.1f}" if r.per_item_us is not None else f"{'':>12}"
+        status = "" if r.exit_code == 0 else f"  (code {r.exit_code})"
+        print(f"{r.name:<40} {r.seconds:10.3f} {r.items or '':>10} {per_item}{status}")
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Mesure chaque étape (chargement YAML, rank_race, compute_course_update, écriture CSV, "
+            "scripts generate_*) sur un f1db synthétique."
+        )
+    )
+    add_synthetic_arguments(parser)
+    parser.add_argument(
+        "--yaml-dir",
+        default=None,
+        help="Utilise cet arbre f1db existant au lieu d'en générer un.",
+    )
+    parser.add_argument(
+        "--work-dir",
+        default=None,
+        help="Dossier de travail (défaut: dossier temporaire supprimé à la fin).",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Répétitions des micro-mesures, meilleure gardée (défaut: 3).")
+    parser.add_argument(
+        "--only",
+        default=None,
+        help="Scripts à mesurer (noms d'étapes du pipeline, séparés par des virgules).",
+    )
+    parser.add_argument("--no-micro", action="store_true", help="Ne mesure que les scripts generate_*.")
+    parser.add_argument("--json", default=None, help="Écrit aussi les résultats dans ce fichier JSON.")
+    args = parser.parse_args(argv)
+
+    config = synthetic_config_from_args(args)
+    work_dir = os.path.abspath(args.work_dir) if args.work_dir else tempfile.mkdtemp(prefix="f1bench-")
+    if os.path.exists(os.path.join(work_dir, "src")):
+        print(f"Le dossier de travail existe déjà: {work_dir}", file=sys.stderr)
+        return 2
+    os.makedirs(work_dir, exist_ok=True)
+
+    try:
+        if args.yaml_dir:
+            yaml_dir = os.path.abspath(args.yaml_dir)
+        else:
+            yaml_dir = os.path.join(work_dir, "f1db")
+            started = time.perf_counter()
+            stats = write_synthetic_f1db(yaml_dir, config)
+            print(
+                f"f1db synthétique: {stats['races']} courses, {stats['drivers']} pilotes, "
+                f"{stats['files']} fichiers ({time.perf_counter() - started:.1f}s)"
+            )
+
+        make_workspace(work_dir, yaml_dir)
+        stage_names = None
+        if args.only:
+            # Dependencies are measured too: a stage needs its inputs.
+            by_name = {s.name: s for s in STAGES}
+            stage_names = []
+            todo = [n.strip() for n in args.only.split(",") if n.strip()]
+            if not args.no_micro:
+                todo.append("snapshot")
+            while todo:
+                name = todo.pop()
+                if name not in by_name:
+                    print(f"Étape inconnue: {name}", file=sys.stderr)
+                    return 2
+                if name not in stage_names:
+                    stage_names.append(name)
+                    todo.extend(by_name[name].deps)
+        results = run_scripts(work_dir, stage_names)
+        if not args.no_micro:
+            results = run_micro(yaml_dir, work_dir, args.repeat) + results
+        print_table(results)
+
+        if args.json:
+            report = {
+                "config": None if args.yaml_dir else asdict(config),
+                "yamlDir": yaml_dir if args.yaml_dir else None,
+                "python": platform.python_version(),
+                "numpy": numpy_available(),
+                "repeat": args.repeat,
+                "results": [dict(asdict(r), perItemUs=r.per_item_us) for r in results],
+            }
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+        return 0 if all(r.exit_code == 0 for r in results) else 1
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from typing import List
+
+from elo.profiling import add_profile_arguments, profiler_from_args
+from elo.snapshot import compile_snapshot, default_snapshot_path, read_snapshot, write_snapshot
+
+
+def resolve_from_script_dir(path: str) -> str:
+    if os.path.isabs(path):
+        return path
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.normpath(os.path.join(script_dir, path))
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Compile l'arborescence f1db YAML en un snapshot binaire partagé "
+            "par tous les scripts generate_*."
+        )
+    )
+    parser.add_argument(
+        "--yaml-dir",
+        default="../../data/f1db/src/data",
+        help="Chemin vers f1db YAML (défaut: ../../data/f1db/src/data).",
+    )
+    parser.add_argument(
+        "--snapshot",
+        default=None,
+        help="Fichier snapshot (défaut: .cache/f1db_snapshot-<arbre>.pickle).",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Ignore le snapshot existant et reparse tous les fichiers YAML.",
+    )
+    add_profile_arguments(parser)
+
+    args = parser.parse_args(argv)
+    profiler = profiler_from_args("compile_f1db_snapshot", args)
+
+    yaml_dir = resolve_from_script_dir(args.yaml_dir)
+    if not os.path.isdir(yaml_dir):
+        print(f"Dossier introuvable: {yaml_dir}", file=sys.stderr)
+        return 2
+    snapshot_path = resolve_from_script_dir(args.snapshot) if args.snapshot else default_snapshot_path(yaml_dir)
+
+    started = time.perf_counter()
+    try:
+        with profiler.stage("read_snapshot"):
+            previous = None if args.force else read_snapshot(snapshot_path)
+        snapshot, parsed = compile_snapshot(yaml_dir, previous=previous)
+        if previous is not None and previous.source_hash == snapshot.source_hash:
+            print(f"Snapshot f1db à jour: {snapshot_path}")
+            return 0
+
+        with profiler.stage("write_snapshot"):
+            write_snapshot(snapshot_path, snapshot)
+            profiler.count("files_written")
+    finally:
+        profiler.finish()
+    elapsed = time.perf_counter() - started
+    print(
+        f"Snapshot f1db généré: {snapshot_path} "
+        f"({len(snapshot.file_hashes)} fichiers, {parsed} reparsés, {elapsed:.2f}s)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
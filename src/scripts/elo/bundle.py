@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+import io
+import json
+import struct
+import sys
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .elo_math import EloResultRow
+from .output import write_if_changed
+from .ranking import StringTable
+
+
+BUNDLE_MAGIC = b"F1ELOBN1"
+BUNDLE_VERSION = 2
+BUNDLE_FILENAME = "history.bin"
+
+# (column name, array typecode, JS typed array). Rows are grouped by driver
+# (drivers sorted by id, rows by careerRaceNumber); `race` indexes the race
+# table (the races of the run, in order), `constructor`/`position` the
+# interned string tables. laps == -1 means "unknown". Ratings are the
+# same 6-decimal values as the CSVs. A race's careerRaceNumber follows the
+# full calendar, so it is not its index + 1 in a --years run.
+ROW_COLUMNS = (
+    ("race", "i", "Int32Array"),
+    ("constructor", "H", "Uint16Array"),
+    ("position", "H", "Uint16Array"),
+    ("laps", "h", "Int16Array"),
+    ("nParticipants", "H", "Uint16Array"),
+    ("eloBefore", "d", "Float64Array"),
+    ("eloAfter", "d", "Float64Array"),
+    ("eloDelta", "d", "Float64Array"),
+    ("actualScore", "d", "Float64Array"),
+    ("expectedScore", "d", "Float64Array"),
+)
+RACE_COLUMNS = (
+    ("year", "H", "Uint16Array"),
+    ("round", "H", "Uint16Array"),
+    ("grandPrix", "H", "Uint16Array"),
+    ("careerRaceNumber", "i", "Int32Array"),
+)
+
+
+class EloHistoryBundle:
+    """Columnar copy of every driver CSV, written as one binary file.
+
+    Layout: 8-byte magic, uint32 LE header length, UTF-8 JSON header, then
+    the column buffers, each 8-byte aligned and little-endian. The header
+    lists the string tables, the race table, each column's byte offset and
+    per-driver row ranges, so the frontend maps columns straight to typed
+    arrays.
+    """
+
+    def __init__(self) -> None:
+        self.driver_ids = StringTable()
+        self.constructors = StringTable()
+        self.positions = StringTable()
+        self._driver = array("H")
+        self.columns: Dict[str, array] = {name: array(code) for name, code, _ in ROW_COLUMNS}
+
+    def __len__(self) -> int:
+        return len(self._driver)
+
+    def add(
+        self,
+        *,
+        driver_id: str,
+        race: int,
+        constructor_id: str,
+        position_raw: str,
+        laps: Optional[int],
+        n_participants: int,
+        elo: EloResultRow,
+    ) -> None:
+        self._append(
+            self.driver_ids.intern(driver_id),
+            race,
+            self.constructors.intern(constructor_id),
+            self.positions.intern(position_raw),
+            -1 if laps is None else laps,
+            n_participants,
+            round(elo.elo_before, 6),
+            round(elo.elo_after, 6),
+            round(elo.elo_delta, 6),
+            round(elo.actual_score, 6),
+            round(elo.expected_score, 6),
+        )
+
+    def _append(self, driver_idx: int, *values) -> None:
+        self._driver.append(driver_idx)
+        for (name, _, _), value in zip(ROW_COLUMNS, values):
+            self.columns[name].append(value)
+
+    def iter_elo_after(self) -> Iterator[Tuple[str, int, float]]:
+        """(driver_id, 0-based race, eloAfter) of every row, in storage order."""
+
+        races = self.columns["race"]
+        elo_after = self.columns["eloAfter"]
+        driver_ids = self.driver_ids.values
+        for row, driver_idx in enumerate(self._driver):
+            yield driver_ids[driver_idx], races[row], elo_after[row]
+
+    def iter_team_elo_after(self) -> Iterator[Tuple[str, int, str, float]]:
+        """(driver_id, 0-based race, constructor_id, eloAfter) of every row, in storage order."""
+
+        constructors = self.constructors.values
+        constructor = self.columns["constructor"]
+        for row, (driver_id, race, elo_after) in enumerate(self.iter_elo_after()):
+            yield driver_id, race, constructors[constructor[row]], elo_after
+
+    def ratings_by_race(self, n_races: int) -> List[List[Tuple[str, float]]]:
+        """(driver_id, eloAfter) of each race's drivers, sorted by driver id."""
+
+        out: List[List[Tuple[str, float]]] = [[] for _ in range(n_races)]
+        for driver_id, race, elo_after in self.iter_elo_after():
+            out[race].append((driver_id, elo_after))
+        for rows in out:
+            rows.sort()
+        return out
+
+    @classmethod
+    def load_prefix(cls, path: str, keep_races: int) -> Optional["EloHistoryBundle"]:
+        """Rows of an existing bundle for the first `keep_races` races only."""
+
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            header, columns = _parse(data)
+        except (OSError, ValueError):
+            return None
+
+        bundle = cls()
+        drivers = header["drivers"]
+        constructors = header["strings"]["constructors"]
+        positions = header["strings"]["positions"]
+        names = [name for name, _, _ in ROW_COLUMNS]
+        for driver in drivers:
+            driver_idx = bundle.driver_ids.intern(driver["id"])
+            for row in range(driver["offset"], driver["offset"] + driver["count"]):
+                if columns["race"][row] >= keep_races:
+                    continue
+                values = [columns[name][row] for name in names]
+                values[1] = bundle.constructors.intern(constructors[values[1]])
+                values[2] = bundle.positions.intern(positions[values[2]])
+                bundle._append(driver_idx, *values)
+        return bundle
+
+    def prefix(self, keep_races: int) -> "EloHistoryBundle":
+        """In-memory load_prefix: a copy holding the first `keep_races` races only."""
+
+        bundle = EloHistoryBundle()
+        names = [name for name, _, _ in ROW_COLUMNS]
+        races = self.columns["race"]
+        for row, driver_idx in enumerate(self._driver):
+            if races[row] >= keep_races:
+                continue
+            values = [self.columns[name][row] for name in names]
+            values[1] = bundle.constructors.intern(self.constructors.values[values[1]])
+            values[2] = bundle.positions.intern(self.positions.values[values[2]])
+            bundle._append(bundle.driver_ids.intern(self.driver_ids.values[driver_idx]), *values)
+        return bundle
+
+    def write(
+        self,
+        path: str,
+        *,
+        races: List[Dict[str, object]],
+        driver_id_to_name: Dict[str, str],
+        constructor_id_to_name: Dict[str, str],
+        k: float,
+        initial_elo: float,
+    ) -> None:
+        """Write the bundle; `races` are the race manifest entries in order."""
+
+        order = sorted(
+            range(len(self._driver)),
+            key=lambda i: (self.driver_ids.values[self._driver[i]], self.columns["race"][i]),
+        )
+
+        drivers_meta = []
+        for i in order:
+            driver_id = self.driver_ids.values[self._driver[i]]
+            if not drivers_meta or drivers_meta[-1]["id"] != driver_id:
+                drivers_meta.append(
+                    {
+                        "id": driver_id,
+                        "name": driver_id_to_name.get(driver_id, driver_id),
+                        "offset": len(drivers_meta) and drivers_meta[-1]["offset"] + drivers_meta[-1]["count"],
+                        "count": 0,
+                    }
+                )
+            drivers_meta[-1]["count"] += 1
+
+        grand_prix = StringTable()
+        race_arrays = {name: array(code) for name, code, _ in RACE_COLUMNS}
+        for race in races:
+            race_arrays["year"].append(int(race["year"]))
+            race_arrays["round"].append(int(race["round"]))
+            race_arrays["grandPrix"].append(grand_prix.intern(str(race["grandPrixId"])))
+            race_arrays["careerRaceNumber"].append(int(race["careerRaceNumber"]))
+
+        # Sorted string tables, so the bytes do not depend on the order the
+        # rows were added in (a resumed run re-interns the kept rows first).
+        constructors = sorted(self.constructors.values)
+        positions = sorted(self.positions.values)
+        remap = {
+            "constructor": [constructors.index(v) for v in self.constructors.values],
+            "position": [positions.index(v) for v in self.positions.values],
+        }
+
+        buffers = []
+        column_meta = []
+        for name, code, js_type in ROW_COLUMNS:
+            src = self.columns[name]
+            values = (src[i] for i in order)
+            if name in remap:
+                values = (remap[name][v] for v in values)
+            buffers.append(("rows", name, js_type, array(code, values)))
+        for name, code, js_type in RACE_COLUMNS:
+            buffers.append(("races", name, js_type, race_arrays[name]))
+
+        offset = 0
+        for table, name, js_type, arr in buffers:
+            offset = _align(offset)
+            column_meta.append(
+                {"table": table, "name": name, "type": js_type, "offset": offset, "length": len(arr)}
+            )
+            offset += len(arr) * arr.itemsize
+
+        header = {
+            "version": BUNDLE_VERSION,
+            "k": k,
+            "initialElo": initial_elo,
+            "nRows": len(order),
+            "nRaces": len(races),
+            "drivers": drivers_meta,
+            "strings": {
+                "constructors": constructors,
+                "constructorNames": [constructor_id_to_name.get(c, c) if c else "" for c in constructors],
+                "positions": positions,
+                "grandPrix": grand_prix.values,
+                "raceDates": [str(r["date"]) for r in races],
+            },
+            "columns": column_meta,
+        }
+        header_bytes = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        prefix_len = _align(len(BUNDLE_MAGIC) + 4 + len(header_bytes))
+
+        out = io.BytesIO()
+        out.write(BUNDLE_MAGIC)
+        out.write(struct.pack("<I", len(header_bytes)))
+        out.write(header_bytes)
+        out.write(b"\0" * (prefix_len - out.tell()))
+        for (_, _, _, arr), meta in zip(buffers, column_meta):
+            out.write(b"\0" * (prefix_len + meta["offset"] - out.tell()))
+            if sys.byteorder == "big":
+                arr = array(arr.typecode, arr)
+                arr.byteswap()
+            out.write(arr.tobytes())
+        write_if_changed(path, out.getvalue())
+
+
+def _align(n: int, to: int = 8) -> int:
+    return (n + to - 1) // to * to
+
+
+def _parse(data: bytes):
+    if data[: len(BUNDLE_MAGIC)] != BUNDLE_MAGIC:
+        raise ValueError("not an ELO history bundle")
+    (header_len,) = struct.unpack_from("<I", data, len(BUNDLE_MAGIC))
+    start = len(BUNDLE_MAGIC) + 4
+    header = json.loads(data[start : start + header_len].decode("utf-8"))
+    if header.get("version") != BUNDLE_VERSION:
+        raise ValueError("unsupported ELO history bundle version")
+    base = _align(start + header_len)
+
+    codes = {name: code for name, code, _ in ROW_COLUMNS + RACE_COLUMNS}
+    columns: Dict[str, array] = {}
+    for meta in header["columns"]:
+        if meta["table"] != "rows":
+            continue
+        arr = array(codes[meta["name"]])
+        begin = base + meta["offset"]
+        arr.frombytes(data[begin : begin + meta["length"] * arr.itemsize])
+        if sys.byteorder == "big":
+            arr.byteswap()
+        columns[meta["name"]] = arr
+    return header, columns
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import csv
+import math
+from collections import defaultdict
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from .output import open_output
+from .snapshot import F1dbSnapshot
+
+
+ELO_BY_AGE_FILENAME = "elo_by_age.csv"
+MIN_AGE = 15
+MAX_AGE = 55
+QUANTILES = (("p10Elo", 0.10), ("medianElo", 0.50), ("p90Elo", 0.90))
+
+
+def parse_iso_date(value) -> Optional[date]:
+    if isinstance(value, date):
+        return value
+
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        y, m, d = value.split("-", 2)
+        return date(int(y), int(m), int(d))
+    except Exception:
+        return None
+
+
+def compute_age_years(dob: date, on: date) -> int:
+    years = on.year - dob.year
+    if (on.month, on.day) < (dob.month, dob.day):
+        years -= 1
+    return years
+
+
+def load_driver_birth_dates(snapshot: F1dbSnapshot) -> Dict[str, date]:
+    out: Dict[str, date] = {}
+    for data in snapshot.drivers.values():
+        driver_id = (data.get("id") or "").strip()
+        dob = parse_iso_date(data.get("dateOfBirth") or "")
+        if driver_id and dob:
+            out[driver_id] = dob
+
+    return out
+
+
+class HistogramSketch:
+    """Streaming quantile sketch over fixed-width bins.
+
+    Memory grows with the spread of the values, not their count, and the
+    counts do not depend on insertion order: a resumed run that feeds the
+    kept rows first gets the same quantiles as a full replay. Quantiles are
+    interpolated inside their bin, so the error is below `bin_width`.
+    """
+
+    def __init__(self, bin_width: float = 1.0):
+        self.bin_width = bin_width
+        self.count = 0
+        self._bins: Dict[int, int] = defaultdict(int)
+
+    def add(self, value: float) -> None:
+        self._bins[math.floor(value / self.bin_width)] += 1
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            raise ValueError("Quantile d'un échantillon vide")
+        target = q * self.count
+        seen = 0
+        for b in sorted(self._bins):
+            n = self._bins[b]
+            if seen + n >= target:
+                return (b + (target - seen) / n) * self.bin_width
+            seen += n
+        return (max(self._bins) + 1) * self.bin_width
+
+
+class AgeBucket:
+    def __init__(self) -> None:
+        self.micros = 0  # sum of eloAfter in 1e-6 units, exact whatever the order
+        self.sketch = HistogramSketch()
+
+    @property
+    def count(self) -> int:
+        return self.sketch.count
+
+    @property
+    def mean(self) -> float:
+        return self.micros / 1e6 / self.count if self.count else 0.0
+
+    def add(self, elo_after: float) -> None:
+        self.micros += round(elo_after * 1e6)
+        self.sketch.add(elo_after)
+
+
+class EloByAge:
+    """eloAfter of every race start, bucketed by the driver's age that day.
+
+    Fed by the ELO loop as ratings are produced (see process_one_race), so
+    elo_by_age.csv needs neither the driver CSVs nor a second pass.
+    """
+
+    def __init__(
+        self,
+        driver_id_to_dob: Dict[str, date],
+        *,
+        min_age: int = MIN_AGE,
+        max_age: int = MAX_AGE,
+    ):
+        self.driver_id_to_dob = driver_id_to_dob
+        self.min_age = min_age
+        self.max_age = max_age
+        self.buckets: Dict[int, AgeBucket] = {}
+        self._race_date: Tuple[object, Optional[date]] = (None, None)
+
+    def add(self, *, driver_id: str, on, elo_after: float) -> None:
+        dob = self.driver_id_to_dob.get(driver_id)
+        if dob is None:
+            return
+        # Every driver of a race shares its date: parse it once.
+        if self._race_date[0] != on:
+            self._race_date = (on, parse_iso_date(on))
+        day = self._race_date[1]
+        if day is None:
+            return
+
+        age = compute_age_years(dob, day)
+        if age < self.min_age or age > self.max_age:
+            return
+        bucket = self.buckets.get(age)
+        if bucket is None:
+            bucket = self.buckets[age] = AgeBucket()
+        bucket.add(elo_after)
+
+    def rows(self) -> List[List[object]]:
+        rows: List[List[object]] = [["age", "meanElo", "nEntries"] + [name for name, _ in QUANTILES]]
+        for age in sorted(self.buckets):
+            bucket = self.buckets[age]
+            rows.append(
+                [age, f"{bucket.mean:.6f}", bucket.count]
+                + [f"{bucket.sketch.quantile(q):.1f}" for _, q in QUANTILES]
+            )
+        return rows
+
+    def write_csv(self, path: str) -> None:
+        with open_output(path) as f:
+            csv.writer(f).writerows(self.rows())
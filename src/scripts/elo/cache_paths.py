@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+import os
+
+from .f1db_io import sha256_of_text
+
+
+def default_cache_dir() -> str:
+    scripts_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(scripts_dir, ".cache")
+
+
+def tree_cache_path(prefix: str, tree_path: str, ext: str = "pickle") -> str:
+    """Cache file dedicated to one source or output tree.
+
+    Keying on the absolute path means a synthetic or alternate f1db checkout
+    never evicts the cache of the real one.
+    """
+
+    tree_key = sha256_of_text(os.path.abspath(tree_path))[:12]
+    return os.path.join(default_cache_dir(), f"{prefix}-{tree_key}.{ext}")
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import csv
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .output import OutputSink, open_output, write_if_changed
+from .snapshot import F1dbSnapshot
+
+
+SEASON_CHAMPIONS_VERSION = 1
+# Written next to the ELO outputs by generate_elo_pilotes.
+SEASON_CHAMPIONS_FILENAME = "season_champions.json"
+
+CHAMPIONS_HEADER = [
+    "année",
+    "champion pilote",
+    "champion constructeur",
+    "champion qualif",
+    "champion constructeur 2eme pilote",
+    "champion ELO",
+    "ELO fin de saison",
+]
+
+
+@dataclass
+class SeasonResults:
+    """One season's results from the upstream generators.
+
+    The tables may be truncated to their header and first ranked row, which
+    is all champions_table reads.
+    """
+
+    year: int
+    qualifications: Optional[List[List[Any]]] = None  # qualifications_table rows
+    deuxieme_pilote: Optional[List[List[Any]]] = None  # deuxieme_pilote_table rows
+    elo_champion: Optional[Tuple[str, float]] = None  # SeasonCheckpoint.champion
+
+
+def write_season_champions(
+    path: str, champions: Dict[int, Tuple[str, float]], sink: Optional[OutputSink] = None
+) -> None:
+    """Best end-of-season ELO rating of every season, as (driverId, rating)."""
+
+    payload = {
+        "version": SEASON_CHAMPIONS_VERSION,
+        "seasons": [
+            {"year": year, "driverId": driver_id, "elo": rating}
+            for year, (driver_id, rating) in sorted(champions.items())
+        ],
+    }
+    data = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if sink is not None:
+        sink.write(path, data)
+    else:
+        write_if_changed(path, data)
+
+
+def load_season_champions(path: str) -> Optional[Dict[int, Tuple[str, float]]]:
+    """write_season_champions' file, or None if it is missing or unreadable."""
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if payload.get("version") != SEASON_CHAMPIONS_VERSION:
+        return None
+    return {int(s["year"]): (s["driverId"], float(s["elo"])) for s in payload.get("seasons", [])}
+
+
+def find_position_one_id(rows, key: str) -> Optional[str]:
+    if not isinstance(rows, list):
+        return None
+    for r in rows:
+        if not isinstance(r, dict):
+            continue
+        if r.get("position") == 1:
+            v = r.get(key)
+            if isinstance(v, str) and v.strip():
+                return v.strip()
+    # fallback: some files might omit position typing or be sorted
+    if rows and isinstance(rows[0], dict):
+        v = rows[0].get(key)
+        if isinstance(v, str) and v.strip():
+            return v.strip()
+    return None
+
+
+def table_leader(table: Optional[List[List[Any]]]) -> str:
+    """First column of the first ranked row ('' for an empty table)."""
+
+    if not table or len(table) < 2:
+        return ""
+    return str(table[1][0]).strip()
+
+
+def champions_table(
+    snapshot: F1dbSnapshot,
+    seasons: Iterable[SeasonResults],
+    *,
+    driver_id_to_name: Dict[str, str],
+    constructor_id_to_name: Dict[str, str],
+) -> List[List[str]]:
+    """Rows of champions.csv, header included.
+
+    Official champions come from the f1db standings in the snapshot; the
+    computed ones from `seasons`, so no generated CSV is read back.
+    """
+
+    rows: List[List[str]] = [list(CHAMPIONS_HEADER)]
+    for season in seasons:
+        champion_driver = ""
+        driver_id = find_position_one_id(snapshot.season_file(season.year, "driver-standings.yml"), "driverId")
+        if driver_id:
+            champion_driver = driver_id_to_name.get(driver_id, driver_id)
+
+        champion_constructor = ""
+        constructor_id = find_position_one_id(
+            snapshot.season_file(season.year, "constructor-standings.yml"), "constructorId"
+        )
+        if constructor_id:
+            champion_constructor = constructor_id_to_name.get(constructor_id, constructor_id)
+
+        elo_name, elo_rating = "", ""
+        if season.elo_champion is not None:
+            elo_id, rating = season.elo_champion
+            elo_name, elo_rating = driver_id_to_name.get(elo_id, elo_id), f"{rating:.1f}"
+
+        rows.append(
+            [
+                str(season.year),
+                champion_driver,
+                champion_constructor,
+                table_leader(season.qualifications),
+                table_leader(season.deuxieme_pilote),
+                elo_name,
+                elo_rating,
+            ]
+        )
+    return rows
+
+
+def write_champions_csv(path: str, rows: List[List[str]]) -> None:
+    with open_output(path) as f:
+        csv.writer(f).writerows(rows)
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .output import OutputSink, write_if_changed
+
+
+CHART_SERIES_VERSION = 1
+CHART_SERIES_DIR = "series"
+
+# Points kept per series: about one per unit of the driver chart's width on
+# a phone and on a desktop (driver.js, viewBox 1000 with 40 of padding).
+CHART_RESOLUTIONS = (400, 920)
+# Ratings are drawn 240 units tall: one decimal is more than enough.
+ELO_DECIMALS = 1
+
+
+@dataclass
+class ChartSeries:
+    """One driver's eloAfter per race, in race order.
+
+    `team[i]` indexes `teams`; `gap_before[i]` is True when the driver
+    missed races just before point i. It is stored rather than derived from
+    `race_numbers`, which stop being consecutive once the series is
+    downsampled.
+    """
+
+    teams: List[str]
+    race_numbers: List[int] = field(default_factory=list)
+    elo: List[float] = field(default_factory=list)
+    team: List[int] = field(default_factory=list)
+    gap_before: List[bool] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.race_numbers)
+
+    def append(self, race_number: int, elo: float, team: int) -> None:
+        gap = bool(self.race_numbers) and race_number - self.race_numbers[-1] > 1
+        self.race_numbers.append(race_number)
+        self.elo.append(elo)
+        self.team.append(team)
+        self.gap_before.append(gap)
+
+    def pick(self, indices: Sequence[int]) -> "ChartSeries":
+        return ChartSeries(
+            teams=self.teams,
+            race_numbers=[self.race_numbers[i] for i in indices],
+            elo=[self.elo[i] for i in indices],
+            team=[self.team[i] for i in indices],
+            gap_before=[self.gap_before[i] for i in indices],
+        )
+
+
+def lttb_indices(xs: Sequence[float], ys: Sequence[float], start: int, end: int, threshold: int) -> List[int]:
+    """Largest-Triangle-Three-Buckets over xs/ys[start..end] (both kept).
+
+    Returns `threshold` increasing indices; in each bucket the point kept is
+    the one forming the largest triangle with the previous kept point and
+    the next bucket's average, which preserves peaks and troughs.
+    """
+
+    length = end - start + 1
+    if threshold >= length:
+        return list(range(start, end + 1))
+    if threshold <= 2:
+        return [start, end] if length > 1 else [start]
+
+    every = (length - 2) / (threshold - 2)
+    out = [start]
+    a = start
+    for i in range(threshold - 2):
+        avg_start = start + int((i + 1) * every) + 1
+        avg_end = min(start + int((i + 2) * every) + 1, end + 1)
+        avg_x = sum(xs[avg_start:avg_end]) / (avg_end - avg_start)
+        avg_y = sum(ys[avg_start:avg_end]) / (avg_end - avg_start)
+
+        range_start = start + int(i * every) + 1
+        range_end = start + int((i + 1) * every) + 1
+        best_area = -1.0
+        best = range_start
+        for j in range(range_start, range_end):
+            area = abs((xs[a] - avg_x) * (ys[j] - ys[a]) - (xs[a] - xs[j]) * (avg_y - ys[a]))
+            if area > best_area:
+                best_area = area
+                best = j
+        out.append(best)
+        a = best
+    out.append(end)
+    return out
+
+
+def downsample(series: ChartSeries, max_points: int) -> ChartSeries:
+    """About `max_points` points of `series` (more only if its anchors need it).
+
+    Both ends of every absence and of every team stint are anchors and always
+    kept, so the chart's line breaks, gap shading and team bands stay exact;
+    LTTB spreads the remaining budget between consecutive anchors in
+    proportion to the points between them. Same algorithm as
+    docs/js/elo_series.js.
+    """
+
+    n = len(series)
+    if n <= max_points:
+        return series
+
+    anchor = [False] * n
+    anchor[0] = anchor[-1] = True
+    for i in range(1, n):
+        if series.gap_before[i] or series.team[i] != series.team[i - 1]:
+            anchor[i - 1] = anchor[i] = True
+    anchors = [i for i, is_anchor in enumerate(anchor) if is_anchor]
+
+    budget = max(0, max_points - len(anchors))
+    interior = n - len(anchors)
+    keep: List[int] = []
+    for start, end in zip(anchors, anchors[1:]):
+        inner = budget * (end - start - 1) // interior if interior else 0
+        keep.extend(lttb_indices(series.race_numbers, series.elo, start, end, inner + 2)[:-1])
+    keep.append(n - 1)
+    return series.pick(keep)
+
+
+def build_chart_series(
+    rows: Iterable[Tuple[str, int, str, float]],
+    *,
+    race_numbers: Sequence[int],
+    constructor_id_to_name: Dict[str, str],
+) -> Dict[str, ChartSeries]:
+    """Full series of every driver from (driver_id, race, constructor_id, eloAfter) rows.
+
+    `race` indexes `race_numbers`, the careerRaceNumber of each race of the
+    run; team names are the ones the history bundle shows.
+    """
+
+    by_driver: Dict[str, List[Tuple[int, str, float]]] = {}
+    for driver_id, race, constructor_id, elo_after in rows:
+        by_driver.setdefault(driver_id, []).append((race_numbers[race], constructor_id, elo_after))
+
+    out: Dict[str, ChartSeries] = {}
+    for driver_id, entries in by_driver.items():
+        entries.sort()
+        series = ChartSeries(teams=[])
+        team_index: Dict[str, int] = {}
+        for race_number, constructor_id, elo_after in entries:
+            name = constructor_id_to_name.get(constructor_id, constructor_id) if constructor_id else ""
+            if name not in team_index:
+                team_index[name] = len(series.teams)
+                series.teams.append(name)
+            series.append(race_number, elo_after, team_index[name])
+        out[driver_id] = series
+    return out
+
+
+def _encode_level(series: ChartSeries, max_points: int) -> Dict[str, object]:
+    stints = [
+        [i, team] for i, team in enumerate(series.team) if i == 0 or team != series.team[i - 1]
+    ]
+    return {
+        "maxPoints": max_points,
+        # First race number, then differences: small integers.
+        "race": [
+            number - (series.race_numbers[i - 1] if i else 0) for i, number in enumerate(series.race_numbers)
+        ],
+        "elo": [round(value, ELO_DECIMALS) for value in series.elo],
+        "stints": stints,
+        "gaps": [i for i, gap in enumerate(series.gap_before) if gap],
+    }
+
+
+def encode_chart_series(series: ChartSeries, resolutions: Sequence[int] = CHART_RESOLUTIONS) -> bytes:
+    """Minified series/<driver_id>.json: one level per resolution, smallest first.
+
+    Levels stop at the first one holding the whole series (or once a level
+    adds no points), so most drivers have a single level.
+    """
+
+    levels = []
+    for max_points in sorted(resolutions):
+        sampled = downsample(series, max_points)
+        if levels and len(sampled) == len(levels[-1]["race"]):
+            break  # Only anchors kept: a larger budget adds nothing.
+        levels.append(_encode_level(sampled, max_points))
+        if len(sampled) == len(series):
+            break
+    payload = {"version": CHART_SERIES_VERSION, "teams": series.teams, "levels": levels}
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def write_chart_series(
+    output_root: str,
+    series_by_driver: Dict[str, ChartSeries],
+    sink: Optional[OutputSink] = None,
+) -> None:
+    """Write series/<driver_id>.json for every driver, removing the others."""
+
+    series_dir = f"{output_root}/{CHART_SERIES_DIR}"
+    os.makedirs(series_dir, exist_ok=True)
+    # Before queueing the writes: the sink's temporary files live there too.
+    wanted = {f"{driver_id}.json" for driver_id in series_by_driver}
+    for name in os.listdir(series_dir):
+        if name not in wanted:
+            os.remove(os.path.join(series_dir, name))
+
+    for driver_id in sorted(series_by_driver):
+        path = f"{series_dir}/{driver_id}.json"
+        data = encode_chart_series(series_by_driver[driver_id])
+        if sink is not None:
+            sink.write(path, data)
+        else:
+            write_if_changed(path, data)
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import os
+import pickle
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .f1db_io import RaceMeta, sha256_of_text
+from .cache_paths import tree_cache_path
+from .snapshot import F1dbSnapshot
+
+
+CHECKPOINT_VERSION = 2
+
+
+@dataclass
+class RaceRecord:
+    key: str  # '<year>/<race_dir_name>'
+    source_hash: str
+    index_entry: Dict[str, object]  # entry written to the year's index/<year>.json
+
+
+@dataclass
+class SeasonCheckpoint:
+    """Rating state once every race of `year` has been processed.
+
+    `race_count` is the number of races of the run up to the season's last
+    one (its careerRaceNumber in a run over every season) and
+    `driver_csv_sizes` the byte size of each drivers/<id>.csv at that point,
+    so a replay can truncate the CSVs back to this season and append.
+    `champion` is the (driver_id, rating) with the highest end-of-season
+    rating among the drivers who raced that season.
+    """
+
+    year: int
+    race_count: int
+    ratings: Dict[str, float]
+    driver_csv_sizes: Dict[str, int] = field(default_factory=dict)
+    champion: Optional[Tuple[str, float]] = None
+
+
+@dataclass
+class EloCheckpoints:
+    params: Dict[str, object]
+    races: List[RaceRecord]
+    seasons: List[SeasonCheckpoint]
+
+    def final_driver_csv_sizes(self) -> Dict[str, int]:
+        return self.seasons[-1].driver_csv_sizes if self.seasons else {}
+
+
+def season_champion(ratings: Dict[str, float], driver_ids) -> Optional[Tuple[str, float]]:
+    """Best rating among `driver_ids`; ties go to the smallest driver id."""
+
+    best = None
+    for driver_id in sorted(driver_ids):
+        if best is None or ratings[driver_id] > best[1]:
+            best = (driver_id, round(ratings[driver_id], 6))
+    return best
+
+
+def default_checkpoint_path(output_root: str) -> str:
+    return tree_cache_path("elo_checkpoints", output_root)
+
+
+def race_key(meta: RaceMeta) -> str:
+    return f"{meta.year}/{meta.race_dir_name}"
+
+
+def race_source_hash(snapshot: F1dbSnapshot, meta: RaceMeta) -> str:
+    parts = [
+        snapshot.race_file_hash(meta.year, meta.race_dir_name, name) or ""
+        for name in ("race.yml", "race-results.yml")
+    ]
+    return sha256_of_text(":".join(parts))
+
+
+def load_checkpoints(path: str) -> Optional[EloCheckpoints]:
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            version = pickle.load(f)
+            if version != CHECKPOINT_VERSION:
+                return None
+            data = pickle.load(f)
+    except Exception:
+        return None
+    return data if isinstance(data, EloCheckpoints) else None
+
+
+def save_checkpoints(path: str, checkpoints: EloCheckpoints) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(CHECKPOINT_VERSION, f, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump(checkpoints, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def first_changed_race(previous: Sequence[RaceRecord], current: Sequence[Tuple[str, str]]) -> int:
+    """Index of the first race whose key or source hash differs.
+
+    Races appended to `current` count as changed; if `previous` has extra
+    trailing races, the change is at len(current).
+    """
+
+    for i, (key, source_hash) in enumerate(current):
+        if i >= len(previous):
+            return i
+        if previous[i].key != key or previous[i].source_hash != source_hash:
+            return i
+    return len(current)
+
+
+def resume_checkpoint_index(checkpoints: EloCheckpoints, first_changed: int) -> int:
+    """Number of leading season checkpoints still valid before `first_changed`."""
+
+    n = 0
+    for cp in checkpoints.seasons:
+        if cp.race_count > first_changed:
+            break
+        n += 1
+    return n
+
+
+def driver_outputs_match(checkpoints: EloCheckpoints, drivers_out_dir: str) -> bool:
+    """True if every driver CSV still has the size recorded by the last run."""
+
+    for driver_id, size in checkpoints.final_driver_csv_sizes().items():
+        path = os.path.join(drivers_out_dir, f"{driver_id}.csv")
+        try:
+            if os.path.getsize(path) != size:
+                return False
+        except OSError:
+            return False
+    return True
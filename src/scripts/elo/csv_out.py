@@ -1,12 +1,15 @@
 from __future__ import annotations
 
 import csv
+import io
 import os
+from collections import OrderedDict
 from dataclasses import asdict
-from typing import Dict, Iterable, List, Optional
+from typing import BinaryIO, Dict, Iterable, List, Optional
 
 from .elo_math import EloResultRow
-from .ranking import RankedEntry
+from .output import OutputSink, open_output, record_skipped, record_written, write_if_changed
+from .ranking import RaceArrays
 
 
 def ensure_dir(path: str) -> None:
@@ -14,16 +17,15 @@ def ensure_dir(path: str) -> None:
 
 
 def write_race_csv(
-    output_file: str,
+    race_file: str,
     *,
     meta: Dict[str, object],
-    ranked_entries: List[RankedEntry],
+    race: RaceArrays,
     driver_id_to_name: Dict[str, str],
     elo_rows: Dict[str, EloResultRow],
     k_used: float,
+    sink: Optional[OutputSink] = None,
 ) -> None:
-    ensure_dir(os.path.dirname(output_file))
-
     fieldnames = [
         "year",
         "round",
@@ -48,23 +50,24 @@ def write_race_csv(
         "nParticipants",
     ]
 
-    n = len(ranked_entries)
+    n = len(race)
+    driver_ids = race.driver_ids()
 
-    with open(output_file, "w", newline="", encoding="utf-8") as f:
+    with open_output(race_file, sink) as f:
         writer = csv.DictWriter(f, fieldnames=fieldnames)
         writer.writeheader()
-        for idx, re in enumerate(ranked_entries, start=1):
-            d = re.entry.driver_id
+        for i, d in enumerate(driver_ids):
+            laps = race.laps[i]
             row = {
                 **meta,
                 "driverId": d,
                 "driverName": driver_id_to_name.get(d, d),
-                "constructorId": re.entry.constructor_id or "",
-                "positionRaw": re.entry.position_raw,
-                "laps": "" if re.entry.laps is None else re.entry.laps,
-                "gridPosition": re.entry.grid_position or "",
-                "rankKeyTier": re.tie_key[0],
-                "rankInRace": idx,
+                "constructorId": race.constructor_id(i),
+                "positionRaw": race.position_raw[i],
+                "laps": laps if laps >= 0 else "",
+                "gridPosition": race.grid_position[i],
+                "rankKeyTier": race.tier[i],
+                "rankInRace": i + 1,
                 "kUsed": k_used,
                 "nParticipants": n,
             }
@@ -83,16 +86,179 @@ def write_race_csv(
 
 
 def write_driver_csv(
-    output_file: str,
+    driver_file: str,
     rows: Iterable[Dict[str, object]],
 ) -> None:
-    ensure_dir(os.path.dirname(output_file))
+    ensure_dir(os.path.dirname(driver_file))
     rows_list = list(rows)
     if not rows_list:
         return
 
     fieldnames = list(rows_list[0].keys())
-    with open(output_file, "w", newline="", encoding="utf-8") as f:
+    with open_output(driver_file) as f:
         writer = csv.DictWriter(f, fieldnames=fieldnames)
         writer.writeheader()
         writer.writerows(rows_list)
+
+
+def truncate_file(path: str, size: int) -> None:
+    with open(path, "r+b") as f:
+        f.truncate(size)
+
+
+class DriverCsvWriter:
+    """Append rows to drivers/<id>.csv as races are processed.
+
+    Rows are rendered to bytes on arrival (same bytes as write_driver_csv)
+    and buffered per driver. Buffers are flushed through an LRU pool of at
+    most `max_open_files` handles whenever the total buffered size exceeds
+    `buffer_bytes`; with buffer_bytes=None everything is written on close()
+    (batch mode). `base_sizes` gives, per driver, the byte prefix of an
+    existing CSV to keep (ELO checkpoints); other files are rewritten.
+
+    A CSV still wholly buffered at close() goes through write_if_changed,
+    queued on `sink` if given. One flushed earlier cannot be renamed into
+    place without holding it in memory, so its bytes are compared with the
+    existing file as they arrive and only written from the first
+    difference on: an unchanged CSV is never modified either way.
+    """
+
+    def __init__(
+        self,
+        drivers_out_dir: str,
+        *,
+        base_sizes: Optional[Dict[str, int]] = None,
+        max_open_files: int = 64,
+        buffer_bytes: Optional[int] = 1 << 20,
+        sink: Optional[OutputSink] = None,
+    ):
+        self.drivers_out_dir = drivers_out_dir
+        self.base_sizes = dict(base_sizes or {})
+        self.max_open_files = max(1, max_open_files)
+        self.buffer_bytes = buffer_bytes
+        # Logical size of each CSV, buffered bytes included.
+        self.sizes: Dict[str, int] = dict(self.base_sizes)
+        self.sink = sink
+
+        self._pending: Dict[str, List[bytes]] = {}
+        self._pending_total = 0
+        self._handles: "OrderedDict[str, BinaryIO]" = OrderedDict()
+        self._started: set = set()
+        # Flushed CSVs: bytes settled on disk, and those still identical so far.
+        self._offsets: Dict[str, int] = {}
+        self._comparing: set = set()
+        self._buf = io.StringIO(newline="")
+        self._writer: Optional[csv.DictWriter] = None
+        self._header = b""
+        ensure_dir(drivers_out_dir)
+
+    def _path(self, driver_id: str) -> str:
+        return os.path.join(self.drivers_out_dir, f"{driver_id}.csv")
+
+    def _render(self, row: Dict[str, object]) -> bytes:
+        if self._writer is None:
+            self._writer = csv.DictWriter(self._buf, fieldnames=list(row.keys()))
+            self._writer.writeheader()
+            self._header = self._take_buffer()
+        self._writer.writerow(row)
+        return self._take_buffer()
+
+    def _take_buffer(self) -> bytes:
+        data = self._buf.getvalue().encode("utf-8")
+        self._buf.seek(0)
+        self._buf.truncate()
+        return data
+
+    def add(self, driver_id: str, row: Dict[str, object]) -> None:
+        data = self._render(row)
+        chunks = self._pending.setdefault(driver_id, [])
+        if driver_id not in self.sizes:
+            chunks.append(self._header)
+            self.sizes[driver_id] = len(self._header)
+            self._pending_total += len(self._header)
+        chunks.append(data)
+        self.sizes[driver_id] += len(data)
+        self._pending_total += len(data)
+        if self.buffer_bytes is not None and self._pending_total > self.buffer_bytes:
+            self.flush()
+
+    @staticmethod
+    def _record(changed: bool) -> None:
+        if changed:
+            record_written()
+        else:
+            record_skipped()
+
+    def _handle(self, driver_id: str) -> BinaryIO:
+        f = self._handles.get(driver_id)
+        if f is not None:
+            self._handles.move_to_end(driver_id)
+            return f
+
+        path = self._path(driver_id)
+        exists = os.path.exists(path)
+        if driver_id not in self._started:
+            self._started.add(driver_id)
+            self._offsets[driver_id] = self.base_sizes.get(driver_id, 0)
+            if exists:
+                self._comparing.add(driver_id)
+        if exists:
+            f = open(path, "r+b")
+            f.seek(self._offsets[driver_id])
+        else:
+            f = open(path, "wb")
+
+        self._handles[driver_id] = f
+        while len(self._handles) > self.max_open_files:
+            _, oldest = self._handles.popitem(last=False)
+            oldest.close()
+        return f
+
+    def _write(self, driver_id: str, data: bytes) -> None:
+        f = self._handle(driver_id)
+        offset = self._offsets[driver_id]
+        self._offsets[driver_id] = offset + len(data)
+        if driver_id in self._comparing:
+            if f.read(len(data)) == data:
+                return
+            self._comparing.discard(driver_id)
+            f.seek(offset)
+            f.truncate()
+        f.write(data)
+
+    def flush(self, *, final: bool = False) -> None:
+        for driver_id, chunks in self._pending.items():
+            if not chunks:
+                continue
+            data = b"".join(chunks)
+            if final and driver_id not in self._started and not self.base_sizes.get(driver_id):
+                # The whole CSV is in memory.
+                self._started.add(driver_id)
+                if self.sink is not None:
+                    self.sink.write(self._path(driver_id), data)
+                else:
+                    write_if_changed(self._path(driver_id), data)
+            else:
+                self._write(driver_id, data)
+        self._pending.clear()
+        self._pending_total = 0
+
+    def close(self) -> None:
+        self.flush(final=True)
+        for f in self._handles.values():
+            f.close()
+        self._handles.clear()
+        for driver_id, offset in self._offsets.items():
+            changed = driver_id not in self._comparing
+            if not changed and os.path.getsize(self._path(driver_id)) > offset:
+                truncate_file(self._path(driver_id), offset)
+                changed = True
+            self._record(changed)
+        # Drivers without new rows keep exactly their checkpointed prefix.
+        for driver_id, size in self.base_sizes.items():
+            if driver_id not in self._started:
+                path = self._path(driver_id)
+                changed = os.path.getsize(path) != size
+                if changed:
+                    truncate_file(path, size)
+                self._record(changed)
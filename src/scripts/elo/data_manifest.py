@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+from .hash_manifest import hash_tree_files
+from .output import OutputSink, write_precompressed
+
+
+DATA_MANIFEST_VERSION = 2
+DATA_MANIFEST_FILENAME = "manifest.json"
+# One manifest per subdirectory, manifests/<dir>.json: a page only downloads
+# those of the directories it reads from (the per-driver ones alone would
+# make up most of a single manifest).
+DIR_MANIFESTS_DIR = "manifests"
+
+# Files fetched by the pages; .hash files, precompressed siblings and the
+# manifests themselves are not.
+DATA_EXTENSIONS = (".csv", ".json", ".bin")
+# Hex digits of the content hash kept in the URLs: enough to tell two
+# versions of one file apart, while keeping the manifest small.
+HASH_LENGTH = 12
+
+
+def list_data_files(data_dir: str) -> List[str]:
+    """Paths of the served data files, relative to `data_dir`, with '/' separators."""
+
+    out = []
+    for dirpath, dirnames, filenames in os.walk(data_dir):
+        rel_dir = os.path.relpath(dirpath, data_dir).replace(os.sep, "/")
+        if rel_dir == ".":
+            dirnames[:] = [name for name in dirnames if name != DIR_MANIFESTS_DIR]
+        dirnames.sort()
+        for name in sorted(filenames):
+            if not name.endswith(DATA_EXTENSIONS) or name == DATA_MANIFEST_FILENAME:
+                continue
+            out.append(name if rel_dir == "." else f"{rel_dir}/{name}")
+    return out
+
+
+def build_data_manifest(data_dir: str) -> Dict[str, object]:
+    """Content hash of every data file, for versioned URLs.
+
+    The pages fetch data/<path>?v=<hash>: the URL changes exactly when the
+    contents do, so browsers may keep a fetched file as long as they like.
+    Hashes go through the tree's stat-keyed hash cache, so only files
+    written since the last manifest are read.
+    """
+
+    hashes = hash_tree_files(data_dir, list_data_files(data_dir), prune=True)
+    return {
+        "version": DATA_MANIFEST_VERSION,
+        "files": {rel: digest[:HASH_LENGTH] for rel, digest in sorted(hashes.items()) if digest},
+    }
+
+
+def encode_manifest(manifest: Dict[str, object]) -> bytes:
+    return json.dumps(manifest, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def split_data_manifest(manifest: Dict[str, object]) -> Tuple[Dict[str, object], Dict[str, bytes]]:
+    """Root manifest and the encoded manifests/<dir>.json of `manifest`.
+
+    The root lists the files at the top of docs/data and, for every
+    subdirectory, the hash of its manifest: a directory's manifest gets a
+    new URL exactly when one of its files changes, so it is cached like
+    the data itself and only the root is revalidated on each visit.
+    """
+
+    by_dir: Dict[str, Dict[str, str]] = {}
+    root_files: Dict[str, str] = {}
+    for rel, digest in manifest["files"].items():
+        rel_dir, _, name = rel.rpartition("/")
+        if rel_dir:
+            by_dir.setdefault(rel_dir, {})[name] = digest
+        else:
+            root_files[name] = digest
+
+    encoded = {rel_dir: encode_manifest({"files": files}) for rel_dir, files in sorted(by_dir.items())}
+    root = {
+        "version": manifest["version"],
+        "files": root_files,
+        "dirs": {
+            rel_dir: hashlib.sha256(data).hexdigest()[:HASH_LENGTH] for rel_dir, data in encoded.items()
+        },
+    }
+    return root, encoded
+
+
+def remove_stale_dir_manifests(data_dir: str, wanted: List[str]) -> None:
+    """Remove the manifests/ files (and siblings) of directories no longer served."""
+
+    manifests_dir = os.path.join(data_dir, DIR_MANIFESTS_DIR)
+    kept = {os.path.normpath(os.path.join(manifests_dir, f"{rel_dir}.json")) for rel_dir in wanted}
+    for dirpath, _, filenames in os.walk(manifests_dir, topdown=False):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            base = path
+            for suffix in (".gz", ".br"):
+                if base.endswith(suffix):
+                    base = base[: -len(suffix)]
+            if os.path.normpath(base) not in kept:
+                os.remove(path)
+        if dirpath != manifests_dir and not os.listdir(dirpath):
+            os.rmdir(dirpath)
+
+
+def write_data_manifest(data_dir: str, sink: Optional[OutputSink] = None) -> int:
+    """Write data_dir/manifest.json and manifests/ (and siblings); returns the number of files listed."""
+
+    manifest = build_data_manifest(data_dir)
+    root, dir_manifests = split_data_manifest(manifest)
+    # Before queueing the writes: the sink's temporary files live there too.
+    remove_stale_dir_manifests(data_dir, list(dir_manifests))
+    for rel_dir, data in dir_manifests.items():
+        path = os.path.join(data_dir, DIR_MANIFESTS_DIR, *f"{rel_dir}.json".split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_precompressed(path, data, sink)
+    write_precompressed(os.path.join(data_dir, DATA_MANIFEST_FILENAME), encode_manifest(root), sink)
+    return len(manifest["files"])
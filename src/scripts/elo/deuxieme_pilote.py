@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Any, Dict, List
+
+from .qualifications import is_numeric_position
+from .snapshot import F1dbSnapshot
+
+
+def deuxieme_pilote_table(
+    snapshot: F1dbSnapshot,
+    year,
+    config: Dict[str, Any],
+    constructor_id_to_name: Dict[str, str],
+) -> List[List[Any]]:
+    """Lignes du deuxieme_pilote.csv d'une année, en-tête comprise."""
+
+    # Dictionnaire pour stocker les points des deuxièmes pilotes par équipe
+    team_points = defaultdict(lambda: {'total': 0, 'events': defaultdict(int)})
+    event_columns = []
+
+    # Parcourir les circuits de l'année
+    for circuit in snapshot.race_dirs(year):
+        circuit_prefix = circuit.split('-', 1)[1][:3].upper()
+        if circuit_prefix not in event_columns:
+            event_columns.append(circuit_prefix)
+
+        # Charger les résultats de course
+        race_file = f"seasons/{year}/races/{circuit}/race-results.yml"
+        if not snapshot.has_race_file(year, circuit, 'race-results.yml'):
+            print(f"Fichier non trouvé : {race_file}")
+            continue
+
+        try:
+            race_data = snapshot.race_file(year, circuit, 'race-results.yml')
+            if not race_data:
+                print(f"Aucune donnée valide dans {race_file}")
+                continue
+
+            # Dictionnaire pour stocker les pilotes par équipe
+            team_drivers = defaultdict(list)
+
+            # Parcourir les résultats de course
+            for result in race_data:
+                driver_id = result['driverId']
+                constructor_id = result['constructorId']
+                position = str(result['position'])
+                points = result.get('points', 0)
+
+                if is_numeric_position(position):
+                    team_drivers[constructor_id].append((driver_id, int(position), points))
+
+            # Classer les équipes en fonction du classement du deuxième pilote
+            teams_with_second_driver = {}
+            teams_with_single_driver = {}
+
+            for constructor_id, drivers in team_drivers.items():
+                if len(drivers) >= 2:
+                    # Trier les pilotes par position
+                    drivers_sorted = sorted(drivers, key=lambda x: x[1])
+                    second_driver_position = drivers_sorted[1][1]  # Position du deuxième pilote
+                    teams_with_second_driver[constructor_id] = (second_driver_position, drivers_sorted[0][1])  # (position du 2ème pilote, position du 1er pilote)
+                elif len(drivers) == 1:
+                    first_driver_position = drivers[0][1]
+                    teams_with_single_driver[constructor_id] = first_driver_position
+
+            # Trier les équipes avec deux pilotes en fonction de la position du deuxième pilote
+            sorted_teams_with_second_driver = sorted(teams_with_second_driver.items(), key=lambda x: x[1][0])
+
+            # Trier les équipes avec un seul pilote en fonction de la position du premier pilote
+            sorted_teams_with_single_driver = sorted(teams_with_single_driver.items(), key=lambda x: x[1])
+
+            # Fusionner les deux listes
+            sorted_teams = sorted_teams_with_second_driver + sorted_teams_with_single_driver
+
+            # Attribuer les points selon le rang
+            for rank, (constructor_id, _) in enumerate(sorted_teams, start=1):
+                points = config['points_per_position'].get(str(rank), 0)
+                team_points[constructor_id]['total'] += points
+                team_points[constructor_id]['events'][circuit_prefix] = points
+
+        except Exception as e:
+            print(f"Erreur lors du traitement de {race_file}: {e}")
+
+    # Trier les équipes par points totaux
+    sorted_teams = sorted(
+        team_points.items(),
+        key=lambda x: x[1]['total'],
+        reverse=True
+    )
+
+    # Colonnes événements dans l'ordre des fichiers
+    table = [['Équipe', 'Rang', 'Points'] + event_columns]
+    for rank, (constructor_id, stats) in enumerate(sorted_teams, 1):
+        constructor_name = constructor_id_to_name.get(constructor_id, constructor_id)
+        row = [constructor_name, rank, stats['total']]
+        for event in event_columns:
+            row.append(stats['events'].get(event, ''))
+        table.append(row)
+    return table
@@ -4,7 +4,18 @@ import math
 from dataclasses import dataclass
 from typing import Dict, List, Tuple
 
-from .ranking import RankedEntry, outcome
+from .ranking import RaceArrays
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional: the pure-Python loop is always available.
+    np = None
+
+
+ENGINES = ("auto", "python", "numpy")
+
+# Below this field size the NumPy call overhead outweighs the O(n^2) loop.
+NUMPY_MIN_PARTICIPANTS = 8
 
 
 @dataclass(frozen=True)
@@ -21,63 +32,130 @@ def expected_score(ra: float, rb: float, scale: float = 400.0) -> float:
     return 1.0 / (1.0 + math.pow(10.0, (rb - ra) / scale))
 
 
+def numpy_available() -> bool:
+    return np is not None
+
+
+def resolve_engine(engine: str, n: int) -> str:
+    if engine not in ENGINES:
+        raise ValueError(f"Moteur ELO inconnu: {engine!r} (attendu: {', '.join(ENGINES)})")
+    if engine == "numpy" and np is None:
+        raise ValueError("Moteur 'numpy' demandé mais NumPy n'est pas installé.")
+    if engine == "python" or np is None:
+        return "python"
+    if engine == "auto" and n < NUMPY_MIN_PARTICIPANTS:
+        return "python"
+    return "numpy"
+
+
+def _pairwise_sums_python(
+    race: RaceArrays,
+    r: List[float],
+    scale: float = 400.0,
+) -> Tuple[List[float], List[float]]:
+    n = len(r)
+    g = race.ordinal
+    actual_sum = [0.0] * n
+    expected_sum = [0.0] * n
+
+    for i in range(n):
+        ri = r[i]
+        gi = g[i]
+        for j in range(i + 1, n):
+            exp_i = expected_score(ri, r[j], scale)
+            exp_j = 1.0 - exp_i
+            expected_sum[i] += exp_i
+            expected_sum[j] += exp_j
+
+            gj = g[j]
+            out_i = 0.5 if gi == gj else (1.0 if gi < gj else 0.0)
+            out_j = 1.0 - out_i
+            actual_sum[i] += out_i
+            actual_sum[j] += out_j
+
+    return actual_sum, expected_sum
+
+
+def _pairwise_sums_numpy(
+    race: RaceArrays,
+    r: List[float],
+    scale: float = 400.0,
+) -> Tuple[List[float], List[float]]:
+    n = len(r)
+    rv = np.asarray(r, dtype=np.float64)
+    g = np.frombuffer(race.ordinal, dtype=np.intc)
+
+    # Same element values as the Python loop: E_ij is computed for i < j
+    # only and mirrored as 1 - E_ij, exactly like exp_j = 1 - exp_i.
+    upper = np.triu(np.ones((n, n), dtype=bool), k=1)
+    e_full = 1.0 / (1.0 + np.power(10.0, (rv[None, :] - rv[:, None]) / scale))
+    expected = np.where(upper, e_full, 0.0)
+    expected += np.where(upper, 1.0 - e_full, 0.0).T
+
+    gi = g[:, None]
+    gj = g[None, :]
+    o_upper = np.where(gi == gj, 0.5, np.where(gi < gj, 1.0, 0.0))
+    actual = np.where(upper, o_upper, 0.0)
+    actual += np.where(upper, 1.0 - o_upper, 0.0).T
+
+    # The loop accumulates each driver's terms in ascending j order; a
+    # sequential cumsum reproduces that order (adding the 0.0 diagonal is
+    # exact), whereas ndarray.sum() would use pairwise summation.
+    actual_sums = np.cumsum(actual, axis=1)[:, -1]
+    expected_sums = np.cumsum(expected, axis=1)[:, -1]
+    return actual_sums.tolist(), expected_sums.tolist()
+
+
 def compute_course_update(
-    ranked_entries: List[RankedEntry],
+    race: RaceArrays,
     ratings: Dict[str, float],
     k: float,
+    engine: str = "auto",
+    scale: float = 400.0,
 ) -> Tuple[Dict[str, EloResultRow], Dict[str, float]]:
     """Compute order-independent ELO update for a multi-participant race.
 
     For each driver i:
-      S_i = avg_j outcome(i,j)
-      E_i = avg_j expected(ri,rj)
+      S_i = avg_j outcome(i,j)      (1, 0.5 or 0 from the tie-group ordinals)
+      E_i = avg_j expected(ri,rj)   with expected = 1 / (1 + 10^((rj - ri) / scale))
       r_i' = r_i + K*(S_i - E_i)
 
+    `engine` selects the pairwise kernel: "python" (reference loop),
+    "numpy" (vectorized matrices) or "auto" (NumPy when installed and the
+    field has at least NUMPY_MIN_PARTICIPANTS drivers). Both kernels perform the same float
+    operations in the same order; the only divergence is NumPy's vectorized
+    pow, which may differ from libm by 1 ulp. Documented tolerance: ratings
+    and scores agree within 1e-9 (observed: ~2e-13), i.e. the 6-decimal CSV
+    values only differ if a value lands exactly on a rounding boundary.
+
     Returns:
       - per-driver result rows
       - updated ratings dict (same object as input mutated)
     """
 
-    n = len(ranked_entries)
+    n = len(race)
     if n < 2:
         return {}, ratings
 
-    driver_ids = [re.entry.driver_id for re in ranked_entries]
-    before = {d: float(ratings.get(d, 1500.0)) for d in driver_ids}
-
-    actual_sum = dict.fromkeys(driver_ids, 0.0)
-    expected_sum = dict.fromkeys(driver_ids, 0.0)
+    driver_ids = race.driver_ids()
+    before = [float(ratings.get(d, 1500.0)) for d in driver_ids]
 
-    for i in range(n):
-        di = driver_ids[i]
-        ri = before[di]
-        ei = ranked_entries[i]
-        for j in range(i + 1, n):
-            dj = driver_ids[j]
-            rj = before[dj]
-            ej = ranked_entries[j]
-
-            exp_i = expected_score(ri, rj)
-            exp_j = 1.0 - exp_i
-            expected_sum[di] += exp_i
-            expected_sum[dj] += exp_j
-
-            out_i = outcome(ei, ej)
-            out_j = 1.0 - out_i
-            actual_sum[di] += out_i
-            actual_sum[dj] += out_j
+    if resolve_engine(engine, n) == "numpy":
+        actual_sum, expected_sum = _pairwise_sums_numpy(race, before, scale)
+    else:
+        actual_sum, expected_sum = _pairwise_sums_python(race, before, scale)
 
     denom = float(n - 1)
     results: Dict[str, EloResultRow] = {}
-    for d in driver_ids:
-        s = actual_sum[d] / denom
-        e = expected_sum[d] / denom
+    for i, d in enumerate(driver_ids):
+        s = actual_sum[i] / denom
+        e = expected_sum[i] / denom
         delta = float(k) * (s - e)
-        after = before[d] + delta
+        after = before[i] + delta
         ratings[d] = after
         results[d] = EloResultRow(
             driver_id=d,
-            elo_before=before[d],
+            elo_before=before[i],
             elo_after=after,
             elo_delta=delta,
             actual_score=s,
@@ -1,14 +1,16 @@
 from __future__ import annotations
 
-import glob
 import hashlib
 import os
 from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional
 
 import yaml
 
-from .ranking import RaceEntry
+from .ranking import RaceArrays, RaceIds, RaceRow, rank_race
+
+if TYPE_CHECKING:
+    from .snapshot import F1dbSnapshot
 
 
 def load_yaml(file_path: str) -> Any:
@@ -29,37 +31,16 @@ def get_file_hash(file_path: str) -> Optional[str]:
         return hashlib.sha256(f.read()).hexdigest()
 
 
-def get_available_years(yaml_dir: str) -> List[str]:
-    seasons_dir = f"{yaml_dir}/seasons"
-    if not os.path.exists(seasons_dir):
-        return []
-    return sorted(
-        [
-            d
-            for d in os.listdir(seasons_dir)
-            if os.path.isdir(os.path.join(seasons_dir, d)) and d.isdigit()
-        ]
-    )
+def get_available_years(snapshot: F1dbSnapshot) -> List[str]:
+    return snapshot.years()
 
 
-def load_driver_names(yaml_dir: str) -> Dict[str, str]:
-    drivers_dir = f"{yaml_dir}/drivers"
-    out: Dict[str, str] = {}
-    for driver_file in glob.glob(f"{drivers_dir}/*.yml"):
-        driver_id = os.path.basename(driver_file).replace(".yml", "")
-        data = load_yaml(driver_file) or {}
-        out[driver_id] = data.get("name", driver_id)
-    return out
+def load_driver_names(snapshot: F1dbSnapshot) -> Dict[str, str]:
+    return snapshot.driver_names()
 
 
-def load_constructor_names(yaml_dir: str) -> Dict[str, str]:
-    constructors_dir = f"{yaml_dir}/constructors"
-    out: Dict[str, str] = {}
-    for constructor_file in glob.glob(f"{constructors_dir}/*.yml"):
-        constructor_id = os.path.basename(constructor_file).replace(".yml", "")
-        data = load_yaml(constructor_file) or {}
-        out[constructor_id] = data.get("name", constructor_id)
-    return out
+def load_constructor_names(snapshot: F1dbSnapshot) -> Dict[str, str]:
+    return snapshot.constructor_names()
 
 
 @dataclass(frozen=True)
@@ -72,16 +53,11 @@ class RaceMeta:
     race_dir_name: str  # e.g. '01-bahrain'
 
 
-def iter_races(yaml_dir: str, years: Iterable[int]) -> List[RaceMeta]:
+def iter_races(snapshot: F1dbSnapshot, years: Iterable[int]) -> List[RaceMeta]:
     races: List[RaceMeta] = []
     for year in years:
-        races_dir = f"{yaml_dir}/seasons/{year}/races"
-        if not os.path.exists(races_dir):
-            continue
-
-        for race_dir_name in os.listdir(races_dir):
-            race_yml = f"{races_dir}/{race_dir_name}/race.yml"
-            meta = load_yaml(race_yml) or {}
+        for race_dir_name in snapshot.race_dirs(year):
+            meta = snapshot.race_file(year, race_dir_name, "race.yml") or {}
 
             round_num = meta.get("round")
             try:
@@ -112,13 +88,7 @@ def iter_races(yaml_dir: str, years: Iterable[int]) -> List[RaceMeta]:
     return races
 
 
-@dataclass(frozen=True)
-class RaceData:
-    meta: RaceMeta
-    entries: List[RaceEntry]
-
-
-def _parse_race_result_row(row: Any) -> Optional[RaceEntry]:
+def _parse_race_result_row(row: Any) -> Optional[RaceRow]:
     if not isinstance(row, dict):
         return None
     driver_id = row.get("driverId")
@@ -135,41 +105,40 @@ def _parse_race_result_row(row: Any) -> Optional[RaceEntry]:
         laps_int = None
 
     grid_pos = row.get("gridPosition")
-    return RaceEntry(
-        driver_id=str(driver_id),
-        constructor_id=str(constructor_id) if constructor_id is not None else None,
-        position_raw=str(position_raw) if position_raw is not None else "",
-        laps=laps_int,
-        grid_position=str(grid_pos) if grid_pos is not None else None,
+    return (
+        str(driver_id),
+        str(constructor_id) if constructor_id is not None else None,
+        str(position_raw) if position_raw is not None else "",
+        laps_int,
+        str(grid_pos) if grid_pos is not None else None,
     )
 
 
-def load_race_data(yaml_dir: str, meta: RaceMeta) -> RaceData:
-    races_dir = f"{yaml_dir}/seasons/{meta.year}/races"
-    race_results_yml = f"{races_dir}/{meta.race_dir_name}/race-results.yml"
-    raw = load_yaml(race_results_yml) or []
+def parse_race_rows(snapshot: F1dbSnapshot, meta: RaceMeta) -> List[RaceRow]:
+    raw = snapshot.race_file(meta.year, meta.race_dir_name, "race-results.yml") or []
 
-    entries: List[RaceEntry] = []
+    rows: List[RaceRow] = []
     for row in raw:
-        entry = _parse_race_result_row(row)
-        if entry is not None:
-            entries.append(entry)
+        parsed = _parse_race_result_row(row)
+        if parsed is not None:
+            rows.append(parsed)
+    return rows
+
 
-    return RaceData(meta=meta, entries=entries)
+def load_race_data(snapshot: F1dbSnapshot, meta: RaceMeta, ids: Optional[RaceIds] = None) -> RaceArrays:
+    """The race's results, ranked (see ranking.rank_race)."""
+    return rank_race(parse_race_rows(snapshot, meta), ids)
 
 
-def compute_source_hash(yaml_dir: str, races: List[RaceMeta]) -> str:
+def compute_source_hash(snapshot: F1dbSnapshot, races: List[RaceMeta]) -> str:
     h = hashlib.sha256()
     for meta in races:
-        races_dir = f"{yaml_dir}/seasons/{meta.year}/races"
         for name in ("race.yml", "race-results.yml"):
-            fp = f"{races_dir}/{meta.race_dir_name}/{name}"
-            file_hash = get_file_hash(fp) or ""
+            file_hash = snapshot.race_file_hash(meta.year, meta.race_dir_name, name) or ""
             h.update(file_hash.encode("ascii"))
     # Include drivers mapping too
-    drivers_dir = f"{yaml_dir}/drivers"
-    for driver_file in sorted(glob.glob(f"{drivers_dir}/*.yml")):
-        file_hash = get_file_hash(driver_file) or ""
-        h.update(file_hash.encode("ascii"))
+    for rel_path in sorted(snapshot.file_hashes):
+        if rel_path.startswith("drivers/"):
+            h.update(snapshot.file_hashes[rel_path].encode("ascii"))
 
     return h.hexdigest()
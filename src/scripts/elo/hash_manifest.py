@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .cache_paths import tree_cache_path
+
+
+MANIFEST_VERSION = 1
+
+# Hashing is I/O bound and hashlib releases the GIL on large buffers, so
+# threads scale well here without the cost of a process pool.
+DEFAULT_HASH_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+
+def default_manifest_path(root: str) -> str:
+    return tree_cache_path("hash_manifest", root)
+
+
+def sha256_of_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class HashManifest:
+    """Persistent (path -> size, mtime_ns, sha256) cache for one tree.
+
+    A file is re-hashed only when its size or mtime_ns differs from the
+    recorded entry, so an unchanged tree costs one stat() per file.
+    """
+
+    def __init__(self, path: str, entries: Optional[Dict[str, Tuple[int, int, str]]] = None):
+        self.path = path
+        self.entries: Dict[str, Tuple[int, int, str]] = entries or {}
+        self.dirty = False
+        self.rehashed = 0
+
+    @classmethod
+    def load(cls, path: str) -> "HashManifest":
+        try:
+            with open(path, "rb") as f:
+                version, entries = pickle.load(f)
+        except Exception:
+            return cls(path)
+        if version != MANIFEST_VERSION or not isinstance(entries, dict):
+            return cls(path)
+        return cls(path, entries)
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump((MANIFEST_VERSION, self.entries), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def hash_files(
+        self,
+        root: str,
+        rel_paths: Iterable[str],
+        *,
+        prune: bool = False,
+        max_workers: int = DEFAULT_HASH_WORKERS,
+    ) -> Dict[str, str]:
+        """sha256 of each file under `root`; missing files map to "".
+
+        With prune=True, entries for paths not in `rel_paths` are dropped
+        (use it when `rel_paths` is the full listing of the tree).
+        """
+
+        rel_list = list(rel_paths)
+        out: Dict[str, str] = {}
+        stale: List[Tuple[str, int, int]] = []
+        for rel in rel_list:
+            try:
+                st = os.stat(os.path.join(root, rel))
+            except OSError:
+                out[rel] = ""
+                continue
+            entry = self.entries.get(rel)
+            if entry is not None and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+                out[rel] = entry[2]
+            else:
+                stale.append((rel, st.st_size, st.st_mtime_ns))
+
+        if stale:
+            workers = max(1, min(max_workers, len(stale)))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                digests = pool.map(lambda item: sha256_of_file(os.path.join(root, item[0])), stale)
+                for (rel, size, mtime_ns), digest in zip(stale, digests):
+                    out[rel] = digest
+                    self.entries[rel] = (size, mtime_ns, digest)
+            self.rehashed += len(stale)
+            self.dirty = True
+
+        if prune:
+            wanted = set(rel_list)
+            for rel in [r for r in self.entries if r not in wanted]:
+                del self.entries[rel]
+                self.dirty = True
+
+        return out
+
+
+def hash_tree_files(root: str, rel_paths: Iterable[str], *, prune: bool = False) -> Dict[str, str]:
+    """Hash files through the tree's shared manifest and persist it."""
+
+    manifest = HashManifest.load(default_manifest_path(root))
+    hashes = manifest.hash_files(root, rel_paths, prune=prune)
+    manifest.save()
+    return hashes
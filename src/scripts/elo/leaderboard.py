@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import bisect
+import datetime
+import json
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .output import open_output
+
+
+LEADERBOARD_VERSION = 2
+LEADERBOARD_FILENAME = "leaderboards.json"
+
+# A driver stays in the leaderboard until this many days after their last race.
+ACTIVE_DAYS = 365
+# Full ranked field stored every KEYFRAME_EVERY races, deltas in between.
+KEYFRAME_EVERY = 32
+
+
+class SortedRatings:
+    """Ratings kept sorted best first; updates cost O(log n) comparisons."""
+
+    def __init__(self, ranked: Iterable[Tuple[str, float]] = ()):
+        self._rating: Dict[str, float] = {}
+        self._keys: List[Tuple[float, str]] = []
+        for driver_id, rating in ranked:
+            self.set(driver_id, rating)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, driver_id: str) -> bool:
+        return driver_id in self._rating
+
+    def set(self, driver_id: str, rating: float) -> None:
+        if driver_id in self._rating:
+            self.remove(driver_id)
+        self._rating[driver_id] = rating
+        bisect.insort(self._keys, (-rating, driver_id))
+
+    def remove(self, driver_id: str) -> None:
+        rating = self._rating.pop(driver_id)
+        del self._keys[bisect.bisect_left(self._keys, (-rating, driver_id))]
+
+    def ranked(self) -> List[Tuple[str, float]]:
+        return [(driver_id, -neg) for neg, driver_id in self._keys]
+
+    def top(self, n: int) -> List[Tuple[str, float]]:
+        return [(driver_id, -neg) for neg, driver_id in self._keys[:n]]
+
+
+def build_leaderboards(
+    ratings_by_race: Sequence[List[Tuple[str, float]]],
+    races: Sequence[Dict[str, object]],
+    *,
+    driver_id_to_name: Dict[str, str],
+    race_numbers: Optional[Sequence[int]] = None,
+    seeds: Optional[Dict[int, Sequence[Tuple[str, float, datetime.date]]]] = None,
+    active_days: int = ACTIVE_DAYS,
+    keyframe_every: int = KEYFRAME_EVERY,
+) -> Dict[str, object]:
+    """Leaderboard after every race, as keyframes plus per-race deltas.
+
+    `ratings_by_race[i]` holds (driver_id, eloAfter) for the drivers of
+    race i, `races[i]` its race manifest entry and `race_numbers[i]` its
+    careerRaceNumber (i + 1 by default). `seeds[i]` lists the drivers
+    already active before race i when the run does not start from the
+    first race (a --years run): (driver_id, rating, date of their last
+    race). Delta i sets the seeded then the new ratings of race i and drops
+    the drivers who went inactive; keyframe j is the full ranked field
+    after race j * keyframe_every. Drivers are indices into "drivers",
+    deltas are flat [driver, rating, driver, rating, ...].
+    """
+
+    if race_numbers is None:
+        race_numbers = range(1, len(races) + 1)
+    seeds = seeds or {}
+    driver_ids = sorted(
+        {driver_id for rows in ratings_by_race for driver_id, _ in rows}
+        | {driver_id for entries in seeds.values() for driver_id, _, _ in entries}
+    )
+    driver_index = {driver_id: i for i, driver_id in enumerate(driver_ids)}
+
+    field = SortedRatings()
+    last_race_date: Dict[str, datetime.date] = {}
+    deltas: List[Dict[str, List]] = []
+    keyframes: List[List] = []
+    for i, (rows, race) in enumerate(zip(ratings_by_race, races)):
+        date = datetime.date.fromisoformat(str(race["date"]))
+        updates: List = []
+        for driver_id, rating, last_date in seeds.get(i, ()):
+            field.set(driver_id, rating)
+            last_race_date[driver_id] = last_date
+            updates.extend((driver_index[driver_id], rating))
+        for driver_id, rating in rows:
+            field.set(driver_id, rating)
+            last_race_date[driver_id] = date
+            updates.extend((driver_index[driver_id], rating))
+
+        cutoff = date - datetime.timedelta(days=active_days)
+        dropped = sorted(d for d in last_race_date if last_race_date[d] < cutoff)
+        for driver_id in dropped:
+            field.remove(driver_id)
+            del last_race_date[driver_id]
+
+        deltas.append({"set": updates, "drop": [driver_index[d] for d in dropped]})
+        if i % keyframe_every == 0:
+            keyframes.append(
+                [value for driver_id, rating in field.ranked() for value in (driver_index[driver_id], rating)]
+            )
+
+    return {
+        "version": LEADERBOARD_VERSION,
+        "activeDays": active_days,
+        "keyframeEvery": keyframe_every,
+        "drivers": driver_ids,
+        "names": [driver_id_to_name.get(d, d) for d in driver_ids],
+        "dates": [str(race["date"]) for race in races],
+        "raceNumbers": list(race_numbers),
+        "keyframes": keyframes,
+        "deltas": deltas,
+    }
+
+
+def write_leaderboards(path: str, payload: Dict[str, object]) -> None:
+    with open_output(path) as f:
+        json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+
+
+def _pairs(flat: List) -> Iterable[Tuple[int, float]]:
+    return zip(flat[0::2], flat[1::2])
+
+
+@dataclass
+class Leaderboard:
+    career_race_number: int
+    date: str
+    ranking: List[Tuple[str, float]]  # active drivers, best first
+
+    def top(self, n: int) -> List[Tuple[str, float]]:
+        return self.ranking[:n]
+
+
+class EloLeaderboards:
+    """Reader for leaderboards.json (see build_leaderboards)."""
+
+    def __init__(self, payload: Dict[str, object]):
+        if payload.get("version") != LEADERBOARD_VERSION:
+            raise ValueError(f"Version de classements non supportée: {payload.get('version')!r}")
+        self.drivers: List[str] = payload["drivers"]
+        self.names: Dict[str, str] = dict(zip(self.drivers, payload["names"]))
+        self.dates: List[str] = payload["dates"]
+        self.race_numbers: List[int] = payload["raceNumbers"]
+        self.keyframe_every: int = payload["keyframeEvery"]
+        self._keyframes: List[List] = payload["keyframes"]
+        self._deltas: List[Dict[str, List]] = payload["deltas"]
+
+    @classmethod
+    def load(cls, path: str) -> "EloLeaderboards":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def race_index(self, when: Union[int, str, datetime.date]) -> int:
+        """0-based race of a careerRaceNumber (int) or the last race on or before a date."""
+
+        if isinstance(when, int):
+            index = bisect.bisect_left(self.race_numbers, when)
+            if index < len(self.race_numbers) and self.race_numbers[index] != when:
+                index = -1
+        else:
+            day = when.isoformat() if isinstance(when, datetime.date) else str(when)
+            index = bisect.bisect_right(self.dates, day) - 1
+        if not 0 <= index < len(self.dates):
+            raise ValueError(
+                f"Aucune course pour {when!r} (courses n°{self.race_numbers[0]} à "
+                f"{self.race_numbers[-1]}, {len(self.dates)} au total)"
+                if self.dates
+                else f"Aucune course pour {when!r}"
+            )
+        return index
+
+    def ratings_at(self, when: Union[int, str, datetime.date]) -> Leaderboard:
+        """Leaderboard right after a race (careerRaceNumber) or as of a date.
+
+        Binary search on the race dates, then at most keyframe_every - 1
+        deltas applied to the nearest keyframe: O(log races) lookups plus a
+        bounded replay, without reading any driver CSV.
+        """
+
+        index = self.race_index(when)
+        start = index - index % self.keyframe_every
+        drivers = self.drivers
+        field = SortedRatings((drivers[d], r) for d, r in _pairs(self._keyframes[start // self.keyframe_every]))
+        for delta in self._deltas[start + 1 : index + 1]:
+            for d, rating in _pairs(delta["set"]):
+                field.set(drivers[d], rating)
+            for d in delta["drop"]:
+                field.remove(drivers[d])
+        return Leaderboard(
+            career_race_number=self.race_numbers[index], date=self.dates[index], ranking=field.ranked()
+        )
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import contextlib
+import gzip
+import io
+import os
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Deque, Dict, Iterator, Optional, Set, Tuple
+
+from .profiling import get_profiler
+
+try:
+    import brotli
+except ImportError:  # brotli is optional: without it only the .gz siblings are written.
+    brotli = None
+
+
+@dataclass
+class OutputStats:
+    written: int = 0
+    skipped: int = 0  # already up to date, left untouched
+
+    def summary(self) -> str:
+        return f"{self.written} fichier(s) écrit(s), {self.skipped} inchangé(s)"
+
+
+_stats = OutputStats()
+
+
+def record_written() -> None:
+    _stats.written += 1
+    get_profiler().count("files_written")
+
+
+def record_skipped() -> None:
+    _stats.skipped += 1
+    get_profiler().count("files_skipped")
+
+
+def take_output_stats() -> OutputStats:
+    """Counts since the last call (pipeline workers run several scripts)."""
+
+    global _stats
+    stats, _stats = _stats, OutputStats()
+    return stats
+
+
+def has_content(path: str, data: bytes) -> bool:
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        with open(path, "rb") as f:
+            return f.read() == data
+    except OSError:
+        return False
+
+
+def _replace_if_changed(path: str, data: bytes) -> bool:
+    if has_content(path, data):
+        return False
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return True
+
+
+def write_if_changed(path: str, data: bytes) -> bool:
+    """Replace `path` with `data` atomically, unless it already holds `data`.
+
+    Unchanged files keep their mtime, so neither git nor the static host
+    sees them as modified. Returns True if the file was written.
+    """
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if _replace_if_changed(path, data):
+        record_written()
+        return True
+    record_skipped()
+    return False
+
+
+class OutputSink:
+    """write_if_changed on a bounded thread pool, for many small files.
+
+    write() returns as soon as the file is queued; it only blocks once
+    more than `max_pending_bytes` of queued contents are not yet on disk,
+    which bounds memory. Each directory is created once. Completions are
+    recorded (stats, profiler counters) on the calling thread, and the
+    first failed write is re-raised there. With workers=0 every write is
+    synchronous.
+    """
+
+    def __init__(self, *, workers: int = 8, max_pending_bytes: int = 8 << 20):
+        self.max_pending_bytes = max_pending_bytes
+        self._pool: Optional[ThreadPoolExecutor] = (
+            ThreadPoolExecutor(max_workers=workers, thread_name_prefix="output") if workers > 0 else None
+        )
+        self._pending: Deque[Tuple[Future, int]] = deque()
+        self._pending_bytes = 0
+        self._dirs: Set[str] = set()
+
+    def __enter__(self) -> "OutputSink":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        elif self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def write(self, path: str, data: bytes) -> None:
+        directory = os.path.dirname(os.path.abspath(path))
+        if directory not in self._dirs:
+            os.makedirs(directory, exist_ok=True)
+            self._dirs.add(directory)
+
+        if self._pool is None:
+            self._record(_replace_if_changed(path, data))
+            return
+        self._pending.append((self._pool.submit(_replace_if_changed, path, data), len(data)))
+        self._pending_bytes += len(data)
+        while self._pending and (self._pending[0][0].done() or self._pending_bytes > self.max_pending_bytes):
+            self._complete_oldest()
+
+    def _complete_oldest(self) -> None:
+        future, size = self._pending.popleft()
+        self._pending_bytes -= size
+        self._record(future.result())
+
+    @staticmethod
+    def _record(changed: bool) -> None:
+        if changed:
+            record_written()
+        else:
+            record_skipped()
+
+    def close(self) -> None:
+        """Wait for every queued write."""
+
+        while self._pending:
+            self._complete_oldest()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+
+@contextlib.contextmanager
+def open_output(path: str, sink: Optional[OutputSink] = None) -> Iterator[io.StringIO]:
+    """Text file rendered in memory, then passed to write_if_changed.
+
+    Drop-in for open(path, "w", newline="", encoding="utf-8"); nothing is
+    written if the block raises. With a `sink` the write is queued there.
+    """
+
+    buf = io.StringIO(newline="")
+    yield buf
+    data = buf.getvalue().encode("utf-8")
+    if sink is not None:
+        sink.write(path, data)
+    else:
+        write_if_changed(path, data)
+
+
+def compressed_siblings(data: bytes) -> Dict[str, Optional[bytes]]:
+    """Precompressed copies of `data`, by file suffix (None: not available).
+
+    gzip gets mtime=0, so the bytes only depend on `data` and unchanged
+    files stay untouched.
+    """
+
+    return {
+        ".gz": gzip.compress(data, compresslevel=9, mtime=0),
+        ".br": brotli.compress(data, quality=11) if brotli is not None else None,
+    }
+
+
+def write_precompressed(path: str, data: bytes, sink: Optional[OutputSink] = None) -> None:
+    """Write `path` plus its .gz/.br siblings, for hosts that serve them as is.
+
+    A sibling that cannot be produced here is removed rather than left
+    stale next to newer contents.
+    """
+
+    files = {"": data}
+    files.update(compressed_siblings(data))
+    for suffix, contents in files.items():
+        if contents is None:
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        elif sink is not None:
+            sink.write(path + suffix, contents)
+        else:
+            write_if_changed(path + suffix, contents)
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import contextlib
+import glob
+import hashlib
+import io
+import json
+import os
+import runpy
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class Stage:
+    """One generator of the refresh pipeline.
+
+    `inputs` and `outputs` are glob patterns relative to the repository
+    root; a stage is up to date when the stat fingerprint of its inputs is
+    unchanged since its last successful run and its outputs exist.
+    """
+
+    name: str
+    script: str
+    args: Tuple[str, ...] = ()
+    cwd: str = "."
+    deps: Tuple[str, ...] = ()
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+
+
+@dataclass
+class StageResult:
+    name: str
+    status: str  # 'ok' | 'cache' | 'failed' | 'skipped'
+    wall_time: float = 0.0
+    exit_code: int = 0
+    output: str = ""
+
+
+@dataclass
+class PipelineReport:
+    results: Dict[str, StageResult] = field(default_factory=dict)
+    wall_time: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return all(r.status in ("ok", "cache") for r in self.results.values())
+
+
+def validate_stages(stages: Sequence[Stage]) -> None:
+    names = {s.name for s in stages}
+    if len(names) != len(stages):
+        raise ValueError("Noms d'étapes en double dans le pipeline.")
+    for s in stages:
+        for d in s.deps:
+            if d not in names:
+                raise ValueError(f"Étape {s.name}: dépendance inconnue {d!r}.")
+    # Kahn's algorithm, only to reject cycles.
+    indegree = {s.name: len(s.deps) for s in stages}
+    ready = [n for n, d in indegree.items() if d == 0]
+    seen = 0
+    while ready:
+        n = ready.pop()
+        seen += 1
+        for s in stages:
+            if n in s.deps:
+                indegree[s.name] -= 1
+                if indegree[s.name] == 0:
+                    ready.append(s.name)
+    if seen != len(stages):
+        raise ValueError("Le pipeline contient un cycle de dépendances.")
+
+
+def expand_patterns(root: str, patterns: Iterable[str]) -> List[str]:
+    paths = set()
+    for pattern in patterns:
+        paths.update(glob.glob(os.path.join(root, pattern), recursive=True))
+    return sorted(p for p in paths if os.path.isfile(p))
+
+
+def stat_fingerprint(root: str, stage: Stage) -> str:
+    h = hashlib.sha256()
+    h.update(json.dumps([stage.script, list(stage.args)]).encode("utf-8"))
+    for path in expand_patterns(root, stage.inputs):
+        st = os.stat(path)
+        h.update(f"{os.path.relpath(path, root)}\0{st.st_size}\0{st.st_mtime_ns}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def outputs_exist(root: str, stage: Stage) -> bool:
+    return all(glob.glob(os.path.join(root, pattern), recursive=True) for pattern in stage.outputs)
+
+
+def load_stamps(path: str) -> Dict[str, str]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_stamps(path: str, stamps: Dict[str, str]) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(stamps, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def run_stage_in_worker(root: str, scripts_dir: str, stage: Stage) -> Tuple[int, str, float]:
+    """Run a generator script as __main__ inside a pool worker.
+
+    Returns (exit code, captured stdout/stderr, wall time).
+    """
+
+    if scripts_dir not in sys.path:
+        sys.path.insert(0, scripts_dir)
+    script_path = os.path.join(scripts_dir, stage.script)
+    buf = io.StringIO()
+    exit_code = 0
+    started = time.perf_counter()
+    previous_cwd = os.getcwd()
+    previous_argv = sys.argv
+    try:
+        os.chdir(os.path.join(root, stage.cwd))
+        sys.argv = [script_path, *stage.args]
+        with contextlib.redirect_stdout(buf), contextlib.redirect_stderr(buf):
+            runpy.run_path(script_path, run_name="__main__")
+    except SystemExit as e:
+        if isinstance(e.code, int):
+            exit_code = e.code
+        elif e.code is not None:
+            buf.write(f"{e.code}\n")
+            exit_code = 1
+    except Exception as e:  # reported with the stage, the other stages go on
+        buf.write(f"Erreur: {e!r}\n")
+        exit_code = 1
+    finally:
+        os.chdir(previous_cwd)
+        sys.argv = previous_argv
+    return exit_code, buf.getvalue(), time.perf_counter() - started
+
+
+def run_pipeline(
+    stages: Sequence[Stage],
+    *,
+    root: str,
+    scripts_dir: str,
+    stamps_path: str,
+    jobs: Optional[int] = None,
+    force: bool = False,
+    on_result=None,
+) -> PipelineReport:
+    """Run `stages` on a process pool, each as soon as its deps succeeded.
+
+    Up-to-date stages are reported as 'cache' without running; stages whose
+    dependency failed are 'skipped'. `on_result(result)` is called as each
+    stage finishes.
+    """
+
+    validate_stages(stages)
+    by_name = {s.name: s for s in stages}
+    stamps = load_stamps(stamps_path)
+    report = PipelineReport()
+    pending = {s.name for s in stages}
+    running: Dict[Future, Tuple[Stage, str]] = {}  # future -> (stage, input fingerprint)
+    started = time.perf_counter()
+
+    def finish(result: StageResult) -> None:
+        report.results[result.name] = result
+        pending.discard(result.name)
+        if on_result is not None:
+            on_result(result)
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            progressed = True
+            while progressed:
+                progressed = False
+                for name in sorted(pending):
+                    stage = by_name[name]
+                    dep_results = [report.results.get(d) for d in stage.deps]
+                    if any(r is None for r in dep_results):
+                        continue
+                    if any(r.status in ("failed", "skipped") for r in dep_results):
+                        finish(StageResult(name=name, status="skipped"))
+                        progressed = True
+                        continue
+                    fingerprint = stat_fingerprint(root, stage)
+                    if not force and stamps.get(name) == fingerprint and outputs_exist(root, stage):
+                        finish(StageResult(name=name, status="cache"))
+                        progressed = True
+                        continue
+                    future = pool.submit(run_stage_in_worker, root, scripts_dir, stage)
+                    running[future] = (stage, fingerprint)
+                    pending.discard(name)
+                    progressed = True
+
+            if not running:
+                break
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, fingerprint = running.pop(future)
+                try:
+                    exit_code, output, wall = future.result()
+                except Exception as e:
+                    exit_code, output, wall = 1, f"Erreur: {e!r}\n", 0.0
+                if exit_code == 0:
+                    stamps[stage.name] = fingerprint
+                    save_stamps(stamps_path, stamps)
+                finish(
+                    StageResult(
+                        name=stage.name,
+                        status="ok" if exit_code == 0 else "failed",
+                        wall_time=wall,
+                        exit_code=exit_code,
+                        output=output,
+                    )
+                )
+
+    report.wall_time = time.perf_counter() - started
+    return report
+
+
+def critical_path(stages: Sequence[Stage], report: PipelineReport) -> Tuple[float, List[str]]:
+    """Longest chain of measured stage wall times through the DAG."""
+
+    by_name = {s.name: s for s in stages}
+    memo: Dict[str, Tuple[float, List[str]]] = {}
+
+    def longest(name: str) -> Tuple[float, List[str]]:
+        if name not in memo:
+            own = report.results[name].wall_time if name in report.results else 0.0
+            best: Tuple[float, List[str]] = (0.0, [])
+            for dep in by_name[name].deps:
+                candidate = longest(dep)
+                if candidate[0] > best[0]:
+                    best = candidate
+            memo[name] = (best[0] + own, best[1] + [name])
+        return memo[name]
+
+    return max((longest(s.name) for s in stages), key=lambda t: t[0], default=(0.0, []))
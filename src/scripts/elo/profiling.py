@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import argparse
+import contextlib
+import cProfile
+import datetime
+import json
+import os
+import platform
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .cache_paths import default_cache_dir
+
+try:
+    import resource
+except ImportError:  # Windows: no peak RSS
+    resource = None
+
+
+REPORT_VERSION = 1
+
+_NULL_STAGE = contextlib.nullcontext()
+
+
+def read_io_counters() -> Tuple[Optional[int], Optional[int]]:
+    """(bytes read, bytes written) by this process through read/write calls.
+
+    Linux only (/proc/self/io rchar/wchar); (None, None) elsewhere.
+    """
+
+    try:
+        with open("/proc/self/io", "rb") as f:
+            values = dict(line.split(b": ", 1) for line in f.read().splitlines())
+        return int(values[b"rchar"]), int(values[b"wchar"])
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+
+def peak_rss_bytes() -> Optional[int]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux, in bytes on macOS.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+@dataclass
+class StageStats:
+    name: str  # parent/child for nested stages
+    calls: int = 0
+    wall: float = 0.0
+    cpu: float = 0.0
+    bytes_read: Optional[int] = None
+    bytes_written: Optional[int] = None
+    peak_rss_bytes: Optional[int] = None
+    counters: Dict[str, int] = field(default_factory=dict)
+
+
+class Profiler:
+    """Wall/CPU time, I/O and counters per named stage of one script run.
+
+    Disabled profilers cost nothing: stage() returns a shared null context
+    and count() returns immediately. Stages nest; repeated stages (one per
+    race, say) accumulate into the same entry. With `cprofile_path`, each
+    top-level stage runs under cProfile and the hottest one is dumped.
+    """
+
+    def __init__(
+        self,
+        script: str,
+        *,
+        enabled: bool = True,
+        report_path: Optional[str] = None,
+        cprofile_path: Optional[str] = None,
+    ):
+        self.script = script
+        self.enabled = enabled
+        self.report_path = report_path
+        self.cprofile_path = cprofile_path
+        self.stages: Dict[str, StageStats] = {}
+        self.counters: Dict[str, int] = {}
+        self._stack: List[str] = []
+        self._profiles: Dict[str, cProfile.Profile] = {}
+        self._started_at = datetime.datetime.now(datetime.timezone.utc)
+        self._wall0 = time.perf_counter()
+        self._cpu0 = time.process_time()
+        self._io0 = read_io_counters()
+
+    def stage(self, name: str):
+        if not self.enabled:
+            return _NULL_STAGE
+        return self._stage(name)
+
+    @contextlib.contextmanager
+    def _stage(self, name: str) -> Iterator[None]:
+        path = "/".join(self._stack + [name])
+        stats = self.stages.get(path)
+        if stats is None:
+            stats = self.stages[path] = StageStats(name=path)
+
+        profile = None
+        if self.cprofile_path and not self._stack:
+            profile = self._profiles.setdefault(path, cProfile.Profile())
+        self._stack.append(name)
+        io0 = read_io_counters()
+        wall0 = time.perf_counter()
+        cpu0 = time.process_time()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            stats.calls += 1
+            stats.wall += time.perf_counter() - wall0
+            stats.cpu += time.process_time() - cpu0
+            io1 = read_io_counters()
+            if io0[0] is not None and io1[0] is not None:
+                stats.bytes_read = (stats.bytes_read or 0) + io1[0] - io0[0]
+                stats.bytes_written = (stats.bytes_written or 0) + io1[1] - io0[1]
+            stats.peak_rss_bytes = peak_rss_bytes()
+            self._stack.pop()
+
+    def count(self, counter: str, n: int = 1) -> None:
+        """Add `n` to a counter of the current stage (and of the whole run)."""
+        if not self.enabled:
+            return
+        self.counters[counter] = self.counters.get(counter, 0) + n
+        if self._stack:
+            stats = self.stages["/".join(self._stack)]
+            stats.counters[counter] = stats.counters.get(counter, 0) + n
+
+    def report(self) -> Dict[str, object]:
+        io1 = read_io_counters()
+        top_level = [s for s in self.stages.values() if "/" not in s.name]
+        hottest = max(top_level, key=lambda s: s.wall, default=None)
+        return {
+            "version": REPORT_VERSION,
+            "script": self.script,
+            "startedAt": self._started_at.isoformat(timespec="seconds"),
+            "argv": sys.argv[1:],
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "wall": time.perf_counter() - self._wall0,
+            "cpu": time.process_time() - self._cpu0,
+            "bytesRead": None if io1[0] is None or self._io0[0] is None else io1[0] - self._io0[0],
+            "bytesWritten": None if io1[1] is None or self._io0[1] is None else io1[1] - self._io0[1],
+            "peakRssBytes": peak_rss_bytes(),
+            "counters": dict(self.counters),
+            "hottestStage": hottest.name if hottest else None,
+            "stages": [asdict(s) for s in self.stages.values()],
+        }
+
+    def finish(self) -> Optional[str]:
+        """Write the JSON report (and the cProfile dump); returns the report path."""
+
+        global _active
+        if not self.enabled:
+            return None
+        if _active is self:
+            # Pipeline workers run several scripts in one process.
+            _active = Profiler("", enabled=False)
+        report = self.report()
+        if self.cprofile_path and report["hottestStage"] in self._profiles:
+            os.makedirs(os.path.dirname(os.path.abspath(self.cprofile_path)), exist_ok=True)
+            self._profiles[report["hottestStage"]].dump_stats(self.cprofile_path)
+            report["cprofile"] = self.cprofile_path
+
+        path = self.report_path or default_report_path(self.script, self._started_at)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Profil écrit: {path}", file=sys.stderr)
+        return path
+
+
+def default_report_path(script: str, started_at: datetime.datetime) -> str:
+    stamp = started_at.strftime("%Y%m%d-%H%M%S")
+    return os.path.join(default_cache_dir(), "profiles", f"{script}-{stamp}.json")
+
+
+_active = Profiler("", enabled=False)
+
+
+def get_profiler() -> Profiler:
+    """Profiler of the running script (disabled unless --profile was given)."""
+    return _active
+
+
+def start_profiler(
+    script: str,
+    *,
+    report_path: Optional[str] = None,
+    cprofile: bool = False,
+) -> Profiler:
+    global _active
+    cprofile_path = None
+    if cprofile:
+        base = report_path or default_report_path(script, datetime.datetime.now(datetime.timezone.utc))
+        cprofile_path = os.path.splitext(base)[0] + ".prof"
+    _active = Profiler(script, report_path=report_path, cprofile_path=cprofile_path)
+    return _active
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="FICHIER",
+        help=(
+            "Mesure chaque étape (temps, CPU, E/S, mémoire) et écrit un rapport JSON "
+            "(défaut: .cache/profiles/<script>-<date>.json)."
+        ),
+    )
+    parser.add_argument(
+        "--cprofile",
+        action="store_true",
+        help="Avec --profile, enregistre aussi un profil cProfile (.prof) de l'étape la plus lente.",
+    )
+
+
+def profiler_from_args(script: str, args: argparse.Namespace) -> Profiler:
+    if args.profile is None:
+        return _active
+    return start_profiler(script, report_path=args.profile or None, cprofile=args.cprofile)
+
+
+def profiler_from_argv(script: str, argv: List[str]) -> Profiler:
+    """Same as profiler_from_args for scripts without their own argument parser."""
+    parser = argparse.ArgumentParser(add_help=False)
+    add_profile_arguments(parser)
+    args, _ = parser.parse_known_args(argv)
+    return profiler_from_args(script, args)
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .snapshot import F1dbSnapshot
+
+
+# (event id, contenu de qualifying-results.yml ou sprint-qualifying-results.yml)
+Session = Tuple[str, Any]
+
+
+def is_numeric_position(position):
+    try:
+        int(position)
+        return True
+    except ValueError:
+        return False
+
+
+def process_qualifying_results(qualifying_data, config, event_id, driver_points):
+    if not qualifying_data:
+        return
+
+    # Filtrer uniquement les résultats de Q3 et les positions numériques
+    q3_results = [result for result in qualifying_data if result.get('q3') is not None and is_numeric_position(str(result['position']))]
+    if not q3_results:
+        q3_results = [result for result in qualifying_data if is_numeric_position(str(result['position']))]  # Si pas de Q3, prendre tous les résultats numériques
+
+    # Trier les résultats par position
+    q3_results_sorted = sorted(q3_results, key=lambda x: int(x['position']))
+
+    # Attribuer les points selon le barème
+    for result in q3_results_sorted:
+        driver_id = result['driverId']
+        position = str(result['position'])
+        points = config['points_per_position'].get(position, 0)
+        driver_points[driver_id]['total'] += points
+        driver_points[driver_id]['events'][event_id] = points
+
+
+def year_sessions(snapshot: F1dbSnapshot, year) -> List[Session]:
+    """Séances de qualification de l'année, dans l'ordre des courses."""
+
+    sessions = []
+    for circuit in snapshot.race_dirs(year):
+        circuit_name = circuit.split('-', 1)[1]
+        circuit_prefix = circuit_name[:3].upper()
+
+        # Qualifications normales puis sprint qualifications
+        if snapshot.has_race_file(year, circuit, 'qualifying-results.yml'):
+            sessions.append((f"{circuit_prefix}R", snapshot.race_file(year, circuit, 'qualifying-results.yml')))
+        if snapshot.has_race_file(year, circuit, 'sprint-qualifying-results.yml'):
+            sessions.append((f"{circuit_prefix}S", snapshot.race_file(year, circuit, 'sprint-qualifying-results.yml')))
+    return sessions
+
+
+def qualifications_table(
+    sessions: Sequence[Session],
+    config: Dict[str, Any],
+    driver_id_to_name: Dict[str, str],
+) -> List[List[Any]]:
+    """Lignes du qualifications.csv d'une année, en-tête comprise."""
+
+    # Dictionnaire pour stocker les points des pilotes
+    driver_points = defaultdict(lambda: {'total': 0, 'events': defaultdict(int)})
+    event_columns = set()
+    for event_id, data in sessions:
+        event_columns.add(event_id)
+        process_qualifying_results(data, config, event_id, driver_points)
+
+    # Trier les pilotes par points
+    sorted_drivers = sorted(
+        driver_points.items(),
+        key=lambda x: x[1]['total'],
+        reverse=True
+    )
+
+    # Trier les colonnes des événements
+    sorted_event_columns = sorted(event_columns)
+
+    table = [['Pilote', 'Rang', 'Points'] + sorted_event_columns]
+    for rank, (driver_id, stats) in enumerate(sorted_drivers, 1):
+        driver_name = driver_id_to_name.get(driver_id, driver_id)
+        row = [driver_name, rank, stats['total']]
+        for event in sorted_event_columns:
+            row.append(stats['events'].get(event, ''))
+        table.append(row)
+    return table
+
+
+# Tables partagées par toutes les années, envoyées une fois par processus.
+_worker_tables: Tuple[Dict[str, Any], Dict[str, str]] = ({}, {})
+
+
+def _init_worker(config: Dict[str, Any], driver_id_to_name: Dict[str, str]) -> None:
+    global _worker_tables
+    _worker_tables = (config, driver_id_to_name)
+
+
+def _year_table(year, sessions: Sequence[Session]) -> Tuple[Any, List[List[Any]]]:
+    config, driver_id_to_name = _worker_tables
+    return year, qualifications_table(sessions, config, driver_id_to_name)
+
+
+def qualifications_tables(
+    years_sessions: Sequence[Tuple[Any, Sequence[Session]]],
+    config: Dict[str, Any],
+    driver_id_to_name: Dict[str, str],
+    jobs: Optional[int] = None,
+) -> Iterator[Tuple[Any, List[List[Any]]]]:
+    """(année, lignes) de chaque année, calculées sur un pool de processus.
+
+    Les années sont indépendantes ; le barème et les noms des pilotes ne
+    sont transmis qu'une fois par processus. Avec une seule année (ou
+    jobs=1) tout reste dans le processus courant.
+    """
+
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(years_sessions) < 2:
+        for year, sessions in years_sessions:
+            yield year, qualifications_table(sessions, config, driver_id_to_name)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=min(jobs, len(years_sessions)),
+        initializer=_init_worker,
+        initargs=(config, driver_id_to_name),
+    ) as pool:
+        futures = [pool.submit(_year_table, year, sessions) for year, sessions in years_sessions]
+        for future in futures:
+            yield future.result()
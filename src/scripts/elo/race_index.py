@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import Dict, Iterable, List, Optional
+
+from .output import OutputSink, write_precompressed
+
+
+INDEX_FILENAME = "index.json"
+YEAR_INDEX_DIR = "index"
+COMPRESSED_SUFFIXES = (".gz", ".br")
+
+
+def year_index_path(output_root: str, year: int) -> str:
+    return f"{output_root}/{YEAR_INDEX_DIR}/{year}.json"
+
+
+def _dumps(payload: object) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def write_index(
+    output_root: str,
+    *,
+    k: float,
+    initial_elo: float,
+    driver_ids: Iterable[str],
+    driver_id_to_name: Dict[str, str],
+    races_by_year: Dict[int, List[dict]],
+    sink: Optional[OutputSink] = None,
+) -> None:
+    """Write index.json and one race manifest per year.
+
+    index.json only holds what every page needs (drivers, years, totals);
+    index/<year>.json lists the races of one season and is fetched when
+    that season is shown. All of them are minified and precompressed;
+    manifests of years no longer in the run are removed.
+    """
+
+    years = sorted(races_by_year)
+    manifest = {
+        "k": k,
+        "initialElo": initial_elo,
+        "totalRaces": sum(len(races_by_year[year]) for year in years),
+        "drivers": [
+            {"id": driver_id, "name": driver_id_to_name.get(driver_id, driver_id)}
+            for driver_id in sorted(driver_ids)
+        ],
+        "years": [{"year": year, "races": len(races_by_year[year])} for year in years],
+    }
+    # Before queueing the writes: the sink's temporary files live there too.
+    remove_stale_year_indexes(
+        f"{output_root}/{YEAR_INDEX_DIR}",
+        {os.path.basename(year_index_path(output_root, year)) for year in years},
+    )
+    write_precompressed(f"{output_root}/{INDEX_FILENAME}", _dumps(manifest), sink)
+    for year in years:
+        payload = {"year": year, "races": races_by_year[year]}
+        write_precompressed(year_index_path(output_root, year), _dumps(payload), sink)
+
+
+def remove_stale_year_indexes(index_dir: str, kept: Iterable[str]) -> None:
+    wanted = {name + suffix for name in kept for suffix in ("",) + COMPRESSED_SUFFIXES}
+    if not os.path.isdir(index_dir):
+        return
+    for name in os.listdir(index_dir):
+        if name not in wanted:
+            os.remove(os.path.join(index_dir, name))
@@ -1,26 +1,75 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from array import array
+from dataclasses import dataclass, field
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 
 BOTTOM_TIER_STATUSES = {"DSQ", "DNS", "DNQ"}
 
+# (driver_id, constructor_id, position_raw, laps, grid_position) as read from
+# race-results.yml; see f1db_io.parse_race_rows.
+RaceRow = Tuple[str, Optional[str], str, Optional[int], Optional[str]]
 
-@dataclass(frozen=True)
-class RaceEntry:
-    driver_id: str
-    constructor_id: Optional[str]
-    position_raw: str
-    laps: Optional[int]
-    grid_position: Optional[str]
 
+class StringTable:
+    def __init__(self, values: Iterable[str] = ()):
+        self.values: List[str] = []
+        self._index: Dict[str, int] = {}
+        for v in values:
+            self.intern(v)
 
-@dataclass(frozen=True)
-class RankedEntry:
-    entry: RaceEntry
-    sort_key: Tuple
-    tie_key: Tuple
+    def intern(self, value: str) -> int:
+        idx = self._index.get(value)
+        if idx is None:
+            idx = len(self.values)
+            self._index[value] = idx
+            self.values.append(value)
+        return idx
+
+
+@dataclass
+class RaceIds:
+    """Interned driver/constructor ids, shared by every race of a run."""
+
+    drivers: StringTable = field(default_factory=StringTable)
+    constructors: StringTable = field(default_factory=StringTable)
+
+
+@dataclass
+class RaceArrays:
+    """One ranked race as parallel arrays, best result first.
+
+    Row i is the i-th best driver. `ordinal` is the tie-group id: equal for
+    tied drivers, increasing down the classification, so the pairwise
+    outcome of i against j is 0.5 if ordinal[i] == ordinal[j] else
+    float(ordinal[i] < ordinal[j]). `laps` uses -1 and `constructor` uses
+    -1 for missing values.
+    """
+
+    ids: RaceIds
+    driver: array = field(default_factory=lambda: array("i"))
+    constructor: array = field(default_factory=lambda: array("i"))
+    laps: array = field(default_factory=lambda: array("i"))
+    tier: array = field(default_factory=lambda: array("b"))
+    ordinal: array = field(default_factory=lambda: array("i"))
+    position_raw: List[str] = field(default_factory=list)
+    grid_position: List[str] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.driver)
+
+    def driver_ids(self) -> List[str]:
+        values = self.ids.drivers.values
+        return [values[d] for d in self.driver]
+
+    def constructor_id(self, i: int) -> str:
+        c = self.constructor[i]
+        return self.ids.constructors.values[c] if c >= 0 else ""
+
+    def laps_or_none(self, i: int) -> Optional[int]:
+        laps = self.laps[i]
+        return laps if laps >= 0 else None
 
 
 def _parse_int(value: Any) -> Optional[int]:
@@ -42,52 +91,59 @@ def _normalize_status(position_raw: Any) -> str:
     return str(position_raw).strip().upper()
 
 
-def compute_rank_keys(entry: RaceEntry) -> RankedEntry:
-    """Compute a total ordering key and a tie key.
+def rank_key(driver_id: str, position_raw: str, laps: Optional[int]) -> Tuple:
+    """Total ordering key of one result (lower is better).
 
     Ordering rules (best first):
     1) Numeric position asc
     2) Other non-numeric statuses by laps desc
     3) {DSQ,DNS,DNQ} last, by laps desc
 
-    Ties: only when the tie_key is identical.
+    The key always ends with the driver id; two results tie when their keys
+    are equal without it. key[0] is the tier (0, 1 or 2).
     """
 
-    status = _normalize_status(entry.position_raw)
+    status = _normalize_status(position_raw)
     pos_int = _position_int(status)
-    laps = entry.laps if entry.laps is not None else 0
-
     if pos_int is not None:
-        # Best: (0, pos)
-        tie_key = (0, pos_int)
-        sort_key = (0, pos_int, entry.driver_id)
-        return RankedEntry(entry=entry, sort_key=sort_key, tie_key=tie_key)
+        return (0, pos_int, driver_id)
 
     tier = 2 if status in BOTTOM_TIER_STATUSES else 1
     # Higher laps is better => sort on -laps
-    tie_key = (tier, laps, status)
-    sort_key = (tier, -laps, status, entry.driver_id)
-    return RankedEntry(entry=entry, sort_key=sort_key, tie_key=tie_key)
-
+    return (tier, -(laps if laps is not None else 0), status, driver_id)
 
-def dedupe_best_by_driver(entries: Iterable[RaceEntry]) -> List[RaceEntry]:
-    best: Dict[str, RankedEntry] = {}
-    for entry in entries:
-        ranked = compute_rank_keys(entry)
-        current = best.get(entry.driver_id)
-        if current is None or ranked.sort_key < current.sort_key:
-            best[entry.driver_id] = ranked
-    return [ranked.entry for ranked in best.values()]
 
+def rank_race(rows: Iterable[RaceRow], ids: Optional[RaceIds] = None) -> RaceArrays:
+    """Keep each driver's best row, rank them and intern their ids.
 
-def rank_entries(entries: Iterable[RaceEntry]) -> List[RankedEntry]:
-    ranked = [compute_rank_keys(e) for e in entries]
-    ranked.sort(key=lambda r: r.sort_key)
-    return ranked
-
+    Each row's key is computed once; tie groups come from comparing the
+    keys of neighbours in the sorted order.
+    """
 
-def outcome(a: RankedEntry, b: RankedEntry) -> float:
-    if a.tie_key == b.tie_key:
-        return 0.5
-    # better = lower sort_key
-    return 1.0 if a.sort_key < b.sort_key else 0.0
+    best: Dict[str, Tuple[Tuple, RaceRow]] = {}
+    for row in rows:
+        key = rank_key(row[0], row[2], row[3])
+        current = best.get(row[0])
+        if current is None or key < current[0]:
+            best[row[0]] = (key, row)
+
+    race = RaceArrays(ids=ids if ids is not None else RaceIds())
+    drivers = race.ids.drivers
+    constructors = race.ids.constructors
+    group = -1
+    prev_tie = None
+    for key, (driver_id, constructor_id, position_raw, laps, grid_position) in sorted(
+        best.values(), key=lambda item: item[0]
+    ):
+        tie = key[:-1]
+        if tie != prev_tie:
+            group += 1
+            prev_tie = tie
+        race.driver.append(drivers.intern(driver_id))
+        race.constructor.append(constructors.intern(constructor_id) if constructor_id is not None else -1)
+        race.laps.append(laps if laps is not None else -1)
+        race.tier.append(key[0])
+        race.ordinal.append(group)
+        race.position_raw.append(position_raw)
+        race.grid_position.append(grid_position or "")
+    return race
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import os
+import pickle
+from array import array
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from .cache_paths import tree_cache_path
+from .f1db_io import sha256_of_text
+from .ranking import StringTable
+
+
+SEASON_STATES_VERSION = 1
+
+
+def default_season_states_path(yaml_dir: str) -> str:
+    # Keyed on the f1db tree, not on an output tree: the states only depend
+    # on the data and the rating parameters, so every run can share them.
+    return tree_cache_path("elo_season_states", yaml_dir)
+
+
+def chain_hash(previous: str, key: str, source_hash: str) -> str:
+    """Hash of a calendar prefix, extended by one race."""
+
+    return sha256_of_text(f"{previous}:{key}={source_hash}")
+
+
+@dataclass
+class SeasonState:
+    """Ratings once the full calendar up to the end of `year` has been rated.
+
+    `race_count` is the careerRaceNumber of the season's last race and
+    `chain_hash` the chain_hash of every race up to it, so the state is only
+    reused while none of them changed. Drivers index the store's driver table.
+    """
+
+    year: int
+    race_count: int
+    chain_hash: str
+    drivers: array  # 'I'
+    ratings: array  # 'd'
+
+
+class SeasonStates:
+    """End-of-season rating states of the full calendar, for --years runs.
+
+    A run restricted to some seasons starts from the state just before its
+    first race instead of replaying every earlier season. States are
+    recorded by every run (full or partial) and invalidated by the rating
+    parameters (`params`) or any change to an earlier race.
+    """
+
+    def __init__(self, params: Dict[str, object]):
+        self.params = params
+        self.driver_ids = StringTable()
+        self.seasons: Dict[int, SeasonState] = {}
+
+    def record(self, year: int, race_count: int, chain: str, ratings: Dict[str, float]) -> None:
+        drivers = array("I")
+        values = array("d")
+        for driver_id, rating in ratings.items():
+            drivers.append(self.driver_ids.intern(driver_id))
+            values.append(rating)
+        self.seasons[year] = SeasonState(year, race_count, chain, drivers, values)
+
+    def ratings(self, state: SeasonState) -> Dict[str, float]:
+        ids = self.driver_ids.values
+        return {ids[d]: rating for d, rating in zip(state.drivers, state.ratings)}
+
+    def latest(self, chains: List[str], before: int) -> Optional[SeasonState]:
+        """Most advanced valid state after at most `before` calendar races.
+
+        `chains[n]` is the chain_hash of the first n races of the calendar.
+        """
+
+        best = None
+        for state in self.seasons.values():
+            if state.race_count > before or chains[state.race_count] != state.chain_hash:
+                continue
+            if best is None or state.race_count > best.race_count:
+                best = state
+        return best
+
+
+def load_season_states(path: str, params: Dict[str, object]) -> SeasonStates:
+    """Stored states for `params`, or an empty store."""
+
+    states = SeasonStates(params)
+    try:
+        with open(path, "rb") as f:
+            if pickle.load(f) != SEASON_STATES_VERSION:
+                return states
+            stored_params, driver_ids, seasons = pickle.load(f)
+    except Exception:
+        return states
+    if stored_params == params:
+        states.driver_ids = StringTable(driver_ids)
+        states.seasons = seasons
+    return states
+
+
+def save_season_states(path: str, states: SeasonStates) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(SEASON_STATES_VERSION, f, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump(
+            (states.params, states.driver_ids.values, states.seasons),
+            f,
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+    os.replace(tmp_path, path)
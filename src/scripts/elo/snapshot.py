@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import os
+import pickle
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import yaml
+
+from .cache_paths import tree_cache_path
+from .f1db_io import sha256_of_text
+from .hash_manifest import hash_tree_files
+from .profiling import get_profiler
+
+
+SNAPSHOT_VERSION = 1
+
+RACE_FILES = (
+    "race.yml",
+    "race-results.yml",
+    "qualifying-results.yml",
+    "sprint-qualifying-results.yml",
+)
+SEASON_FILES = ("driver-standings.yml", "constructor-standings.yml")
+
+# Only the fields the generators actually read are kept for drivers and
+# constructors: the full f1db records (biographies, places, ...) dominate
+# the YAML tree but are never used.
+DRIVER_FIELDS = ("id", "name", "dateOfBirth")
+CONSTRUCTOR_FIELDS = ("id", "name")
+
+
+def default_snapshot_path(yaml_dir: str) -> str:
+    return tree_cache_path("f1db_snapshot", yaml_dir)
+
+
+def _intern(value: Any) -> Any:
+    """Intern every string so pickle's memo stores repeated ids only once."""
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, dict):
+        return {sys.intern(str(k)): _intern(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_intern(v) for v in value]
+    return value
+
+
+def _compact(data: Any, fields: Tuple[str, ...]) -> Dict[str, Any]:
+    if not isinstance(data, dict):
+        return {}
+    return {k: data[k] for k in fields if data.get(k) is not None}
+
+
+def _load_yaml_file(path: str) -> Any:
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f)
+
+
+def scan_source_tree(yaml_dir: str) -> Tuple[List[str], Dict[str, List[str]]]:
+    """List the f1db files used by the generators.
+
+    Returns the relative paths of every source file (sorted) and the race
+    directory names per season, as they appear on disk.
+    """
+
+    rel_paths: List[str] = []
+    race_dirs: Dict[str, List[str]] = {}
+
+    for entity in ("drivers", "constructors"):
+        entity_dir = os.path.join(yaml_dir, entity)
+        if not os.path.isdir(entity_dir):
+            continue
+        for name in os.listdir(entity_dir):
+            if name.endswith(".yml"):
+                rel_paths.append(f"{entity}/{name}")
+
+    seasons_dir = os.path.join(yaml_dir, "seasons")
+    if os.path.isdir(seasons_dir):
+        for year in os.listdir(seasons_dir):
+            if not year.isdigit() or not os.path.isdir(os.path.join(seasons_dir, year)):
+                continue
+            season_names = set(os.listdir(os.path.join(seasons_dir, year)))
+            rel_paths.extend(f"seasons/{year}/{name}" for name in SEASON_FILES if name in season_names)
+
+            # One listdir per race directory instead of one stat per candidate file.
+            races_dir = os.path.join(seasons_dir, year, "races")
+            dirs = sorted(os.listdir(races_dir)) if "races" in season_names and os.path.isdir(races_dir) else []
+            race_dirs[year] = dirs
+            for race_dir in dirs:
+                race_path = os.path.join(races_dir, race_dir)
+                names = set(os.listdir(race_path)) if os.path.isdir(race_path) else set()
+                rel_paths.extend(
+                    f"seasons/{year}/races/{race_dir}/{name}" for name in RACE_FILES if name in names
+                )
+
+    rel_paths.sort()
+    return rel_paths, race_dirs
+
+
+def compute_file_hashes(yaml_dir: str, rel_paths: List[str]) -> Dict[str, str]:
+    # rel_paths is the full listing of the tree, so vanished files are pruned.
+    return hash_tree_files(yaml_dir, rel_paths, prune=True)
+
+
+def combine_hashes(file_hashes: Dict[str, str], race_dirs: Dict[str, List[str]]) -> str:
+    parts = [f"{rel}={h}" for rel, h in sorted(file_hashes.items())]
+    parts.extend(f"{year}:{','.join(dirs)}" for year, dirs in sorted(race_dirs.items()))
+    return sha256_of_text(f"v{SNAPSHOT_VERSION}\n" + "\n".join(parts))
+
+
+@dataclass
+class F1dbSnapshot:
+    """Parsed f1db tree, keyed by path relative to the YAML root.
+
+    `files` holds the parsed race and season files; drivers and constructors
+    are reduced to DRIVER_FIELDS / CONSTRUCTOR_FIELDS and indexed by id.
+    """
+
+    source_hash: str
+    file_hashes: Dict[str, str]
+    race_dirs_by_year: Dict[str, List[str]]
+    files: Dict[str, Any] = field(default_factory=dict)
+    drivers: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    constructors: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    def years(self) -> List[str]:
+        return sorted(self.race_dirs_by_year.keys())
+
+    def race_dirs(self, year) -> List[str]:
+        return self.race_dirs_by_year.get(str(year), [])
+
+    def race_file(self, year, race_dir: str, name: str) -> Any:
+        return self.files.get(f"seasons/{year}/races/{race_dir}/{name}")
+
+    def has_race_file(self, year, race_dir: str, name: str) -> bool:
+        return f"seasons/{year}/races/{race_dir}/{name}" in self.file_hashes
+
+    def season_file(self, year, name: str) -> Any:
+        return self.files.get(f"seasons/{year}/{name}")
+
+    def has_season_file(self, year, name: str) -> bool:
+        return f"seasons/{year}/{name}" in self.file_hashes
+
+    def file_hash(self, rel_path: str) -> Optional[str]:
+        return self.file_hashes.get(rel_path)
+
+    def race_file_hash(self, year, race_dir: str, name: str) -> Optional[str]:
+        return self.file_hashes.get(f"seasons/{year}/races/{race_dir}/{name}")
+
+    def season_file_hash(self, year, name: str) -> Optional[str]:
+        return self.file_hashes.get(f"seasons/{year}/{name}")
+
+    def driver_names(self) -> Dict[str, str]:
+        return {d: data.get("name", d) for d, data in self.drivers.items()}
+
+    def constructor_names(self) -> Dict[str, str]:
+        return {c: data.get("name", c) for c, data in self.constructors.items()}
+
+
+def _build_snapshot(
+    yaml_dir: str,
+    file_hashes: Dict[str, str],
+    race_dirs: Dict[str, List[str]],
+    previous: Optional[F1dbSnapshot],
+) -> Tuple[F1dbSnapshot, int]:
+    snapshot = F1dbSnapshot(
+        source_hash=combine_hashes(file_hashes, race_dirs),
+        file_hashes=file_hashes,
+        race_dirs_by_year=race_dirs,
+    )
+
+    def unchanged(rel: str) -> bool:
+        return previous is not None and previous.file_hashes.get(rel) == file_hashes[rel]
+
+    parsed = 0
+    for rel in file_hashes:
+        entity, _, name = rel.partition("/")
+        if entity in ("drivers", "constructors"):
+            item_id = name[: -len(".yml")]
+            store = snapshot.drivers if entity == "drivers" else snapshot.constructors
+            fields = DRIVER_FIELDS if entity == "drivers" else CONSTRUCTOR_FIELDS
+            if unchanged(rel):
+                old_store = previous.drivers if entity == "drivers" else previous.constructors
+                if item_id in old_store:
+                    store[item_id] = old_store[item_id]
+                    continue
+            store[item_id] = _intern(_compact(_load_yaml_file(os.path.join(yaml_dir, rel)), fields))
+            parsed += 1
+            continue
+
+        if unchanged(rel) and rel in previous.files:
+            snapshot.files[rel] = previous.files[rel]
+            continue
+        snapshot.files[rel] = _intern(_load_yaml_file(os.path.join(yaml_dir, rel)))
+        parsed += 1
+
+    get_profiler().count("files_parsed", parsed)
+    return snapshot, parsed
+
+
+def compile_snapshot(
+    yaml_dir: str,
+    *,
+    previous: Optional[F1dbSnapshot] = None,
+) -> Tuple[F1dbSnapshot, int]:
+    """Parse the YAML tree into a snapshot.
+
+    Files whose hash is unchanged since `previous` are reused without being
+    parsed again. Returns the snapshot and the number of files parsed.
+    """
+
+    profiler = get_profiler()
+    with profiler.stage("scan"):
+        rel_paths, race_dirs = scan_source_tree(yaml_dir)
+    with profiler.stage("hash"):
+        file_hashes = compute_file_hashes(yaml_dir, rel_paths)
+    with profiler.stage("parse_yaml"):
+        return _build_snapshot(yaml_dir, file_hashes, race_dirs, previous)
+
+
+def read_snapshot(snapshot_path: str) -> Optional[F1dbSnapshot]:
+    if not os.path.exists(snapshot_path):
+        return None
+    try:
+        with open(snapshot_path, "rb") as f:
+            header = pickle.load(f)
+            if not isinstance(header, dict) or header.get("version") != SNAPSHOT_VERSION:
+                return None
+            snapshot = pickle.load(f)
+    except Exception:
+        return None
+    return snapshot if isinstance(snapshot, F1dbSnapshot) else None
+
+
+def write_snapshot(snapshot_path: str, snapshot: F1dbSnapshot) -> None:
+    os.makedirs(os.path.dirname(snapshot_path), exist_ok=True)
+    tmp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(
+            {"version": SNAPSHOT_VERSION, "source_hash": snapshot.source_hash},
+            f,
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+        pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, snapshot_path)
+
+
+def load_snapshot(
+    yaml_dir: str,
+    snapshot_path: Optional[str] = None,
+    *,
+    force: bool = False,
+) -> F1dbSnapshot:
+    """Return an up-to-date snapshot of `yaml_dir`, recompiling it if needed.
+
+    The stored snapshot is reused when the hash of every source file (and the
+    race directory listing) matches; otherwise only the changed files are
+    parsed again and the snapshot file is replaced atomically.
+    """
+
+    yaml_dir = os.path.abspath(yaml_dir)
+    snapshot_path = snapshot_path or default_snapshot_path(yaml_dir)
+
+    profiler = get_profiler()
+    with profiler.stage("scan"):
+        rel_paths, race_dirs = scan_source_tree(yaml_dir)
+    with profiler.stage("hash"):
+        file_hashes = compute_file_hashes(yaml_dir, rel_paths)
+
+    with profiler.stage("read_snapshot"):
+        previous = None if force else read_snapshot(snapshot_path)
+    if previous is not None and combine_hashes(file_hashes, race_dirs) == previous.source_hash:
+        return previous
+
+    with profiler.stage("parse_yaml"):
+        snapshot, _ = _build_snapshot(yaml_dir, file_hashes, race_dirs, previous)
+    with profiler.stage("write_snapshot"):
+        write_snapshot(snapshot_path, snapshot)
+    return snapshot
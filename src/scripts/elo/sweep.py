@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import csv
+import itertools
+import math
+import os
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .elo_math import numpy_available
+from .f1db_io import RaceMeta, load_race_data
+from .ranking import RaceIds
+from .snapshot import F1dbSnapshot
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Expected scores are clipped away from 0/1 so a confident miss costs a
+# large but finite log-loss.
+LOG_LOSS_EPS = 1e-12
+
+
+def _fmt(value: float) -> str:
+    return f"{value:g}"
+
+
+@dataclass(frozen=True)
+class SweepVariant:
+    k: float
+    scale: float
+    initial_elo: float
+
+    @property
+    def label(self) -> str:
+        return f"k{_fmt(self.k)}-s{_fmt(self.scale)}-i{_fmt(self.initial_elo)}"
+
+
+@dataclass(frozen=True)
+class PreparedRace:
+    drivers: Tuple[int, ...]  # indices into the sweep's driver id list
+    ordinals: Tuple[int, ...]  # tie-group ordinal per driver (lower is better)
+
+
+@dataclass
+class SweepResult:
+    variants: List[SweepVariant]
+    driver_ids: List[str]
+    log_loss_sum: List[float]  # per variant, over every driver pair of every race
+    pairs: int
+    final_ratings: List[List[float]]  # [variant][driver]
+
+    def log_loss(self, v: int) -> float:
+        return self.log_loss_sum[v] / self.pairs if self.pairs else float("nan")
+
+
+def build_grid(
+    ks: Iterable[float],
+    scales: Iterable[float],
+    initial_elos: Iterable[float],
+) -> List[SweepVariant]:
+    return [SweepVariant(k, s, i) for k, s, i in itertools.product(ks, scales, initial_elos)]
+
+
+def prepare_races(snapshot: F1dbSnapshot, races: Sequence[RaceMeta]) -> Tuple[List[str], List[PreparedRace]]:
+    """Parse and rank every race once, shared by all variants."""
+
+    ids = RaceIds()
+    # Only drivers of races that count (two or more starters) get an index.
+    driver_index: Dict[int, int] = {}
+    prepared: List[PreparedRace] = []
+    for meta in races:
+        race = load_race_data(snapshot, meta, ids)
+        if len(race) < 2:
+            continue
+        drivers = tuple(driver_index.setdefault(d, len(driver_index)) for d in race.driver)
+        prepared.append(PreparedRace(drivers=drivers, ordinals=tuple(race.ordinal)))
+    return [ids.drivers.values[d] for d in driver_index], prepared
+
+
+def _sweep_numpy(prepared: Sequence[PreparedRace], n_drivers: int, variants: Sequence[SweepVariant]):
+    k = np.array([v.k for v in variants])[:, None]
+    scale = np.array([v.scale for v in variants])[:, None, None]
+    ratings = np.repeat(np.array([v.initial_elo for v in variants])[:, None], n_drivers, axis=1)
+    loss = np.zeros(len(variants))
+    pairs = 0
+
+    for race in prepared:
+        idx = np.asarray(race.drivers)
+        g = np.asarray(race.ordinals)
+        n = len(idx)
+        r = ratings[:, idx]  # variants x n
+        # e[v, i, j]: expected score of i against j under variant v.
+        e = 1.0 / (1.0 + np.power(10.0, (r[:, None, :] - r[:, :, None]) / scale))
+        o = np.where(g[:, None] == g[None, :], 0.5, np.where(g[:, None] < g[None, :], 1.0, 0.0))
+        off_diag = ~np.eye(n, dtype=bool)
+
+        actual = (o * off_diag).sum(axis=1) / (n - 1)
+        expected = (e * off_diag).sum(axis=2) / (n - 1)
+        ratings[:, idx] = r + k * (actual[None, :] - expected)
+
+        iu, ju = np.triu_indices(n, k=1)
+        p = np.clip(e[:, iu, ju], LOG_LOSS_EPS, 1.0 - LOG_LOSS_EPS)
+        y = o[iu, ju]
+        loss -= (y * np.log(p) + (1.0 - y) * np.log(1.0 - p)).sum(axis=1)
+        pairs += len(iu)
+
+    return loss.tolist(), pairs, ratings.tolist()
+
+
+def _sweep_python(prepared: Sequence[PreparedRace], n_drivers: int, variants: Sequence[SweepVariant]):
+    losses: List[float] = []
+    finals: List[List[float]] = []
+    pairs = 0
+    for vi, v in enumerate(variants):
+        ratings = [v.initial_elo] * n_drivers
+        loss = 0.0
+        for race in prepared:
+            n = len(race.drivers)
+            r = [ratings[d] for d in race.drivers]
+            actual = [0.0] * n
+            expected = [0.0] * n
+            for i in range(n):
+                for j in range(i + 1, n):
+                    e = 1.0 / (1.0 + math.pow(10.0, (r[j] - r[i]) / v.scale))
+                    gi, gj = race.ordinals[i], race.ordinals[j]
+                    y = 0.5 if gi == gj else (1.0 if gi < gj else 0.0)
+                    expected[i] += e
+                    expected[j] += 1.0 - e
+                    actual[i] += y
+                    actual[j] += 1.0 - y
+                    p = min(max(e, LOG_LOSS_EPS), 1.0 - LOG_LOSS_EPS)
+                    loss -= y * math.log(p) + (1.0 - y) * math.log(1.0 - p)
+            for i, d in enumerate(race.drivers):
+                ratings[d] = r[i] + v.k * (actual[i] / (n - 1) - expected[i] / (n - 1))
+            if vi == 0:
+                pairs += n * (n - 1) // 2
+        losses.append(loss)
+        finals.append(ratings)
+    return losses, pairs, finals
+
+
+def run_sweep(
+    driver_ids: List[str],
+    prepared: Sequence[PreparedRace],
+    variants: Sequence[SweepVariant],
+    engine: str = "auto",
+) -> SweepResult:
+    """Replay the prepared races once for every variant at the same time.
+
+    The NumPy engine holds a (variants x drivers) rating matrix and updates
+    every variant of a race in one vectorized step; the Python engine loops
+    over variants and matches compute_course_update(engine="python")
+    exactly; the NumPy engine differs only in summation order (~1e-12).
+
+    The log-loss scores, before each race, the expected score of every
+    driver pair against its outcome (1, 0, or 0.5 for a tie).
+    """
+
+    if engine == "numpy" and not numpy_available():
+        raise ValueError("Moteur 'numpy' demandé mais NumPy n'est pas installé.")
+    use_numpy = engine != "python" and numpy_available()
+    sweep = _sweep_numpy if use_numpy else _sweep_python
+    loss, pairs, finals = sweep(prepared, len(driver_ids), variants)
+    return SweepResult(
+        variants=list(variants),
+        driver_ids=list(driver_ids),
+        log_loss_sum=loss,
+        pairs=pairs,
+        final_ratings=finals,
+    )
+
+
+def write_summary_csv(path: str, result: SweepResult, top: int = 3, names: Optional[Dict[str, str]] = None) -> None:
+    """One row per variant, best log-loss first, with its top-rated drivers."""
+
+    names = names or {}
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    order = sorted(range(len(result.variants)), key=result.log_loss)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(
+            ["variant", "label", "k", "scale", "initialElo", "logLoss", "pairs", "meanRating", "maxRating"]
+            + [f"top{i + 1}" for i in range(top)]
+        )
+        for v in order:
+            variant = result.variants[v]
+            ratings = result.final_ratings[v]
+            best = sorted(range(len(ratings)), key=lambda d: -ratings[d])[:top]
+            writer.writerow(
+                [
+                    v + 1,
+                    variant.label,
+                    _fmt(variant.k),
+                    _fmt(variant.scale),
+                    _fmt(variant.initial_elo),
+                    round(result.log_loss(v), 6),
+                    result.pairs,
+                    round(sum(ratings) / len(ratings), 6) if ratings else "",
+                    round(max(ratings), 6) if ratings else "",
+                ]
+                + [names.get(result.driver_ids[d], result.driver_ids[d]) for d in best]
+            )
+
+
+def write_final_ratings_csv(path: str, result: SweepResult, names: Optional[Dict[str, str]] = None) -> None:
+    """Final rating of every driver (rows) under every variant (columns)."""
+
+    names = names or {}
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["driverId", "driverName"] + [v.label for v in result.variants])
+        for d, driver_id in enumerate(result.driver_ids):
+            writer.writerow(
+                [driver_id, names.get(driver_id, driver_id)]
+                + [round(result.final_ratings[v][d], 6) for v in range(len(result.variants))]
+            )
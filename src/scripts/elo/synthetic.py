@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import datetime
+import os
+import random
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+import yaml
+
+
+# The C dumper is ~10x faster; large synthetic trees are mostly YAML output.
+_Dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+RACE_POINTS = (25, 18, 15, 12, 10, 8, 6, 4, 2, 1)
+GRAND_PRIX_IDS = (
+    "bahrain", "saudi-arabia", "australia", "japan", "china", "miami",
+    "emilia-romagna", "monaco", "canada", "spain", "austria", "great-britain",
+    "hungary", "belgium", "netherlands", "italy", "azerbaijan", "singapore",
+    "united-states", "mexico", "brazil", "las-vegas", "qatar", "abu-dhabi",
+)
+
+
+@dataclass(frozen=True)
+class SyntheticConfig:
+    """Shape of a synthetic f1db tree.
+
+    Each season keeps `driver_retention` of the previous field and fills the
+    rest with new drivers, so careers span several seasons like the real data.
+    Drivers have a hidden skill; finishing order is skill plus noise.
+    """
+
+    seasons: int = 20
+    first_year: int = 1950
+    races_per_season: int = 16
+    field_size: int = 22
+    drivers_per_team: int = 2
+    dnf_rate: float = 0.12
+    dsq_rate: float = 0.01
+    dns_rate: float = 0.01
+    driver_retention: float = 0.8
+    qualifying: bool = True
+    sprint_every: int = 0  # a sprint qualifying file every N rounds (0: never)
+    seed: int = 1
+
+
+def _dump(path: str, data: Any) -> int:
+    text = yaml.dump(data, Dumper=_Dumper, sort_keys=False, allow_unicode=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return len(text)
+
+
+def _race_results(rnd: random.Random, config: SyntheticConfig, field, skill, team_of) -> List[Dict[str, Any]]:
+    order = sorted(field, key=lambda d: skill[d] + rnd.gauss(0.0, 1.0), reverse=True)
+    laps_total = 50 + rnd.randint(0, 20)
+    finishers, retired, bottom = [], [], []
+    for d in order:
+        u = rnd.random()
+        if u < config.dns_rate:
+            bottom.append((d, "DNS", 0))
+        elif u < config.dns_rate + config.dsq_rate:
+            bottom.append((d, "DSQ", laps_total - rnd.randint(0, 3)))
+        elif u < config.dns_rate + config.dsq_rate + config.dnf_rate:
+            retired.append((d, "DNF", rnd.randint(0, laps_total - 1)))
+        else:
+            finishers.append(d)
+
+    rows = []
+    for p, d in enumerate(finishers, 1):
+        rows.append(
+            {
+                "position": p,
+                "driverId": d,
+                "constructorId": team_of[d],
+                "laps": laps_total,
+                "gridPosition": rnd.randint(1, len(field)),
+                "points": RACE_POINTS[p - 1] if p <= len(RACE_POINTS) else 0,
+            }
+        )
+    retired.sort(key=lambda t: -t[2])
+    for d, status, laps in retired + bottom:
+        rows.append(
+            {
+                "position": status,
+                "driverId": d,
+                "constructorId": team_of[d],
+                "laps": laps,
+                "gridPosition": rnd.randint(1, len(field)),
+                "points": 0,
+            }
+        )
+    return rows
+
+
+def _qualifying_results(rnd: random.Random, field, skill, team_of) -> List[Dict[str, Any]]:
+    order = sorted(field, key=lambda d: skill[d] + rnd.gauss(0.0, 0.7), reverse=True)
+    rows = []
+    for p, d in enumerate(order, 1):
+        row: Dict[str, Any] = {"position": p, "driverId": d, "constructorId": team_of[d]}
+        if p <= 10:
+            row["q3"] = f"1:{29 + p // 4}.{rnd.randint(0, 999):03d}"
+        rows.append(row)
+    return rows
+
+
+def write_synthetic_f1db(root: str, config: SyntheticConfig) -> Dict[str, int]:
+    """Write an f1db-shaped YAML tree under `root` (the f1db `src/data` dir).
+
+    Returns counts of what was written: drivers, constructors, races, files
+    and bytes.
+    """
+
+    rnd = random.Random(config.seed)
+    stats = {"drivers": 0, "constructors": 0, "races": 0, "files": 0, "bytes": 0}
+
+    def dump(path: str, data: Any) -> None:
+        stats["files"] += 1
+        stats["bytes"] += _dump(path, data)
+
+    n_teams = max(1, -(-config.field_size // config.drivers_per_team))
+    teams = [f"team-{i:03d}" for i in range(n_teams)]
+    os.makedirs(os.path.join(root, "constructors"), exist_ok=True)
+    for i, team in enumerate(teams):
+        dump(os.path.join(root, "constructors", f"{team}.yml"), {"id": team, "name": f"Team {i}"})
+    stats["constructors"] = n_teams
+
+    os.makedirs(os.path.join(root, "drivers"), exist_ok=True)
+    skill: Dict[str, float] = {}
+    field: List[str] = []
+
+    def new_driver(year: int) -> str:
+        driver_id = f"driver-{len(skill):05d}"
+        skill[driver_id] = rnd.gauss(0.0, 1.0)
+        birth = datetime.date(year - rnd.randint(19, 34), rnd.randint(1, 12), rnd.randint(1, 28))
+        dump(
+            os.path.join(root, "drivers", f"{driver_id}.yml"),
+            {"id": driver_id, "name": f"Driver {len(skill)}", "dateOfBirth": birth},
+        )
+        return driver_id
+
+    for year in range(config.first_year, config.first_year + config.seasons):
+        kept = [d for d in field if rnd.random() < config.driver_retention]
+        field = kept[: config.field_size]
+        while len(field) < config.field_size:
+            field.append(new_driver(year))
+        rnd.shuffle(field)
+        team_of = {d: teams[i // config.drivers_per_team] for i, d in enumerate(field)}
+
+        season_dir = os.path.join(root, "seasons", str(year))
+        driver_points: Dict[str, int] = {}
+        team_points: Dict[str, int] = {}
+        for rnum in range(1, config.races_per_season + 1):
+            gp = GRAND_PRIX_IDS[(rnum - 1) % len(GRAND_PRIX_IDS)]
+            if rnum > len(GRAND_PRIX_IDS):
+                gp = f"{gp}-{(rnum - 1) // len(GRAND_PRIX_IDS) + 1}"
+            race_dir = os.path.join(season_dir, "races", f"{rnum:02d}-{gp}")
+            os.makedirs(race_dir, exist_ok=True)
+            date = datetime.date(year, 1, 1) + datetime.timedelta(days=60 + rnum * 270 // config.races_per_season)
+            dump(
+                os.path.join(race_dir, "race.yml"),
+                {
+                    "round": rnum,
+                    "date": date,
+                    "grandPrixId": gp,
+                    "officialName": f"{year} {gp.replace('-', ' ').title()} Grand Prix",
+                },
+            )
+
+            results = _race_results(rnd, config, field, skill, team_of)
+            dump(os.path.join(race_dir, "race-results.yml"), results)
+            for row in results:
+                driver_points[row["driverId"]] = driver_points.get(row["driverId"], 0) + row["points"]
+                team_points[row["constructorId"]] = team_points.get(row["constructorId"], 0) + row["points"]
+
+            if config.qualifying:
+                dump(os.path.join(race_dir, "qualifying-results.yml"), _qualifying_results(rnd, field, skill, team_of))
+            if config.sprint_every and rnum % config.sprint_every == 0:
+                dump(
+                    os.path.join(race_dir, "sprint-qualifying-results.yml"),
+                    _qualifying_results(rnd, field, skill, team_of),
+                )
+            stats["races"] += 1
+
+        standings = sorted(driver_points.items(), key=lambda kv: (-kv[1], kv[0]))
+        dump(
+            os.path.join(season_dir, "driver-standings.yml"),
+            [{"position": i, "driverId": d, "points": p} for i, (d, p) in enumerate(standings, 1)],
+        )
+        standings = sorted(team_points.items(), key=lambda kv: (-kv[1], kv[0]))
+        dump(
+            os.path.join(season_dir, "constructor-standings.yml"),
+            [{"position": i, "constructorId": c, "points": p} for i, (c, p) in enumerate(standings, 1)],
+        )
+
+    stats["drivers"] = len(skill)
+    return stats
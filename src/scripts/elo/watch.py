@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Set, Tuple
+
+from .snapshot import scan_source_tree
+
+
+QUALIFYING_FILES = ("qualifying-results.yml", "sprint-qualifying-results.yml")
+
+
+class PollingWatcher:
+    """Detects changes to the f1db files used by the generators.
+
+    Plain stat() polling of the listing from scan_source_tree, so it needs
+    no OS-specific notification API; an unchanged tree costs one listdir
+    per race directory and one stat per file.
+    """
+
+    def __init__(self, yaml_dir: str):
+        self.yaml_dir = yaml_dir
+        self._stats = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        rel_paths, _ = scan_source_tree(self.yaml_dir)
+        stats: Dict[str, Tuple[int, int]] = {}
+        for rel in rel_paths:
+            try:
+                st = os.stat(os.path.join(self.yaml_dir, rel))
+            except OSError:
+                continue
+            stats[rel] = (st.st_size, st.st_mtime_ns)
+        return stats
+
+    def poll(self) -> List[str]:
+        """Relative paths added, modified or removed since the last poll."""
+
+        stats = self._scan()
+        changed = sorted(rel for rel in stats.keys() | self._stats.keys() if stats.get(rel) != self._stats.get(rel))
+        self._stats = stats
+        return changed
+
+    def wait_for_changes(self, *, interval: float, settle: float) -> List[str]:
+        """Block until something changes, then until the tree is quiet for `settle` seconds.
+
+        A git pull touches many files over a short time; waiting for it to
+        settle regenerates once per update instead of once per file.
+        """
+
+        changed: Set[str] = set()
+        while not changed:
+            time.sleep(interval)
+            changed.update(self.poll())
+        while True:
+            time.sleep(settle)
+            more = self.poll()
+            if not more:
+                return sorted(changed)
+            changed.update(more)
+
+
+@dataclass
+class AffectedOutputs:
+    """Outputs to regenerate after a set of f1db changes."""
+
+    qualifications: Set[str] = field(default_factory=set)  # years
+    deuxieme_pilote: Set[str] = field(default_factory=set)  # years, annual and per race
+    historique: bool = False
+    elo: bool = False
+    champions: bool = False
+
+    def __bool__(self) -> bool:
+        return bool(self.qualifications or self.deuxieme_pilote or self.historique or self.elo or self.champions)
+
+    def describe(self) -> str:
+        parts = []
+        if self.qualifications:
+            parts.append(f"qualifications {','.join(sorted(self.qualifications))}")
+        if self.deuxieme_pilote:
+            parts.append(f"deuxième pilote {','.join(sorted(self.deuxieme_pilote))}")
+        parts.extend(name for name in ("historique", "elo", "champions") if getattr(self, name))
+        return ", ".join(parts) or "aucune sortie"
+
+
+def affected_outputs(changed: Iterable[str], years: Iterable[str]) -> AffectedOutputs:
+    """Map changed paths (relative to the YAML root) to the outputs they feed.
+
+    A race's results feed its season's deuxieme_pilote files and the ELO
+    from that race on (the ELO run itself resumes from the last valid
+    season checkpoint); qualifying results only their season's
+    qualifications; standings the historique. Everything feeds champions.
+    Driver and constructor files carry the names, so they affect all years.
+    """
+
+    out = AffectedOutputs()
+    for rel in changed:
+        parts = rel.split("/")
+        if parts[0] in ("drivers", "constructors"):
+            all_years = set(years)
+            out.qualifications |= all_years
+            out.deuxieme_pilote |= all_years
+            out.historique = out.elo = out.champions = True
+            continue
+        if parts[0] != "seasons" or len(parts) < 3:
+            continue
+
+        year, name = parts[1], parts[-1]
+        out.champions = True
+        if len(parts) == 3:
+            if name == "driver-standings.yml":
+                out.historique = True
+        elif name in QUALIFYING_FILES:
+            out.qualifications.add(year)
+        elif name == "race-results.yml":
+            out.deuxieme_pilote.add(year)
+            out.elo = True
+        elif name == "race.yml":
+            out.elo = True
+    return out
@@ -2,80 +2,132 @@ from __future__ import annotations
 
 import argparse
 import csv
-import glob
+import itertools
 import os
-from dataclasses import dataclass
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import yaml
 
+import generate_deuxieme_pilote
+import generate_qualifications
+from elo import qualifications
+from elo.champions import (
+    SEASON_CHAMPIONS_FILENAME,
+    SeasonResults,
+    champions_table,
+    load_season_champions,
+    write_champions_csv,
+)
+from elo.deuxieme_pilote import deuxieme_pilote_table
+from elo.output import take_output_stats
+from elo.profiling import add_profile_arguments, profiler_from_args
+from elo.snapshot import F1dbSnapshot, load_snapshot
 
-def parse_year_dirs(docs_data_dir: str) -> List[int]:
-    years: List[int] = []
-    for path in glob.glob(os.path.join(docs_data_dir, "[0-9][0-9][0-9][0-9]")):
-        base = os.path.basename(path)
-        try:
-            years.append(int(base))
-        except Exception:
-            continue
-    return sorted(set(years))
 
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
-def load_yaml(path: str):
-    with open(path, "r", encoding="utf-8") as f:
+
+def load_config(config_path: str) -> dict:
+    with open(config_path, "r", encoding="utf-8") as f:
         return yaml.safe_load(f)
 
 
-def load_id_name_map(dir_path: str) -> Dict[str, str]:
-    out: Dict[str, str] = {}
-    for path in glob.glob(os.path.join(dir_path, "*.yml")):
-        try:
-            data = load_yaml(path) or {}
-        except Exception:
-            continue
-        item_id = (data.get("id") or "").strip()
-        name = (data.get("name") or "").strip()
-        if item_id and name:
-            out[item_id] = name
-    return out
+def load_elo_champions(elo_output_dir: str) -> Dict[int, Tuple[str, float]]:
+    """Season champions written by the last generate_elo_pilotes run."""
+
+    path = os.path.join(elo_output_dir, SEASON_CHAMPIONS_FILENAME)
+    champions = load_season_champions(path)
+    if champions is None:
+        raise SystemExit(f"Champions ELO introuvables: {path} (lancer generate_elo_pilotes.py).")
+    return champions
+
+
+def upstream_table(path: str, hash_path: str, source_hash: Optional[str], script_hash: Optional[str]):
+    """Header and first ranked row of a table written by an upstream stage.
 
+    None unless its .hash file shows it was computed from the current
+    sources by the current code.
+    """
 
-def find_position_one_id(rows, key: str) -> Optional[str]:
-    if not isinstance(rows, list):
+    if source_hash is None or script_hash is None:
         return None
-    for r in rows:
-        if not isinstance(r, dict):
-            continue
-        if r.get("position") == 1:
-            v = r.get(key)
-            if isinstance(v, str) and v.strip():
-                return v.strip()
-    # fallback: some files might omit position typing or be sorted
-    if rows and isinstance(rows[0], dict):
-        v = rows[0].get(key)
-        if isinstance(v, str) and v.strip():
-            return v.strip()
-    return None
-
-
-def read_first_value(csv_path: str, column_name: str) -> str:
     try:
-        with open(csv_path, "r", encoding="utf-8", newline="") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                v = (row.get(column_name) or "").strip()
-                if v:
-                    return v
-                return ""
-    except Exception:
-        return ""
+        with open(hash_path, "r", encoding="utf-8") as f:
+            hashes = yaml.safe_load(f) or {}
+        if hashes.get("source_hash") != source_hash or hashes.get("script_hash") != script_hash:
+            return None
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            return list(itertools.islice(csv.reader(f), 2))
+    except (OSError, yaml.YAMLError):
+        return None
+
+
+def collect_season_results(
+    snapshot: F1dbSnapshot,
+    years: List[int],
+    *,
+    docs_data_dir: str,
+    qualifications_config: dict,
+    deuxieme_pilote_config: dict,
+    driver_id_to_name: Dict[str, str],
+    constructor_id_to_name: Dict[str, str],
+    elo_champions: Dict[int, Tuple[str, float]],
+) -> List[SeasonResults]:
+    """Season results as produced by the qualifications and deuxieme_pilote stages.
+
+    Each year's docs/data/<year>/qualifications.csv and deuxieme_pilote.csv
+    is used when up to date (only its first ranked row is read); a table
+    that is missing or stale is computed here with the generators' own
+    functions instead.
+    """
+
+    qualifications_hash = generate_qualifications.compute_script_hash()
+    deuxieme_pilote_hash = generate_deuxieme_pilote.compute_script_hash()
+
+    qualifications_by_year: Dict[int, Any] = {}
+    deuxieme_pilote_by_year: Dict[int, Any] = {}
+    for year in years:
+        year_dir = os.path.join(docs_data_dir, str(year))
+        path = os.path.join(year_dir, "qualifications.csv")
+        qualifications_by_year[year] = upstream_table(
+            path,
+            f"{path}.hash",
+            generate_qualifications.calculate_source_hash(snapshot, year),
+            qualifications_hash,
+        )
+        deuxieme_pilote_by_year[year] = upstream_table(
+            os.path.join(year_dir, "deuxieme_pilote.csv"),
+            os.path.join(year_dir, "deuxieme_pilote.hash"),
+            generate_deuxieme_pilote.calculate_source_hash(snapshot, year),
+            deuxieme_pilote_hash,
+        )
+
+    missing = [year for year in years if qualifications_by_year[year] is None]
+    years_sessions = [(year, qualifications.year_sessions(snapshot, year)) for year in missing]
+    qualifications_by_year.update(
+        qualifications.qualifications_tables(years_sessions, qualifications_config, driver_id_to_name)
+    )
+    for year in years:
+        if deuxieme_pilote_by_year[year] is None:
+            deuxieme_pilote_by_year[year] = deuxieme_pilote_table(
+                snapshot, year, deuxieme_pilote_config, constructor_id_to_name
+            )
+    return [
+        SeasonResults(
+            year=year,
+            qualifications=qualifications_by_year[year],
+            deuxieme_pilote=deuxieme_pilote_by_year[year],
+            elo_champion=elo_champions.get(year),
+        )
+        for year in years
+    ]
 
 
 def main(argv: List[str]) -> int:
     parser = argparse.ArgumentParser(
         description=(
             "Génère un tableau des champions par année: "
-            "champion pilote/constructeur officiels (f1db) + champions calculés (qualifs, 2e pilote)."
+            "champion pilote/constructeur officiels (f1db) + champions calculés (qualifs, 2e pilote, ELO)."
         )
     )
     parser.add_argument(
@@ -86,15 +138,17 @@ def main(argv: List[str]) -> int:
     parser.add_argument(
         "--docs-data-dir",
         default="docs/data",
-        help="Chemin vers docs/data (défaut: docs/data).",
+        help="Chemin vers docs/data, dont elo/ pour les champions ELO (défaut: docs/data).",
     )
     parser.add_argument(
         "--out",
         default="docs/data/champions.csv",
         help="Fichier de sortie CSV (défaut: docs/data/champions.csv).",
     )
+    add_profile_arguments(parser)
 
     args = parser.parse_args(argv)
+    profiler = profiler_from_args("champions", args)
 
     base_dir = os.getcwd()
     yaml_dir = args.yaml_dir
@@ -108,68 +162,40 @@ def main(argv: List[str]) -> int:
     if not os.path.isabs(out_file):
         out_file = os.path.normpath(os.path.join(base_dir, out_file))
 
-    years = parse_year_dirs(docs_data_dir)
-    if not years:
-        raise SystemExit(f"Aucune année trouvée dans {docs_data_dir}")
-
-    driver_names = load_id_name_map(os.path.join(yaml_dir, "drivers"))
-    constructor_names = load_id_name_map(os.path.join(yaml_dir, "constructors"))
-
-    rows_out: List[List[str]] = []
-
-    for year in years:
-        season_dir = os.path.join(yaml_dir, "seasons", str(year))
-        driver_standings_path = os.path.join(season_dir, "driver-standings.yml")
-        constructor_standings_path = os.path.join(season_dir, "constructor-standings.yml")
-
-        champion_driver = ""
-        if os.path.exists(driver_standings_path):
-            data = load_yaml(driver_standings_path)
-            driver_id = find_position_one_id(data, "driverId")
-            if driver_id:
-                champion_driver = driver_names.get(driver_id, driver_id)
-
-        champion_constructor = ""
-        if os.path.exists(constructor_standings_path):
-            data = load_yaml(constructor_standings_path)
-            constructor_id = find_position_one_id(data, "constructorId")
-            if constructor_id:
-                champion_constructor = constructor_names.get(constructor_id, constructor_id)
-
-        qualif_path = os.path.join(docs_data_dir, str(year), "qualifications.csv")
-        champion_qualif = read_first_value(qualif_path, "Pilote") if os.path.exists(qualif_path) else ""
-
-        deuxieme_path = os.path.join(docs_data_dir, str(year), "deuxieme_pilote.csv")
-        champion_deuxieme_constructor = (
-            read_first_value(deuxieme_path, "Équipe") if os.path.exists(deuxieme_path) else ""
-        )
-
-        rows_out.append(
-            [
-                str(year),
-                champion_driver,
-                champion_constructor,
-                champion_qualif,
-                champion_deuxieme_constructor,
-            ]
-        )
-
-    os.makedirs(os.path.dirname(out_file), exist_ok=True)
-    with open(out_file, "w", encoding="utf-8", newline="") as f:
-        w = csv.writer(f)
-        w.writerow(
-            [
-                "année",
-                "champion pilote",
-                "champion constructeur",
-                "champion qualif",
-                "champion constructeur 2eme pilote",
-            ]
-        )
-        w.writerows(rows_out)
-
-    print(f"Champions générés: {out_file} ({len(rows_out)} années)")
-    return 0
+    try:
+        with profiler.stage("snapshot"):
+            snapshot = load_snapshot(yaml_dir)
+            driver_id_to_name = snapshot.driver_names()
+            constructor_id_to_name = snapshot.constructor_names()
+        years = [int(year) for year in snapshot.years() if snapshot.race_dirs(year)]
+        if not years:
+            raise SystemExit(f"Aucune année trouvée dans {yaml_dir}")
+
+        with profiler.stage("build"):
+            seasons = collect_season_results(
+                snapshot,
+                years,
+                docs_data_dir=docs_data_dir,
+                qualifications_config=load_config(os.path.join(SCRIPT_DIR, "config", "qualifications_points.json")),
+                deuxieme_pilote_config=load_config(os.path.join(SCRIPT_DIR, "config", "deuxieme_pilote_points.json")),
+                driver_id_to_name=driver_id_to_name,
+                constructor_id_to_name=constructor_id_to_name,
+                elo_champions=load_elo_champions(os.path.join(docs_data_dir, "elo")),
+            )
+            rows = champions_table(
+                snapshot,
+                seasons,
+                driver_id_to_name=driver_id_to_name,
+                constructor_id_to_name=constructor_id_to_name,
+            )
+
+        with profiler.stage("write"):
+            write_champions_csv(out_file, rows)
+
+        print(f"Champions générés: {out_file} ({len(seasons)} années, {take_output_stats().summary()})")
+        return 0
+    finally:
+        profiler.finish()
 
 
 if __name__ == "__main__":
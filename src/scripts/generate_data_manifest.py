@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from typing import List
+
+from elo.data_manifest import DATA_MANIFEST_FILENAME, write_data_manifest
+from elo.output import take_output_stats
+from elo.profiling import add_profile_arguments, profiler_from_args
+
+
+def resolve_from_script_dir(path: str) -> str:
+    if os.path.isabs(path):
+        return path
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.normpath(os.path.join(script_dir, path))
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Écrit docs/data/manifest.json et un manifeste par dossier "
+            "(docs/data/manifests/<dossier>.json) : le hash du contenu de chaque fichier de "
+            "données, que les pages ajoutent à l'URL (?v=<hash>) pour profiter du cache "
+            "du navigateur. À lancer après les scripts generate_*."
+        )
+    )
+    parser.add_argument(
+        "--docs-data-dir",
+        default="../../docs/data",
+        help="Chemin vers docs/data (défaut: ../../docs/data).",
+    )
+    add_profile_arguments(parser)
+
+    args = parser.parse_args(argv)
+    profiler = profiler_from_args("data_manifest", args)
+
+    data_dir = resolve_from_script_dir(args.docs_data_dir)
+    if not os.path.isdir(data_dir):
+        print(f"Dossier introuvable: {data_dir}", file=sys.stderr)
+        return 2
+
+    started = time.perf_counter()
+    try:
+        with profiler.stage("write_manifest"):
+            count = write_data_manifest(data_dir)
+    finally:
+        profiler.finish()
+    print(
+        f"Manifeste des données: {os.path.join(data_dir, DATA_MANIFEST_FILENAME)} "
+        f"({count} fichiers, {take_output_stats().summary()}, {time.perf_counter() - started:.2f}s)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -1,15 +1,14 @@
 import yaml
 import csv
+import json
 import os
-import glob
+import sys
 import hashlib
 from collections import defaultdict
 
-def load_yaml(file_path):
-    if not os.path.exists(file_path):
-        return None
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return yaml.safe_load(f)
+from elo.output import open_output, take_output_stats
+from elo.profiling import profiler_from_argv
+from elo.snapshot import load_snapshot
 
 def get_file_hash(file_path):
     if not os.path.exists(file_path):
@@ -18,14 +17,6 @@ def get_file_hash(file_path):
         file_content = f.read()
         return hashlib.sha256(file_content).hexdigest()
 
-def get_available_years(yaml_dir):
-    seasons_dir = f"{yaml_dir}/seasons"
-    if not os.path.exists(seasons_dir):
-        print(f"Erreur : Le dossier {seasons_dir} n'existe pas.")
-        return []
-
-    return sorted([d for d in os.listdir(seasons_dir) if os.path.isdir(os.path.join(seasons_dir, d)) and d.isdigit()])
-
 def is_numeric_position(position):
     try:
         int(position)
@@ -39,27 +30,14 @@ def load_previous_hashes(output_hash_file):
             return yaml.safe_load(f) or {}
     return {}
 
-def collect_source_hashes(races_dir, circuits):
+def collect_source_hashes(snapshot, year, circuits):
     source_hashes = []
     for circuit in circuits:
-        circuit_dir = f"{races_dir}/{circuit}"
-        race_file = f"{circuit_dir}/race-results.yml"
-        if os.path.exists(race_file):
-            file_hash = get_file_hash(race_file)
-            if file_hash:
-                source_hashes.append(file_hash)
+        file_hash = snapshot.race_file_hash(year, circuit, 'race-results.yml')
+        if file_hash:
+            source_hashes.append(file_hash)
     return hashlib.sha256(''.join(source_hashes).encode()).hexdigest() if source_hashes else None
 
-def load_names(yaml_dir, entity):
-    dir_path = f"{yaml_dir}/{entity}"
-    id_to_name = {}
-    for file in glob.glob(f"{dir_path}/*.yml"):
-        entity_id = os.path.basename(file).replace('.yml', '')
-        data = load_yaml(file)
-        if data:
-            id_to_name[entity_id] = data.get('name', entity_id)
-    return id_to_name
-
 def process_race_results(race_data):
     team_drivers = defaultdict(list)
     for result in race_data:
@@ -97,7 +75,7 @@ def assign_points(sorted_teams, config):
 
 def write_csv(output_file, sorted_teams, team_points, teams_with_second_driver, team_drivers, constructor_id_to_name, driver_id_to_name):
     os.makedirs(os.path.dirname(output_file), exist_ok=True)
-    with open(output_file, 'w', newline='', encoding='utf-8') as f:
+    with open_output(output_file) as f:
         writer = csv.writer(f)
         writer.writerow(['Équipe', 'Rang', 'Points', 'Deuxième Pilote', 'Position du Deuxième Pilote', 'Premier Pilote', 'Position du Premier Pilote'])
         for rank, (constructor_id, positions) in enumerate(sorted_teams, start=1):
@@ -118,37 +96,50 @@ def write_csv(output_file, sorted_teams, team_points, teams_with_second_driver,
                 first_driver_name = driver_id_to_name.get(driver_id, driver_id)
                 writer.writerow([constructor_name, rank, points, '', '', first_driver_name, first_driver_position])
 
-def save_hash(output_hash_file, source_hash):
-    with open(output_hash_file, 'w') as f:
-        yaml.safe_dump({'source_hash': source_hash}, f)
-
-def generate_deuxieme_pilote_par_course(yaml_dir, year, config, output_dir):
-    output_file = f"{output_dir}/{year}.csv"
-    output_hash_file = f"{output_dir}/{year}.hash"
-    races_dir = f"{yaml_dir}/seasons/{year}/races"
-    if not os.path.exists(races_dir):
-        print(f"Erreur : Le dossier {races_dir} n'existe pas.")
-        return
+def save_hash(output_hash_file, source_hash, script_hash):
+    with open_output(output_hash_file) as f:
+        yaml.safe_dump({'source_hash': source_hash, 'script_hash': script_hash}, f)
+
+def write_index(index_file, year, races):
+    # Index compact de l'année : une entrée par course écrite
+    with open_output(index_file) as f:
+        json.dump({'year': int(year), 'races': races}, f, ensure_ascii=False, separators=(',', ':'))
+
+def remove_stale_files(year_dir, legacy_files, kept_files):
+    # Ancien format ({year}.csv et {year}.hash hors du dossier) et courses disparues de f1db
+    for legacy_file in legacy_files:
+        if os.path.exists(legacy_file):
+            os.remove(legacy_file)
+    for name in os.listdir(year_dir):
+        if name.endswith('.csv') and name not in kept_files:
+            os.remove(os.path.join(year_dir, name))
+
+def generate_deuxieme_pilote_par_course(snapshot, year, config, output_dir, script_hash, constructor_id_to_name, driver_id_to_name):
+    year_dir = f"{output_dir}/{year}"
+    index_file = f"{year_dir}/index.json"
+    # Dans le dossier de l'année : le supprimer ou le remplacer emporte le hash
+    output_hash_file = f"{index_file}.hash"
+    circuits = snapshot.race_dirs(year)
+    if not circuits:
+        print(f"Erreur : Aucune course trouvée pour {year}.")
+        return False
 
-    circuits = sorted(os.listdir(races_dir))
-    source_hash = collect_source_hashes(races_dir, circuits)
+    source_hash = collect_source_hashes(snapshot, year, circuits)
     previous_hashes = load_previous_hashes(output_hash_file)
 
-    if os.path.exists(output_file) and os.path.exists(output_hash_file):
-        if previous_hashes.get('source_hash') == source_hash:
-            return
-
-    constructor_id_to_name = load_names(yaml_dir, "constructors")
-    driver_id_to_name = load_names(yaml_dir, "drivers")
+    if os.path.exists(index_file) and os.path.exists(output_hash_file):
+        if previous_hashes.get('source_hash') == source_hash and previous_hashes.get('script_hash') == script_hash:
+            return False
 
+    # Un fichier par course, chacun écrit une seule fois
+    races = []
     for circuit in circuits:
-        circuit_dir = f"{races_dir}/{circuit}"
-        race_file = f"{circuit_dir}/race-results.yml"
-        if not os.path.exists(race_file):
+        race_file = f"seasons/{year}/races/{circuit}/race-results.yml"
+        if not snapshot.has_race_file(year, circuit, 'race-results.yml'):
             print(f"Fichier non trouvé : {race_file}")
             continue
         try:
-            race_data = load_yaml(race_file)
+            race_data = snapshot.race_file(year, circuit, 'race-results.yml')
             if not race_data:
                 print(f"Aucune donnée valide dans {race_file}")
                 continue
@@ -156,11 +147,19 @@ def generate_deuxieme_pilote_par_course(yaml_dir, year, config, output_dir):
             teams_with_second_driver, teams_with_single_driver = classify_teams(team_drivers)
             sorted_teams = sort_teams(teams_with_second_driver, teams_with_single_driver)
             team_points = assign_points(sorted_teams, config)
-            write_csv(output_file, sorted_teams, team_points, teams_with_second_driver, team_drivers, constructor_id_to_name, driver_id_to_name)
-            save_hash(output_hash_file, source_hash)
+            write_csv(f"{year_dir}/{circuit}.csv", sorted_teams, team_points, teams_with_second_driver, team_drivers, constructor_id_to_name, driver_id_to_name)
+            races.append({'race': circuit, 'file': f"{circuit}.csv", 'teams': len(sorted_teams)})
         except Exception as e:
             print(f"Erreur lors du traitement de {race_file}: {e}")
 
+    os.makedirs(year_dir, exist_ok=True)
+    remove_stale_files(
+        year_dir, [f"{output_dir}/{year}.csv", f"{output_dir}/{year}.hash"], {race['file'] for race in races}
+    )
+    write_index(index_file, year, races)
+    save_hash(output_hash_file, source_hash, script_hash)
+    return True
+
 if __name__ == "__main__":
     yaml_dir = "../../data/f1db/src/data"  # Chemin mis à jour
     config_path = "./config/deuxieme_pilote_points.json"
@@ -170,8 +169,15 @@ if __name__ == "__main__":
     with open(config_path, 'r') as f:
         config = yaml.safe_load(f)
 
+    # Profilage optionnel (--profile [fichier.json])
+    profiler = profiler_from_argv("deuxieme_pilote_par_course", sys.argv[1:])
+
+    # Charger le snapshot f1db (compilé une seule fois pour tous les scripts)
+    with profiler.stage("snapshot"):
+        snapshot = load_snapshot(yaml_dir)
+
     # Obtenir toutes les années disponibles
-    available_years = get_available_years(yaml_dir)
+    available_years = snapshot.years()
     print(f"Années disponibles : {available_years}")
 
     # Vérifier si le script a changé
@@ -180,10 +186,18 @@ if __name__ == "__main__":
         print("Erreur : Impossible de calculer le hash du script.")
         exit(1)
 
-    for year in available_years:
-        before = os.path.exists(f"{output_dir}/{year}.csv")
-        generate_deuxieme_pilote_par_course(yaml_dir, year, config, output_dir)
-        after = os.path.exists(f"{output_dir}/{year}.csv")
-        # Afficher le log uniquement si le fichier a été généré ou modifié
-        if not before or (before and not os.path.exists(f"{output_dir}/{year}.hash")):
-            print(f"Classements des deuxièmes pilotes par course générés pour {year}")
+    # Noms des constructeurs et des pilotes chargés une seule fois
+    constructor_id_to_name = snapshot.constructor_names()
+    driver_id_to_name = snapshot.driver_names()
+
+    with profiler.stage("generate"):
+        for year in available_years:
+            generated = generate_deuxieme_pilote_par_course(
+                snapshot, year, config, output_dir, script_hash, constructor_id_to_name, driver_id_to_name
+            )
+            # Afficher le log uniquement si l'année a été régénérée
+            if generated:
+                profiler.count("years_generated")
+                print(f"Classements des deuxièmes pilotes par course générés pour {year}")
+    print(f"Résumé : {take_output_stats().summary()}.")
+    profiler.finish()
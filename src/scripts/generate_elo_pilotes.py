@@ -1,25 +1,59 @@
 from __future__ import annotations
 
 import argparse
-import json
+import datetime
+import glob
 import os
 import sys
 import yaml
 from collections import defaultdict
-from typing import Dict, Iterable, List, Optional
-
-from elo.csv_out import write_driver_csv, write_race_csv
-from elo.elo_math import compute_course_update
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from elo.bundle import BUNDLE_FILENAME, EloHistoryBundle
+from elo.by_age import ELO_BY_AGE_FILENAME, EloByAge, load_driver_birth_dates
+from elo.champions import SEASON_CHAMPIONS_FILENAME, write_season_champions
+from elo.chart_series import build_chart_series, write_chart_series
+from elo.checkpoints import (
+    EloCheckpoints,
+    RaceRecord,
+    SeasonCheckpoint,
+    default_checkpoint_path,
+    driver_outputs_match,
+    first_changed_race,
+    load_checkpoints,
+    race_key,
+    race_source_hash,
+    resume_checkpoint_index,
+    save_checkpoints,
+    season_champion,
+)
+from elo.csv_out import DriverCsvWriter, write_race_csv
+from elo.elo_math import ENGINES, EloResultRow, compute_course_update
 from elo.f1db_io import (
     compute_source_hash,
     get_available_years,
     get_file_hash,
     iter_races,
+    load_race_data,
+    sha256_of_text,
     load_constructor_names,
     load_driver_names,
-    load_race_data,
+    parse_race_rows,
 )
-from elo.ranking import dedupe_best_by_driver, rank_entries
+from elo.leaderboard import ACTIVE_DAYS, LEADERBOARD_FILENAME, build_leaderboards, write_leaderboards
+from elo.output import OutputSink, open_output, take_output_stats
+from elo.profiling import add_profile_arguments, get_profiler, profiler_from_args
+from elo.race_index import write_index
+from elo.ranking import RaceArrays, RaceIds, rank_race
+from elo.season_states import (
+    SeasonStates,
+    chain_hash,
+    default_season_states_path,
+    load_season_states,
+    save_season_states,
+)
+from elo.snapshot import F1dbSnapshot, load_snapshot
 
 
 def load_config(config_path: str) -> dict:
@@ -27,8 +61,8 @@ def load_config(config_path: str) -> dict:
         return yaml.safe_load(f) or {}
 
 
-def parse_years_arg(years_arg: Optional[str], yaml_dir: str) -> List[int]:
-    available = [int(y) for y in get_available_years(yaml_dir)]
+def parse_years_arg(years_arg: Optional[str], snapshot: F1dbSnapshot) -> List[int]:
+    available = [int(y) for y in get_available_years(snapshot)]
     if not years_arg:
         return available
 
@@ -56,6 +90,9 @@ def should_use_cache(hash_file: str, expected: dict, output_root: str) -> bool:
         return False
     if not os.path.exists(output_root):
         return False
+    # Read by generate_champions_table: a run must not be skipped without it.
+    if not os.path.exists(f"{output_root}/{SEASON_CHAMPIONS_FILENAME}"):
+        return False
 
     try:
         with open(hash_file, "r", encoding="utf-8") as f:
@@ -67,8 +104,7 @@ def should_use_cache(hash_file: str, expected: dict, output_root: str) -> bool:
 
 
 def save_cache(hash_file: str, value: dict) -> None:
-    os.makedirs(os.path.dirname(hash_file), exist_ok=True)
-    with open(hash_file, "w", encoding="utf-8") as f:
+    with open_output(hash_file) as f:
         yaml.safe_dump(value, f)
 
 
@@ -86,59 +122,150 @@ def build_cache_value(
     k: float,
     initial_elo: float,
     years: List[int],
+    scale: float = 400.0,
 ) -> dict:
     return {
         "source_hash": source_hash,
         "script_hash": script_hash,
         "k": k,
         "initial_elo": initial_elo,
+        "scale": scale,
         "years": years,
     }
 
 
+def compute_code_hash() -> str:
+    """Hash of this script and the elo package, which shape every output."""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    paths = [os.path.abspath(__file__)] + sorted(glob.glob(os.path.join(script_dir, "elo", "*.py")))
+    return sha256_of_text(":".join(get_file_hash(p) or "" for p in paths))
+
+
+def build_checkpoint_params(
+    *,
+    snapshot: F1dbSnapshot,
+    code_hash: str,
+    k: float,
+    initial_elo: float,
+    years: List[int],
+    scale: float = 400.0,
+    seeds: Optional[Dict[int, str]] = None,
+) -> Dict[str, object]:
+    # Driver and constructor names are baked into already-written rows, so
+    # any change there invalidates every checkpoint.
+    names_hash = sha256_of_text(
+        ":".join(
+            f"{rel}={h}"
+            for rel, h in sorted(snapshot.file_hashes.items())
+            if rel.startswith(("drivers/", "constructors/"))
+        )
+    )
+    return {
+        "code_hash": code_hash,
+        "names_hash": names_hash,
+        "k": k,
+        "initial_elo": initial_elo,
+        "scale": scale,
+        "years": list(years),
+        "seeds": dict(seeds or {}),
+    }
+
+
+def build_rating_params(*, code_hash: str, k: float, initial_elo: float, scale: float = 400.0) -> Dict[str, object]:
+    # What the ratings alone depend on, for the season states shared by runs.
+    return {"code_hash": code_hash, "k": k, "initial_elo": initial_elo, "scale": scale}
+
+
+def rate_race(
+    *,
+    snapshot: F1dbSnapshot,
+    meta,
+    ratings: Dict[str, float],
+    k: float,
+    initial_elo: float,
+    engine: str = "auto",
+    scale: float = 400.0,
+    ids: Optional[RaceIds] = None,
+) -> Tuple[RaceArrays, Dict[str, EloResultRow]]:
+    """Rank one race and update `ratings` in place."""
+
+    profiler = get_profiler()
+    with profiler.stage("load_race_data"):
+        rows = parse_race_rows(snapshot, meta)
+    with profiler.stage("rank_race"):
+        race = rank_race(rows, ids)
+
+    for d in race.driver_ids():
+        ratings.setdefault(d, initial_elo)
+
+    with profiler.stage("compute_course_update"):
+        elo_rows, _ = compute_course_update(race, ratings, k=k, engine=engine, scale=scale)
+    return race, elo_rows
+
+
 def process_one_race(
     *,
-    yaml_dir: str,
+    snapshot: F1dbSnapshot,
     meta,
     career_race_number: int,
+    race_index: int,
     ratings: Dict[str, float],
-    driver_rows: Dict[str, List[dict]],
+    driver_csv: DriverCsvWriter,
     races_by_year: Dict[int, List[dict]],
     driver_id_to_name: Dict[str, str],
     constructor_id_to_name: Dict[str, str],
     output_root: str,
     k: float,
     initial_elo: float,
-) -> None:
-    race_data = load_race_data(yaml_dir, meta)
-    entries = dedupe_best_by_driver(race_data.entries)
-    ranked = rank_entries(entries)
-
-    for re in ranked:
-        ratings.setdefault(re.entry.driver_id, initial_elo)
-
-    elo_rows, _ = compute_course_update(ranked, ratings, k=k)
+    engine: str = "auto",
+    history: Optional[EloHistoryBundle] = None,
+    scale: float = 400.0,
+    ids: Optional[RaceIds] = None,
+    by_age: Optional[EloByAge] = None,
+    sink: Optional[OutputSink] = None,
+) -> List[str]:
+    """Rate one race, write its race CSV and append its driver rows.
+
+    `race_index` is the race's 0-based position in the run (its row in the
+    history bundle). Returns the ids of the drivers rated in this race.
+    """
+
+    profiler = get_profiler()
+    profiler.count("races_processed")
+    race, elo_rows = rate_race(
+        snapshot=snapshot,
+        meta=meta,
+        ratings=ratings,
+        k=k,
+        initial_elo=initial_elo,
+        engine=engine,
+        scale=scale,
+        ids=ids,
+    )
+    driver_ids = race.driver_ids()
 
     race_filename = f"{meta.round:02d}-{meta.grand_prix_id or meta.race_dir_name}.csv"
     race_out = (
         f"{output_root}/races/{meta.year}/{meta.round:02d}-"
         f"{meta.grand_prix_id or meta.race_dir_name}.csv"
     )
-    write_race_csv(
-        race_out,
-        meta={
-            "year": meta.year,
-            "round": meta.round,
-            "date": meta.date,
-            "grandPrixId": meta.grand_prix_id,
-            "officialName": meta.official_name,
-            "careerRaceNumber": career_race_number,
-        },
-        ranked_entries=ranked,
-        driver_id_to_name=driver_id_to_name,
-        elo_rows=elo_rows,
-        k_used=k,
-    )
+    with profiler.stage("write_race_csv"):
+        write_race_csv(
+            race_out,
+            meta={
+                "year": meta.year,
+                "round": meta.round,
+                "date": meta.date,
+                "grandPrixId": meta.grand_prix_id,
+                "officialName": meta.official_name,
+                "careerRaceNumber": career_race_number,
+            },
+            race=race,
+            driver_id_to_name=driver_id_to_name,
+            elo_rows=elo_rows,
+            k_used=k,
+            sink=sink,
+        )
 
     races_by_year[meta.year].append(
         {
@@ -152,92 +279,389 @@ def process_one_race(
         }
     )
 
-    n = len(ranked)
-    for re in ranked:
-        d = re.entry.driver_id
-        er = elo_rows.get(d)
-        if er is None:
+    n = len(race)
+    with profiler.stage("write_driver_csv"):
+        for i, d in enumerate(driver_ids):
+            er = elo_rows.get(d)
+            if er is None:
+                continue
+            constructor_id = race.constructor_id(i)
+            laps = race.laps_or_none(i)
+            driver_csv.add(
+                d,
+                {
+                    "date": meta.date,
+                    "year": meta.year,
+                    "round": meta.round,
+                    "grandPrixId": meta.grand_prix_id,
+                    "careerRaceNumber": career_race_number,
+                    "constructorId": constructor_id,
+                    "constructorName": constructor_id_to_name.get(constructor_id, constructor_id) if constructor_id else "",
+                    "positionRaw": race.position_raw[i],
+                    "laps": "" if laps is None else laps,
+                    "nParticipants": n,
+                    "eloBefore": round(er.elo_before, 6),
+                    "eloAfter": round(er.elo_after, 6),
+                    "eloDelta": round(er.elo_delta, 6),
+                    "actualScore": round(er.actual_score, 6),
+                    "expectedScore": round(er.expected_score, 6),
+                    "kUsed": k,
+                }
+            )
+            if history is not None:
+                history.add(
+                    driver_id=d,
+                    race=race_index,
+                    constructor_id=constructor_id,
+                    position_raw=race.position_raw[i],
+                    laps=laps,
+                    n_participants=n,
+                    elo=er,
+                )
+            if by_age is not None:
+                by_age.add(driver_id=d, on=meta.date, elo_after=round(er.elo_after, 6))
+    return list(elo_rows)
+
+
+@dataclass
+class ResumeState:
+    """Where an incremental run restarts: the last still-valid season checkpoint."""
+
+    checkpoints: EloCheckpoints
+    season_count: int  # number of leading season checkpoints kept
+
+    @property
+    def race_count(self) -> int:
+        if not self.season_count:
+            return 0
+        return self.checkpoints.seasons[self.season_count - 1].race_count
+
+    def ratings(self) -> Dict[str, float]:
+        if not self.season_count:
+            return {}
+        return dict(self.checkpoints.seasons[self.season_count - 1].ratings)
+
+    def driver_csv_sizes(self) -> Dict[str, int]:
+        if not self.season_count:
+            return {}
+        return self.checkpoints.seasons[self.season_count - 1].driver_csv_sizes
+
+
+def find_resume_state(
+    checkpoints: Optional[EloCheckpoints],
+    *,
+    params: Dict[str, object],
+    race_hashes: List[Tuple[str, str]],
+    drivers_out_dir: str,
+) -> Optional[ResumeState]:
+    if checkpoints is None or checkpoints.params != params:
+        return None
+    if not driver_outputs_match(checkpoints, drivers_out_dir):
+        return None
+    first_changed = first_changed_race(checkpoints.races, race_hashes)
+    return ResumeState(
+        checkpoints=checkpoints,
+        season_count=resume_checkpoint_index(checkpoints, first_changed),
+    )
+
+
+@dataclass
+class CalendarSeed:
+    """Where the races of a run sit in the full calendar (every season).
+
+    `race_numbers` are their careerRaceNumber. `ratings_before` maps each
+    race that does not follow the previous calendar race (the first race of
+    a --years run, or the first after a skipped season) to the ratings of
+    every driver just before it. `chains[n]` is the chain_hash of the first
+    n races of the calendar.
+    """
+
+    race_numbers: List[int]
+    ratings_before: Dict[int, Dict[str, float]]
+    chains: List[str]
+
+    def seed_hashes(self, races) -> Dict[int, str]:
+        """Year of each seeded race -> chain hash of the calendar before it."""
+
+        return {races[i].year: self.chains[self.race_numbers[i] - 1] for i in sorted(self.ratings_before)}
+
+
+def seed_from_calendar(
+    *,
+    snapshot: F1dbSnapshot,
+    races,
+    states: SeasonStates,
+    k: float,
+    initial_elo: float,
+    engine: str = "auto",
+    scale: float = 400.0,
+) -> CalendarSeed:
+    """Ratings just before each block of `races`, from the stored season states.
+
+    Only the calendar races between the latest valid state and the block
+    are rated again (none once the states are recorded); the seasons they
+    complete are added to `states`.
+    """
+
+    calendar = iter_races(snapshot, parse_years_arg(None, snapshot))
+    number = {race_key(meta): n for n, meta in enumerate(calendar, start=1)}
+    race_numbers = [number[race_key(meta)] for meta in races]
+    chains = [""]
+    for meta in calendar[: race_numbers[-1] if races else 0]:
+        chains.append(chain_hash(chains[-1], race_key(meta), race_source_hash(snapshot, meta)))
+
+    ratings: Dict[str, float] = {}
+    rated = 0  # calendar races included in `ratings`
+    ratings_before: Dict[int, Dict[str, float]] = {}
+    ids = RaceIds()
+    for i, n in enumerate(race_numbers):
+        target = n - 1
+        if target == (race_numbers[i - 1] if i else 0):
             continue
-        constructor_id = re.entry.constructor_id or ""
-        driver_rows[d].append(
-            {
-                "date": meta.date,
-                "year": meta.year,
-                "round": meta.round,
-                "grandPrixId": meta.grand_prix_id,
-                "careerRaceNumber": career_race_number,
-                "constructorId": constructor_id,
-                "constructorName": constructor_id_to_name.get(constructor_id, constructor_id) if constructor_id else "",
-                "positionRaw": re.entry.position_raw,
-                "laps": "" if re.entry.laps is None else re.entry.laps,
-                "nParticipants": n,
-                "eloBefore": round(er.elo_before, 6),
-                "eloAfter": round(er.elo_after, 6),
-                "eloDelta": round(er.elo_delta, 6),
-                "actualScore": round(er.actual_score, 6),
-                "expectedScore": round(er.expected_score, 6),
-                "kUsed": k,
-            }
-        )
+        state = states.latest(chains, target)
+        if state is not None and state.race_count > rated:
+            ratings, rated = states.ratings(state), state.race_count
+        with get_profiler().stage("seed_ratings"):
+            for j in range(rated, target):
+                meta = calendar[j]
+                rate_race(
+                    snapshot=snapshot,
+                    meta=meta,
+                    ratings=ratings,
+                    k=k,
+                    initial_elo=initial_elo,
+                    engine=engine,
+                    scale=scale,
+                    ids=ids,
+                )
+                if calendar[j + 1].year != meta.year:
+                    states.record(meta.year, j + 1, chains[j + 1], ratings)
+        rated = target
+        ratings_before[i] = dict(ratings)
+    return CalendarSeed(race_numbers=race_numbers, ratings_before=ratings_before, chains=chains)
+
+
+def leaderboard_seeds(
+    snapshot: F1dbSnapshot, races, seed: CalendarSeed, active_days: int = ACTIVE_DAYS
+) -> Dict[int, List[Tuple[str, float, datetime.date]]]:
+    """Drivers already active before each seeded race, for build_leaderboards.
+
+    (driver_id, rating before the race, date of their last race) of every
+    driver of a calendar race in the `active_days` before it, as a run over
+    every season would have them in its leaderboard.
+    """
+
+    calendar = iter_races(snapshot, parse_years_arg(None, snapshot))
+    out: Dict[int, List[Tuple[str, float, datetime.date]]] = {}
+    for i, ratings in seed.ratings_before.items():
+        cutoff = datetime.date.fromisoformat(str(races[i].date)) - datetime.timedelta(days=active_days)
+        last_race: Dict[str, datetime.date] = {}
+        for meta in reversed(calendar[: seed.race_numbers[i] - 1]):
+            date = datetime.date.fromisoformat(str(meta.date))
+            if date < cutoff:
+                break
+            for driver_id in load_race_data(snapshot, meta).driver_ids():
+                last_race.setdefault(driver_id, date)
+        out[i] = [(driver_id, ratings[driver_id], date) for driver_id, date in sorted(last_race.items())]
+    return out
+
+
+def record_season_states(states: SeasonStates, seed: CalendarSeed, checkpoints: EloCheckpoints) -> None:
+    for cp in checkpoints.seasons:
+        race_number = seed.race_numbers[cp.race_count - 1]
+        states.record(cp.year, race_number, seed.chains[race_number], cp.ratings)
+
+
+def remove_stale_outputs(resume: ResumeState, output_root: str, races) -> None:
+    """Drop outputs of the previous run that the replay will not rewrite."""
+
+    previous = resume.checkpoints
+    kept_sizes = resume.driver_csv_sizes()
+    for driver_id in previous.final_driver_csv_sizes():
+        if driver_id not in kept_sizes:
+            path = f"{output_root}/drivers/{driver_id}.csv"
+            if os.path.exists(path):
+                os.remove(path)
+
+    replayed_files = {
+        f"{meta.year}/{meta.round:02d}-{meta.grand_prix_id or meta.race_dir_name}.csv"
+        for meta in races[resume.race_count:]
+    }
+    for record in previous.races[resume.race_count:]:
+        entry = record.index_entry
+        rel = f"{entry['year']}/{entry['file']}"
+        if rel not in replayed_files and os.path.exists(f"{output_root}/races/{rel}"):
+            os.remove(f"{output_root}/races/{rel}")
 
 
 def generate_all(
     *,
-    yaml_dir: str,
+    snapshot: F1dbSnapshot,
     races,
     driver_id_to_name: Dict[str, str],
     constructor_id_to_name: Dict[str, str],
     output_root: str,
     k: float,
     initial_elo: float,
-) -> None:
-    ratings: Dict[str, float] = {}
-    driver_rows: Dict[str, List[dict]] = defaultdict(list)
+    engine: str = "auto",
+    params: Optional[Dict[str, object]] = None,
+    resume: Optional[ResumeState] = None,
+    stream_driver_csv: bool = True,
+    max_open_files: int = 64,
+    history: Optional[EloHistoryBundle] = None,
+    scale: float = 400.0,
+    by_age: Optional[EloByAge] = None,
+    sink: Optional[OutputSink] = None,
+    seed: Optional[CalendarSeed] = None,
+) -> EloCheckpoints:
+    """Replay `races` (from the resume checkpoint, if any) and write outputs.
+
+    Driver CSVs are truncated back to the resume checkpoint and appended to,
+    streamed as races are processed unless `stream_driver_csv` is False;
+    race CSVs are only written for replayed races. `history` holds the
+    bundle rows kept from before the resume checkpoint; they seed `by_age`,
+    which the replay then feeds race by race. Race CSVs, whole driver CSVs,
+    the index files, the season champions and the chart series are queued
+    on `sink` when given (the caller closes it).
+    `seed` places `races` in the full calendar: ratings start from its
+    states and careerRaceNumber continues the calendar's. Without it the
+    races are numbered from 1 and every driver starts at `initial_elo`.
+    Returns the checkpoints describing the new state.
+    """
+
+    start = resume.race_count if resume else 0
+    ratings: Dict[str, float] = resume.ratings() if resume else {}
     races_by_year: Dict[int, List[dict]] = defaultdict(list)
-
-    career_race_number = 0
-    for meta in races:
-        career_race_number += 1
-        process_one_race(
-            yaml_dir=yaml_dir,
+    race_records: List[RaceRecord] = list(resume.checkpoints.races[:start]) if resume else []
+    seasons: List[SeasonCheckpoint] = (
+        list(resume.checkpoints.seasons[: resume.season_count]) if resume else []
+    )
+    for record in race_records:
+        races_by_year[int(record.index_entry["year"])].append(record.index_entry)
+
+    if resume:
+        remove_stale_outputs(resume, output_root, races)
+
+    driver_csv = DriverCsvWriter(
+        f"{output_root}/drivers",
+        base_sizes=resume.driver_csv_sizes() if resume else None,
+        max_open_files=max_open_files,
+        buffer_bytes=(1 << 20) if stream_driver_csv else None,
+        sink=sink,
+    )
+    if history is None:
+        history = EloHistoryBundle()
+    if by_age is None:
+        by_age = EloByAge(load_driver_birth_dates(snapshot))
+    for driver_id, race, elo_after in history.iter_elo_after():
+        by_age.add(driver_id=driver_id, on=race_records[race].index_entry["date"], elo_after=elo_after)
+    ids = RaceIds()
+    season_drivers: Set[str] = set()
+    race_numbers = seed.race_numbers if seed else range(1, len(races) + 1)
+    for idx in range(start, len(races)):
+        meta = races[idx]
+        if seed and idx in seed.ratings_before:
+            ratings = dict(seed.ratings_before[idx])
+        career_race_number = race_numbers[idx]
+        rated = process_one_race(
+            snapshot=snapshot,
             meta=meta,
             career_race_number=career_race_number,
+            race_index=idx,
             ratings=ratings,
-            driver_rows=driver_rows,
+            driver_csv=driver_csv,
             races_by_year=races_by_year,
             driver_id_to_name=driver_id_to_name,
             constructor_id_to_name=constructor_id_to_name,
             output_root=output_root,
             k=k,
             initial_elo=initial_elo,
+            engine=engine,
+            history=history,
+            scale=scale,
+            ids=ids,
+            by_age=by_age,
+            sink=sink,
+        )
+        season_drivers.update(rated)
+        race_records.append(
+            RaceRecord(
+                key=race_key(meta),
+                source_hash=race_source_hash(snapshot, meta),
+                index_entry=races_by_year[meta.year][-1],
+            )
+        )
+        if idx == len(races) - 1 or races[idx + 1].year != meta.year:
+            seasons.append(
+                SeasonCheckpoint(
+                    year=meta.year,
+                    race_count=idx + 1,
+                    ratings=dict(ratings),
+                    driver_csv_sizes=dict(driver_csv.sizes),
+                    champion=season_champion(ratings, season_drivers),
+                )
+            )
+            season_drivers = set()
+    with get_profiler().stage("write_driver_csv"):
+        driver_csv.close()
+
+    checkpoints = EloCheckpoints(params=params or {}, races=race_records, seasons=seasons)
+    all_driver_ids = checkpoints.final_driver_csv_sizes().keys()
+
+    with get_profiler().stage("write_index"):
+        write_index(
+            output_root,
+            k=k,
+            initial_elo=initial_elo,
+            driver_ids=all_driver_ids,
+            driver_id_to_name=driver_id_to_name,
+            races_by_year=races_by_year,
+            sink=sink,
+        )
+
+        races_in_order = [entry for year in sorted(races_by_year.keys()) for entry in races_by_year[year]]
+        history.write(
+            f"{output_root}/{BUNDLE_FILENAME}",
+            races=races_in_order,
+            driver_id_to_name=driver_id_to_name,
+            constructor_id_to_name=constructor_id_to_name,
+            k=k,
+            initial_elo=initial_elo,
         )
 
-    drivers_out_dir = f"{output_root}/drivers"
-    os.makedirs(drivers_out_dir, exist_ok=True)
-    for driver_id, rows in driver_rows.items():
-        out_file = f"{drivers_out_dir}/{driver_id}.csv"
-        write_driver_csv(out_file, rows)
+        write_season_champions(
+            f"{output_root}/{SEASON_CHAMPIONS_FILENAME}",
+            {season.year: season.champion for season in seasons if season.champion is not None},
+            sink=sink,
+        )
 
-    index_payload = {
-        "k": k,
-        "initialElo": initial_elo,
-        "totalRaces": career_race_number,
-        "drivers": [
-            {
-                "id": driver_id,
-                "name": driver_id_to_name.get(driver_id, driver_id),
-            }
-            for driver_id in sorted(driver_rows.keys())
-        ],
-        "racesByYear": {
-            str(year): races_by_year[year]
-            for year in sorted(races_by_year.keys())
-        },
-    }
+    with get_profiler().stage("write_chart_series"):
+        write_chart_series(
+            output_root,
+            build_chart_series(
+                history.iter_team_elo_after(),
+                race_numbers=race_numbers,
+                constructor_id_to_name=constructor_id_to_name,
+            ),
+            sink=sink,
+        )
+
+    with get_profiler().stage("write_leaderboards"):
+        write_leaderboards(
+            f"{output_root}/{LEADERBOARD_FILENAME}",
+            build_leaderboards(
+                history.ratings_by_race(len(races_in_order)),
+                races_in_order,
+                driver_id_to_name=driver_id_to_name,
+                race_numbers=race_numbers,
+                seeds=leaderboard_seeds(snapshot, races, seed) if seed else None,
+            ),
+        )
+
+    with get_profiler().stage("write_elo_by_age"):
+        by_age.write_csv(f"{output_root}/{ELO_BY_AGE_FILENAME}")
 
-    os.makedirs(output_root, exist_ok=True)
-    with open(f"{output_root}/index.json", "w", encoding="utf-8") as f:
-        json.dump(index_payload, f, ensure_ascii=False, indent=2)
+    return checkpoints
 
 
 def main(argv: List[str]) -> int:
@@ -246,7 +670,11 @@ def main(argv: List[str]) -> int:
     )
     parser.add_argument(
         "--years",
-        help="Années à traiter: ex '2023' ou '1950-2026' ou '2023,2024'. Par défaut: toutes.",
+        help=(
+            "Années à traiter: ex '2023' ou '1950-2026' ou '2023,2024'. Par défaut: toutes. "
+            "Les ELO partent de l'état de fin de la saison précédente (mémorisé par les "
+            "exécutions antérieures), careerRaceNumber suit le calendrier complet."
+        ),
         default=None,
     )
     parser.add_argument(
@@ -269,8 +697,37 @@ def main(argv: List[str]) -> int:
         default="../../docs/data/elo",
         help="Dossier de sortie (défaut: ../../docs/data/elo).",
     )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default=None,
+        help="Noyau de calcul ELO: auto (NumPy si disponible), python ou numpy. Par défaut: config 'engine' ou auto.",
+    )
+    parser.add_argument(
+        "--driver-csv",
+        choices=("stream", "batch"),
+        default=None,
+        help=(
+            "Écriture des CSV pilotes: stream (au fil des courses, mémoire bornée) ou "
+            "batch (tout en fin de calcul). Par défaut: config 'driver_csv' ou stream."
+        ),
+    )
+    parser.add_argument(
+        "--max-open-files",
+        type=int,
+        default=None,
+        help="Nombre max de CSV pilotes ouverts simultanément en mode stream (défaut: config ou 64).",
+    )
+    parser.add_argument(
+        "--output-threads",
+        type=int,
+        default=None,
+        help="Threads d'écriture des CSV courses/pilotes (0: écriture synchrone; défaut: config ou 8).",
+    )
+    add_profile_arguments(parser)
 
     args = parser.parse_args(argv)
+    profiler = profiler_from_args("elo_pilotes", args)
 
     try:
         yaml_dir = resolve_from_script_dir(args.yaml_dir)
@@ -279,42 +736,114 @@ def main(argv: List[str]) -> int:
 
         k = float(config.get("k", 24))
         initial_elo = float(config.get("initial_elo", 1500))
+        scale = float(config.get("scale", 400))
+        engine = args.engine or str(config.get("engine", "auto"))
+        driver_csv_mode = args.driver_csv or str(config.get("driver_csv", "stream"))
+        max_open_files = args.max_open_files or int(config.get("max_open_driver_files", 64))
+        output_threads = (
+            args.output_threads if args.output_threads is not None else int(config.get("output_threads", 8))
+        )
 
-        years = parse_years_arg(args.years, yaml_dir)
-        races = iter_races(yaml_dir, years)
+        with profiler.stage("snapshot"):
+            snapshot = load_snapshot(yaml_dir)
+        years = parse_years_arg(args.years, snapshot)
+        races = iter_races(snapshot, years)
         if not races:
             print("Aucune course trouvée (vérifie --yaml-dir/--years).", file=sys.stderr)
             return 2
 
-        script_hash = get_file_hash(__file__) or ""
-        source_hash = compute_source_hash(yaml_dir, races)
-        cache_value = build_cache_value(
-            source_hash=source_hash,
-            script_hash=script_hash,
-            k=k,
-            initial_elo=initial_elo,
-            years=years,
-        )
-
-        hash_file = f"{output_root}/elo_pilotes.hash"
-        if not args.force and should_use_cache(hash_file, cache_value, output_root):
+        with profiler.stage("cache_check"):
+            script_hash = get_file_hash(__file__) or ""
+            # Earlier seasons seed the ratings of the selected ones.
+            source_races = iter_races(snapshot, [y for y in parse_years_arg(None, snapshot) if y <= years[-1]])
+            source_hash = compute_source_hash(snapshot, source_races)
+            cache_value = build_cache_value(
+                source_hash=source_hash,
+                script_hash=script_hash,
+                k=k,
+                initial_elo=initial_elo,
+                years=years,
+                scale=scale,
+            )
+
+            hash_file = f"{output_root}/elo_pilotes.hash"
+            use_cache = not args.force and should_use_cache(hash_file, cache_value, output_root)
+        if use_cache:
             print("Aucun changement détecté, ELO non régénéré (cache).")
             return 0
 
-        driver_id_to_name = load_driver_names(yaml_dir)
-        constructor_id_to_name = load_constructor_names(yaml_dir)
-        generate_all(
-            yaml_dir=yaml_dir,
-            races=races,
-            driver_id_to_name=driver_id_to_name,
-            constructor_id_to_name=constructor_id_to_name,
-            output_root=output_root,
-            k=k,
-            initial_elo=initial_elo,
+        with profiler.stage("resume"):
+            code_hash = compute_code_hash()
+            states_path = default_season_states_path(yaml_dir)
+            states = load_season_states(
+                states_path,
+                build_rating_params(code_hash=code_hash, k=k, initial_elo=initial_elo, scale=scale),
+            )
+            seed = seed_from_calendar(
+                snapshot=snapshot,
+                races=races,
+                states=states,
+                k=k,
+                initial_elo=initial_elo,
+                engine=engine,
+                scale=scale,
+            )
+            params = build_checkpoint_params(
+                snapshot=snapshot,
+                code_hash=code_hash,
+                k=k,
+                initial_elo=initial_elo,
+                years=years,
+                scale=scale,
+                seeds=seed.seed_hashes(races),
+            )
+            checkpoint_path = default_checkpoint_path(output_root)
+            resume = None
+            if not args.force:
+                resume = find_resume_state(
+                    load_checkpoints(checkpoint_path),
+                    params=params,
+                    race_hashes=[(race_key(meta), race_source_hash(snapshot, meta)) for meta in races],
+                    drivers_out_dir=f"{output_root}/drivers",
+                )
+            history = None
+            if resume is not None:
+                # Without the previous bundle its kept rows cannot be rebuilt.
+                history = EloHistoryBundle.load_prefix(f"{output_root}/{BUNDLE_FILENAME}", resume.race_count)
+                if history is None:
+                    resume = None
+
+        driver_id_to_name = load_driver_names(snapshot)
+        constructor_id_to_name = load_constructor_names(snapshot)
+        with profiler.stage("replay"), OutputSink(workers=output_threads) as sink:
+            checkpoints = generate_all(
+                snapshot=snapshot,
+                races=races,
+                driver_id_to_name=driver_id_to_name,
+                constructor_id_to_name=constructor_id_to_name,
+                output_root=output_root,
+                k=k,
+                initial_elo=initial_elo,
+                engine=engine,
+                params=params,
+                resume=resume,
+                stream_driver_csv=driver_csv_mode == "stream",
+                max_open_files=max_open_files,
+                history=history,
+                scale=scale,
+                sink=sink,
+                seed=seed,
+            )
+        with profiler.stage("save_checkpoints"):
+            save_checkpoints(checkpoint_path, checkpoints)
+            record_season_states(states, seed, checkpoints)
+            save_season_states(states_path, states)
+            save_cache(hash_file, cache_value)
+        replayed = len(races) - (resume.race_count if resume else 0)
+        print(
+            f"ELO généré: {output_root} ({replayed}/{len(races)} courses recalculées, "
+            f"{take_output_stats().summary()})"
         )
-
-        save_cache(hash_file, cache_value)
-        print(f"ELO généré: {output_root}")
         return 0
     except KeyboardInterrupt:
         print("Interrompu.", file=sys.stderr)
@@ -322,6 +851,8 @@ def main(argv: List[str]) -> int:
     except Exception as e:
         print(f"Erreur: {e}", file=sys.stderr)
         return 1
+    finally:
+        profiler.finish()
 
 
 if __name__ == "__main__":
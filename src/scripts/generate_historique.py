@@ -1,15 +1,14 @@
 import yaml
 import csv
-import os
 import glob
+import os
+import sys
 import hashlib
 from collections import defaultdict
 
-def load_yaml(file_path):
-    if not os.path.exists(file_path):
-        return None
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return yaml.safe_load(f)
+from elo.output import open_output, take_output_stats
+from elo.profiling import profiler_from_argv
+from elo.snapshot import load_snapshot
 
 def get_file_hash(file_path):
     if not os.path.exists(file_path):
@@ -18,34 +17,90 @@ def get_file_hash(file_path):
         file_content = f.read()
         return hashlib.sha256(file_content).hexdigest()
 
-def get_available_years(yaml_dir):
-    seasons_dir = f"{yaml_dir}/seasons"
-    if not os.path.exists(seasons_dir):
-        print(f"Erreur : Le dossier {seasons_dir} n'existe pas.")
-        return []
-
-    return sorted([d for d in os.listdir(seasons_dir) if os.path.isdir(os.path.join(seasons_dir, d)) and d.isdigit()])
+def scale_outputs(config, output_path):
+    # Barème principal -> historique.csv, barèmes supplémentaires -> historique_<nom>.csv
+    base, ext = os.path.splitext(output_path)
+    outputs = [(output_path, config['points_per_position'])]
+    for name, scale in config.get('scales', {}).items():
+        outputs.append((f"{base}_{name}{ext}", scale['points_per_position']))
+    return outputs
+
+def remove_stale_scale_files(output_path, outputs):
+    # Barèmes renommés ou retirés de la configuration : leur CSV disparaît
+    base, ext = os.path.splitext(output_path)
+    kept = {os.path.abspath(path) for path, _ in outputs}
+    for path in glob.glob(f"{glob.escape(base)}_*{ext}"):
+        if os.path.abspath(path) not in kept:
+            os.remove(path)
+
+def collect_presences(snapshot, available_years, driver_id_to_name):
+    # Une seule lecture des driver-standings : (année, position) de chaque pilote,
+    # dans l'ordre d'apparition (qui départage les égalités de points)
+    presences = defaultdict(list)
+    for year in available_years:
+        yaml_file = f"seasons/{year}/driver-standings.yml"
+        if not snapshot.has_season_file(year, 'driver-standings.yml'):
+            print(f"Fichier non trouvé : {yaml_file}")
+            continue
+        try:
+            data = snapshot.season_file(year, 'driver-standings.yml')
+            if not data:
+                print(f"Aucune donnée valide dans {yaml_file}")
+                continue
+            for standing in data:
+                driver_id = standing['driverId']
+                driver_name = driver_id_to_name.get(driver_id, driver_id)
+                presences[driver_name].append((year, str(standing['position'])))
+        except Exception as e:
+            print(f"Erreur lors du traitement de {yaml_file}: {e}")
+    return presences
+
+def apply_scale(presences, points_per_position):
+    # Points totaux et par année selon un barème, pilotes triés par points totaux
+    driver_stats = []
+    for driver_name, entries in presences.items():
+        total = 0
+        periods = {}
+        for year, position in entries:
+            points = points_per_position.get(position, 0)
+            total += points
+            periods[year] = points  # 0 si présent mais sans points
+        driver_stats.append((driver_name, {'total': total, 'periods': periods}))
+    return sorted(driver_stats, key=lambda x: x[1]['total'], reverse=True)
+
+def write_historique_csv(output_path, sorted_drivers, available_years):
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open_output(output_path) as f:
+        writer = csv.writer(f)
+        header = ['Pilote', 'Rang', 'Points'] + available_years
+        writer.writerow(header)
+        for rank, (driver_name, stats) in enumerate(sorted_drivers, 1):
+            row = [driver_name, rank, stats['total']]
+            for year in available_years:
+                # Afficher 0 si le pilote est présent dans le classement de l'année mais n'a pas de points
+                row.append(stats['periods'].get(year, ''))
+            writer.writerow(row)
 
-def generate_historique_csv(yaml_dir, config_path, output_path, script_hash):
+def generate_historique_csv(snapshot, config_path, output_path, script_hash):
     # Vérifier si le fichier de sortie existe déjà
     output_hash_file = f"{output_path}.hash"
 
     # Charger la configuration
     with open(config_path, 'r') as f:
         config = yaml.safe_load(f)
+    config_hash = get_file_hash(config_path)
+    outputs = scale_outputs(config, output_path)
 
     # Obtenir les années disponibles
-    available_years = get_available_years(yaml_dir)
+    available_years = snapshot.years()
     config['periods'] = available_years
 
     # Calculer le hash des fichiers sources
     source_hashes = []
     for year in available_years:
-        yaml_file = f"{yaml_dir}/seasons/{year}/driver-standings.yml"
-        if os.path.exists(yaml_file):
-            file_hash = get_file_hash(yaml_file)
-            if file_hash:
-                source_hashes.append(file_hash)
+        file_hash = snapshot.season_file_hash(year, 'driver-standings.yml')
+        if file_hash:
+            source_hashes.append(file_hash)
 
     source_hash = hashlib.sha256(''.join(source_hashes).encode()).hexdigest() if source_hashes else None
 
@@ -55,90 +110,32 @@ def generate_historique_csv(yaml_dir, config_path, output_path, script_hash):
         with open(output_hash_file, 'r') as f:
             previous_hashes = yaml.safe_load(f) or {}
 
-    # Vérifier si les données ou le script ont changé
-    if os.path.exists(output_path) and os.path.exists(output_hash_file):
-        if previous_hashes.get('source_hash') == source_hash and previous_hashes.get('script_hash') == script_hash:
+    # Vérifier si les données, le script ou les barèmes ont changé
+    if all(os.path.exists(path) for path, _ in outputs) and os.path.exists(output_hash_file):
+        if (
+            previous_hashes.get('source_hash') == source_hash
+            and previous_hashes.get('script_hash') == script_hash
+            and previous_hashes.get('config_hash') == config_hash
+        ):
             print(f"Aucun changement détecté, les données ne seront pas régénérées.")
             return
 
-    # Charger les noms des pilotes depuis les fichiers individuels
-    driver_id_to_name = {}
-    drivers_dir = f"{yaml_dir}/drivers"
-    if not os.path.exists(drivers_dir):
-        print(f"Erreur : Le dossier {drivers_dir} n'existe pas.")
+    # Charger les noms des pilotes
+    driver_id_to_name = snapshot.driver_names()
+    if not driver_id_to_name:
+        print("Erreur : Aucun pilote trouvé dans le snapshot f1db.")
         return
 
-    for driver_file in glob.glob(f"{drivers_dir}/*.yml"):
-        driver_id = os.path.basename(driver_file).replace('.yml', '')
-        driver_data = load_yaml(driver_file)
-        if driver_data:
-            driver_id_to_name[driver_id] = driver_data.get('name', driver_id)
+    presences = collect_presences(snapshot, available_years, driver_id_to_name)
 
-    # Dictionnaire pour stocker les points des pilotes
-    driver_stats = defaultdict(lambda: {'total': 0, 'periods': {}})
-
-    # Parcourir les fichiers YAML de driver-standings pour chaque année
-    for year in available_years:
-        yaml_file = f"{yaml_dir}/seasons/{year}/driver-standings.yml"
-        if not os.path.exists(yaml_file):
-            print(f"Fichier non trouvé : {yaml_file}")
-            continue
-        try:
-            data = load_yaml(yaml_file)
-            if not data:
-                print(f"Aucune donnée valide dans {yaml_file}")
-                continue
-            for standing in data:
-                driver_id = standing['driverId']
-                driver_name = driver_id_to_name.get(driver_id, driver_id)
-                position = str(standing['position'])
-                points = config['points_per_position'].get(position, 0)
-                driver_stats[driver_name]['total'] += points
-                driver_stats[driver_name]['periods'][year] = points  # Utiliser les points liés au classement
-        except Exception as e:
-            print(f"Erreur lors du traitement de {yaml_file}: {e}")
-
-    # Vérifier les pilotes présents dans chaque année
-    for year in available_years:
-        yaml_file = f"{yaml_dir}/seasons/{year}/driver-standings.yml"
-        if not os.path.exists(yaml_file):
-            continue
-        try:
-            data = load_yaml(yaml_file)
-            if not data:
-                continue
-            # Marquer les pilotes présents dans cette année
-            for standing in data:
-                driver_id = standing['driverId']
-                driver_name = driver_id_to_name.get(driver_id, driver_id)
-                if year not in driver_stats[driver_name]['periods']:
-                    driver_stats[driver_name]['periods'][year] = 0  # 0 si présent mais sans points
-        except Exception as e:
-            print(f"Erreur lors du traitement de {yaml_file}: {e}")
-
-    # Trier les pilotes par points totaux
-    sorted_drivers = sorted(
-        driver_stats.items(),
-        key=lambda x: x[1]['total'],
-        reverse=True
-    )
-
-    # Écrire le CSV
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        header = ['Pilote', 'Rang', 'Points'] + available_years
-        writer.writerow(header)
-        for rank, (driver_name, stats) in enumerate(sorted_drivers, 1):
-            row = [driver_name, rank, stats['total']]
-            for year in available_years:
-                # Afficher 0 si le pilote est présent dans le classement de l'année mais n'a pas de points
-                row.append(stats['periods'].get(year, ''))
-            writer.writerow(row)
+    # Un CSV par barème, tous calculés à partir de la même lecture
+    for path, points_per_position in outputs:
+        write_historique_csv(path, apply_scale(presences, points_per_position), available_years)
+    remove_stale_scale_files(output_path, outputs)
 
     # Sauvegarder les hashes
-    with open(output_hash_file, 'w') as f:
-        yaml.safe_dump({'source_hash': source_hash, 'script_hash': script_hash}, f)
+    with open_output(output_hash_file) as f:
+        yaml.safe_dump({'source_hash': source_hash, 'script_hash': script_hash, 'config_hash': config_hash}, f)
 
 if __name__ == "__main__":
     yaml_dir = "../../data/f1db/src/data"
@@ -151,5 +148,14 @@ if __name__ == "__main__":
         print(f"Erreur : Impossible de calculer le hash du script.")
         exit(1)
 
-    generate_historique_csv(yaml_dir, config_path, output_path, script_hash)
-    print(f"Classement historique généré : {output_path}")
+    # Profilage optionnel (--profile [fichier.json])
+    profiler = profiler_from_argv("historique", sys.argv[1:])
+
+    # Charger le snapshot f1db (compilé une seule fois pour tous les scripts)
+    with profiler.stage("snapshot"):
+        snapshot = load_snapshot(yaml_dir)
+
+    with profiler.stage("generate"):
+        generate_historique_csv(snapshot, config_path, output_path, script_hash)
+    print(f"Classement historique généré : {output_path} ({take_output_stats().summary()})")
+    profiler.finish()
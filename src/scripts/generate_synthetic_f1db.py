@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from typing import List
+
+from elo.synthetic import SyntheticConfig, write_synthetic_f1db
+
+
+def add_synthetic_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = SyntheticConfig()
+    parser.add_argument("--seasons", type=int, default=defaults.seasons, help=f"Nombre de saisons (défaut: {defaults.seasons}).")
+    parser.add_argument("--first-year", type=int, default=defaults.first_year, help=f"Première saison (défaut: {defaults.first_year}).")
+    parser.add_argument("--races", type=int, default=defaults.races_per_season, help=f"Courses par saison (défaut: {defaults.races_per_season}).")
+    parser.add_argument("--field", type=int, default=defaults.field_size, help=f"Pilotes par course (défaut: {defaults.field_size}).")
+    parser.add_argument("--dnf-rate", type=float, default=defaults.dnf_rate, help=f"Proportion d'abandons (défaut: {defaults.dnf_rate}).")
+    parser.add_argument("--dsq-rate", type=float, default=defaults.dsq_rate, help=f"Proportion de disqualifications (défaut: {defaults.dsq_rate}).")
+    parser.add_argument("--dns-rate", type=float, default=defaults.dns_rate, help=f"Proportion de non-partants (défaut: {defaults.dns_rate}).")
+    parser.add_argument("--no-qualifying", action="store_true", help="Ne génère pas les fichiers qualifying-results.yml.")
+    parser.add_argument(
+        "--sprint-every",
+        type=int,
+        default=4,
+        help="Un fichier sprint-qualifying-results.yml toutes les N manches (0: aucun, défaut: 4).",
+    )
+    parser.add_argument("--seed", type=int, default=defaults.seed, help=f"Graine aléatoire (défaut: {defaults.seed}).")
+
+
+def synthetic_config_from_args(args: argparse.Namespace) -> SyntheticConfig:
+    return SyntheticConfig(
+        seasons=args.seasons,
+        first_year=args.first_year,
+        races_per_season=args.races,
+        field_size=args.field,
+        dnf_rate=args.dnf_rate,
+        dsq_rate=args.dsq_rate,
+        dns_rate=args.dns_rate,
+        qualifying=not args.no_qualifying,
+        sprint_every=args.sprint_every,
+        seed=args.seed,
+    )
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(
+        description="Génère une arborescence YAML au format f1db avec des données synthétiques (tests de charge)."
+    )
+    parser.add_argument("output", help="Dossier de sortie (équivalent de data/f1db/src/data).")
+    add_synthetic_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if os.path.exists(args.output) and os.listdir(args.output):
+        print(f"Le dossier n'est pas vide: {args.output}", file=sys.stderr)
+        return 2
+
+    started = time.perf_counter()
+    stats = write_synthetic_f1db(args.output, synthetic_config_from_args(args))
+    print(
+        f"f1db synthétique généré: {args.output} ({stats['races']} courses, {stats['drivers']} pilotes, "
+        f"{stats['files']} fichiers, {stats['bytes'] / 1e6:.1f} Mo, {time.perf_counter() - started:.1f}s)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
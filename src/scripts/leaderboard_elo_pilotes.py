@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from typing import List
+
+from elo.leaderboard import LEADERBOARD_FILENAME, EloLeaderboards
+from generate_elo_pilotes import resolve_from_script_dir
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Affiche le classement ELO des pilotes actifs à une date ou après une course, "
+            f"à partir de {LEADERBOARD_FILENAME} (écrit par generate_elo_pilotes.py)."
+        )
+    )
+    parser.add_argument("quand", help="Date (AAAA-MM-JJ) ou careerRaceNumber (entier).")
+    parser.add_argument("--top", type=int, default=10, help="Nombre de pilotes affichés (défaut: 10, 0: tous).")
+    parser.add_argument(
+        "--data",
+        default=f"../../docs/data/elo/{LEADERBOARD_FILENAME}",
+        help=f"Fichier des classements (défaut: ../../docs/data/elo/{LEADERBOARD_FILENAME}).",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        leaderboards = EloLeaderboards.load(resolve_from_script_dir(args.data))
+        when = int(args.quand) if args.quand.isdigit() else args.quand
+        board = leaderboards.ratings_at(when)
+    except (OSError, ValueError) as e:
+        print(f"Erreur: {e}", file=sys.stderr)
+        return 1
+
+    ranking = board.top(args.top) if args.top > 0 else board.ranking
+    print(f"Après la course n°{board.career_race_number} ({board.date}), {len(board.ranking)} pilotes actifs:")
+    for rank, (driver_id, rating) in enumerate(ranking, start=1):
+        print(f"{rank:>4}  {leaderboards.names.get(driver_id, driver_id):<30} {rating:10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
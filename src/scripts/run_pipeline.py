@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import os
+import sys
+from typing import List
+
+from elo.cache_paths import default_cache_dir
+from elo.pipeline import Stage, critical_path, run_pipeline
+
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.normpath(os.path.join(SCRIPTS_DIR, "..", ".."))
+
+F1DB_SOURCES = (
+    "data/f1db/src/data/drivers/*.yml",
+    "data/f1db/src/data/constructors/*.yml",
+    "data/f1db/src/data/seasons/*/*.yml",
+    "data/f1db/src/data/seasons/*/races/*/*.yml",
+)
+SNAPSHOT = "src/scripts/.cache/f1db_snapshot-*.pickle"
+ELO_PACKAGE = "src/scripts/elo/*.py"
+
+
+def script_inputs(script: str, config: str = "") -> tuple:
+    inputs = (f"src/scripts/{script}", ELO_PACKAGE, SNAPSHOT)
+    return inputs + ((f"src/scripts/config/{config}",) if config else ())
+
+
+STAGES = (
+    Stage(
+        name="snapshot",
+        script="compile_f1db_snapshot.py",
+        cwd="src/scripts",
+        inputs=F1DB_SOURCES + ("src/scripts/compile_f1db_snapshot.py", ELO_PACKAGE),
+        outputs=(SNAPSHOT,),
+    ),
+    Stage(
+        name="historique",
+        script="generate_historique.py",
+        cwd="src/scripts",
+        deps=("snapshot",),
+        inputs=script_inputs("generate_historique.py", "historique_points.json"),
+        outputs=("docs/data/historique.csv", "docs/data/historique_*.csv"),
+    ),
+    Stage(
+        name="qualifications",
+        script="generate_qualifications.py",
+        cwd="src/scripts",
+        deps=("snapshot",),
+        inputs=script_inputs("generate_qualifications.py", "qualifications_points.json"),
+        outputs=("docs/data/*/qualifications.csv",),
+    ),
+    Stage(
+        name="deuxieme_pilote_par_course",
+        script="generate_deuxieme_pilote_par_course.py",
+        cwd="src/scripts",
+        deps=("snapshot",),
+        inputs=script_inputs("generate_deuxieme_pilote_par_course.py", "deuxieme_pilote_points.json"),
+        outputs=(
+            "docs/data/deuxieme_pilote_par_course/*/index.json",
+            "docs/data/deuxieme_pilote_par_course/*/*.csv",
+        ),
+    ),
+    Stage(
+        name="deuxieme_pilote",
+        script="generate_deuxieme_pilote.py",
+        cwd="src/scripts",
+        deps=("snapshot",),
+        inputs=script_inputs("generate_deuxieme_pilote.py", "deuxieme_pilote_points.json"),
+        outputs=("docs/data/*/deuxieme_pilote.csv",),
+    ),
+    Stage(
+        name="elo_pilotes",
+        script="generate_elo_pilotes.py",
+        cwd="src/scripts",
+        deps=("snapshot",),
+        inputs=script_inputs("generate_elo_pilotes.py", "elo_pilotes.json"),
+        outputs=(
+            "docs/data/elo/index.json*",
+            "docs/data/elo/index/*.json*",
+            "docs/data/elo/history.bin",
+            "docs/data/elo/season_champions.json",
+            "docs/data/elo/series/*.json",
+            "docs/data/elo/leaderboards.json",
+            "docs/data/elo/elo_by_age.csv",
+            "docs/data/elo/drivers/*.csv",
+            "docs/data/elo/races/*/*.csv",
+        ),
+    ),
+    Stage(
+        name="champions",
+        script="generate_champions_table.py",
+        cwd=".",
+        deps=("snapshot", "qualifications", "deuxieme_pilote", "elo_pilotes"),
+        inputs=script_inputs("generate_champions_table.py")
+        + (
+            "src/scripts/generate_qualifications.py",
+            "src/scripts/generate_deuxieme_pilote.py",
+            "src/scripts/config/qualifications_points.json",
+            "src/scripts/config/deuxieme_pilote_points.json",
+            "docs/data/*/qualifications.csv",
+            "docs/data/*/deuxieme_pilote.csv",
+            "docs/data/elo/season_champions.json",
+        ),
+        outputs=("docs/data/champions.csv",),
+    ),
+)
+# Every data file the pages fetch, as produced by the stages above.
+DATA_OUTPUTS = tuple(p for stage in STAGES for p in stage.outputs if p.startswith("docs/data/"))
+STAGES += (
+    Stage(
+        name="data_manifest",
+        script="generate_data_manifest.py",
+        cwd="src/scripts",
+        deps=tuple(stage.name for stage in STAGES if stage.name != "snapshot"),
+        inputs=("src/scripts/generate_data_manifest.py", ELO_PACKAGE) + DATA_OUTPUTS,
+        outputs=("docs/data/manifest.json", "docs/data/manifests/**/*.json"),
+    ),
+)
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Régénère toutes les données (snapshot f1db, classements, ELO, champions) "
+            "en parallélisant les étapes indépendantes."
+        )
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Nombre de processus (défaut: nombre de CPU).",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Relance toutes les étapes même si leurs entrées n'ont pas changé.",
+    )
+    parser.add_argument(
+        "--only",
+        default=None,
+        help="Étapes à lancer, séparées par des virgules (leurs dépendances sont incluses).",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Passe --profile à chaque étape (rapports JSON dans .cache/profiles/).",
+    )
+
+    args = parser.parse_args(argv)
+
+    stages = list(STAGES)
+    if args.only:
+        by_name = {s.name: s for s in stages}
+        wanted = set()
+        todo = [n.strip() for n in args.only.split(",") if n.strip()]
+        while todo:
+            name = todo.pop()
+            if name not in by_name:
+                print(f"Étape inconnue: {name}", file=sys.stderr)
+                return 2
+            if name not in wanted:
+                wanted.add(name)
+                todo.extend(by_name[name].deps)
+        stages = [s for s in stages if s.name in wanted]
+    if args.profile:
+        stages = [dataclasses.replace(s, args=s.args + ("--profile",)) for s in stages]
+
+    def print_result(result) -> None:
+        print(f"[{result.status:>7}] {result.name:<28} {result.wall_time:7.2f}s")
+        if result.status == "failed" and result.output:
+            print(result.output.rstrip())
+
+    report = run_pipeline(
+        stages,
+        root=REPO_ROOT,
+        scripts_dir=SCRIPTS_DIR,
+        stamps_path=os.path.join(default_cache_dir(), "pipeline_stamps.json"),
+        jobs=args.jobs,
+        force=args.force,
+        on_result=print_result,
+    )
+
+    path_time, path = critical_path(stages, report)
+    print(
+        f"Durée totale: {report.wall_time:.2f}s "
+        f"(chemin critique {path_time:.2f}s: {' -> '.join(path)})"
+    )
+    if not report.ok:
+        print("Certaines étapes ont échoué.", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
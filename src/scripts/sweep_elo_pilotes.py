@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from typing import List, Optional
+
+from elo.elo_math import ENGINES
+from elo.f1db_io import iter_races, load_constructor_names, load_driver_names
+from elo.snapshot import load_snapshot
+from elo.sweep import build_grid, prepare_races, run_sweep, write_final_ratings_csv, write_summary_csv
+from generate_elo_pilotes import generate_all, load_config, parse_years_arg, resolve_from_script_dir
+
+
+def parse_float_list(value: Optional[str], default: float) -> List[float]:
+    if not value:
+        return [default]
+    return [float(part) for part in value.split(",") if part.strip()]
+
+
+def parse_variant_numbers(value: Optional[str], count: int) -> List[int]:
+    if not value:
+        return []
+    numbers = [int(part) for part in value.split(",") if part.strip()]
+    for n in numbers:
+        if not 1 <= n <= count:
+            raise ValueError(f"Variante inconnue: {n} (1 à {count})")
+    return numbers
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Calcule l'ELO pilotes pour une grille de paramètres (k, scale, initial_elo) en une seule "
+            "passe sur les courses, et compare les variantes par log-loss prédictive."
+        )
+    )
+    parser.add_argument("--k", default=None, help="Valeurs de K, ex '16,24,32,50' (défaut: config).")
+    parser.add_argument("--scale", default=None, help="Valeurs de scale, ex '200,400' (défaut: config).")
+    parser.add_argument("--initial-elo", default=None, help="Valeurs d'ELO initial, ex '1000,1500' (défaut: config).")
+    parser.add_argument(
+        "--years",
+        help="Années à traiter: ex '2023' ou '1950-2026' ou '2023,2024'. Par défaut: toutes.",
+        default=None,
+    )
+    parser.add_argument(
+        "--yaml-dir",
+        default="../../data/f1db/src/data",
+        help="Chemin vers f1db YAML (défaut: ../../data/f1db/src/data).",
+    )
+    parser.add_argument(
+        "--config",
+        default="./config/elo_pilotes.json",
+        help="Chemin vers la config (défaut: ./config/elo_pilotes.json).",
+    )
+    parser.add_argument(
+        "--output",
+        default="./.cache/elo_sweep",
+        help="Dossier de sortie (défaut: ./.cache/elo_sweep).",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="auto",
+        help="auto (NumPy si disponible, toutes les variantes vectorisées), python ou numpy.",
+    )
+    parser.add_argument(
+        "--full",
+        default=None,
+        help="Numéros de variantes (voir le tableau) pour lesquelles écrire les sorties complètes, ex '1,3'.",
+    )
+    parser.add_argument("--top", type=int, default=3, help="Nombre de meilleurs pilotes par variante (défaut: 3).")
+
+    args = parser.parse_args(argv)
+
+    try:
+        config = load_config(resolve_from_script_dir(args.config))
+        output_root = resolve_from_script_dir(args.output)
+        variants = build_grid(
+            parse_float_list(args.k, float(config.get("k", 24))),
+            parse_float_list(args.scale, float(config.get("scale", 400))),
+            parse_float_list(args.initial_elo, float(config.get("initial_elo", 1500))),
+        )
+        full = parse_variant_numbers(args.full, len(variants))
+
+        snapshot = load_snapshot(resolve_from_script_dir(args.yaml_dir))
+        races = iter_races(snapshot, parse_years_arg(args.years, snapshot))
+        if not races:
+            print("Aucune course trouvée (vérifie --yaml-dir/--years).", file=sys.stderr)
+            return 2
+
+        started = time.perf_counter()
+        driver_ids, prepared = prepare_races(snapshot, races)
+        prepared_time = time.perf_counter() - started
+        result = run_sweep(driver_ids, prepared, variants, engine=args.engine)
+        sweep_time = time.perf_counter() - started - prepared_time
+
+        names = load_driver_names(snapshot)
+        write_summary_csv(f"{output_root}/summary.csv", result, top=args.top, names=names)
+        write_final_ratings_csv(f"{output_root}/final_ratings.csv", result, names=names)
+
+        print(f"{len(variants)} variantes, {len(prepared)} courses, {result.pairs} duels "
+              f"(préparation {prepared_time:.2f}s, calcul {sweep_time:.2f}s)")
+        print(f"{'#':>3}  {'variante':<28} {'log-loss':>10}  meilleur pilote")
+        for v in sorted(range(len(variants)), key=result.log_loss):
+            ratings = result.final_ratings[v]
+            best = max(range(len(ratings)), key=lambda d: ratings[d])
+            best_id = driver_ids[best]
+            print(
+                f"{v + 1:>3}  {variants[v].label:<28} {result.log_loss(v):10.6f}  "
+                f"{names.get(best_id, best_id)} ({ratings[best]:.1f})"
+            )
+
+        constructor_names = load_constructor_names(snapshot)
+        for n in full:
+            variant = variants[n - 1]
+            variant_root = f"{output_root}/{variant.label}"
+            generate_all(
+                snapshot=snapshot,
+                races=races,
+                driver_id_to_name=names,
+                constructor_id_to_name=constructor_names,
+                output_root=variant_root,
+                k=variant.k,
+                initial_elo=variant.initial_elo,
+                scale=variant.scale,
+            )
+            print(f"Sorties complètes de la variante {n}: {variant_root}")
+
+        print(f"Résumé: {os.path.join(output_root, 'summary.csv')}")
+        return 0
+    except KeyboardInterrupt:
+        print("Interrompu.", file=sys.stderr)
+        return 130
+    except Exception as e:
+        print(f"Erreur: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -3,24 +3,12 @@
 # Mettre à jour les données F1DB
 git submodule update --remote
 
-# Générer les classements
-cd src/scripts
+# Générer les classements (snapshot f1db, historique, qualifications,
+# deuxième pilote, ELO, ELO par âge, champions, manifeste des données) : les étapes indépendantes
+# tournent en parallèle et celles dont les entrées n'ont pas changé sont sautées.
+cd "$(dirname "$0")"
 echo "Génération des classements..."
-echo "+-------------------------------+"
-echo "|   Génération Historique       |"
-echo "+-------------------------------+"
-python3 generate_historique.py
-echo "+-------------------------------+"
-echo "|   Génération Qualifications   |"
-echo "+-------------------------------+"
-python3 generate_qualifications.py
-echo "+-----------------------------------------+"
-echo "| Génération Deuxième Pilote Par Course   |"
-echo "+-----------------------------------------+"
-python3 generate_deuxieme_pilote_par_course.py
-echo "+-------------------------------+"
-echo "|   Génération Deuxième Pilote  |"
-echo "+-------------------------------+"
-python3 generate_deuxieme_pilote.py
+python3 run_pipeline.py "$@" || exit 1
 
 echo "Tous les classements ont été mis à jour."
+echo "Pendant un week-end de course, python3 watch_f1db.py régénère au fil des mises à jour de f1db."
@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from typing import List, Optional
+
+import generate_champions_table
+import generate_deuxieme_pilote
+import generate_deuxieme_pilote_par_course
+import generate_elo_pilotes
+import generate_historique
+import generate_qualifications
+from elo.bundle import BUNDLE_FILENAME, EloHistoryBundle
+from elo.champions import champions_table, write_champions_csv
+from elo.checkpoints import (
+    EloCheckpoints,
+    default_checkpoint_path,
+    first_changed_race,
+    load_checkpoints,
+    race_key,
+    race_source_hash,
+    save_checkpoints,
+)
+from elo.data_manifest import write_data_manifest
+from elo.f1db_io import compute_source_hash, get_file_hash, iter_races
+from elo.output import OutputSink, take_output_stats
+from elo.snapshot import compile_snapshot, default_snapshot_path, load_snapshot, write_snapshot
+from elo.watch import AffectedOutputs, PollingWatcher, affected_outputs
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def config_path(name: str) -> str:
+    return os.path.join(SCRIPT_DIR, "config", name)
+
+
+class WatchSession:
+    """Everything the generators need, kept in memory between two updates.
+
+    The snapshot is refreshed by reparsing only the changed files; the ELO
+    checkpoints and history bundle of the last run let the next one resume
+    from the season of the first changed race without reading the previous
+    bundle back. Outputs and their .hash files are the same as a cold run,
+    which therefore finds them up to date.
+    """
+
+    def __init__(self, yaml_dir: str, docs_data_dir: str):
+        self.yaml_dir = yaml_dir
+        self.docs_data_dir = docs_data_dir
+        self.elo_dir = os.path.join(docs_data_dir, "elo")
+
+        self.snapshot = load_snapshot(yaml_dir)
+        self._load_names()
+        self.qualifications_config = generate_elo_pilotes.load_config(config_path("qualifications_points.json"))
+        self.deuxieme_pilote_config = generate_elo_pilotes.load_config(config_path("deuxieme_pilote_points.json"))
+        self.elo_config = generate_elo_pilotes.load_config(config_path("elo_pilotes.json"))
+        self.script_hashes = {
+            "qualifications": generate_qualifications.compute_script_hash(),
+            "deuxieme_pilote": generate_deuxieme_pilote.compute_script_hash(),
+            "deuxieme_pilote_par_course": get_file_hash(generate_deuxieme_pilote_par_course.__file__),
+            "historique": get_file_hash(generate_historique.__file__),
+            "elo_pilotes": get_file_hash(generate_elo_pilotes.__file__) or "",
+        }
+
+        self.elo_checkpoints: Optional[EloCheckpoints] = load_checkpoints(default_checkpoint_path(self.elo_dir))
+        self.elo_history: Optional[EloHistoryBundle] = None
+
+    def _load_names(self) -> None:
+        self.driver_id_to_name = self.snapshot.driver_names()
+        self.constructor_id_to_name = self.snapshot.constructor_names()
+
+    def everything(self) -> AffectedOutputs:
+        years = set(self.snapshot.years())
+        return AffectedOutputs(
+            qualifications=years, deuxieme_pilote=years, historique=True, elo=True, champions=True
+        )
+
+    def refresh_snapshot(self) -> bool:
+        snapshot, _ = compile_snapshot(self.yaml_dir, previous=self.snapshot)
+        if snapshot.source_hash == self.snapshot.source_hash:
+            return False
+        self.snapshot = snapshot
+        self._load_names()
+        return True
+
+    def save_snapshot(self) -> None:
+        # For the generators run outside the watch (run_pipeline.py).
+        write_snapshot(default_snapshot_path(self.yaml_dir), self.snapshot)
+
+    def regenerate(self, affected: AffectedOutputs) -> None:
+        snapshot = self.snapshot
+        years = set(snapshot.years())
+
+        if affected.qualifications & years:
+            generate_qualifications.generate_qualifications(
+                snapshot,
+                sorted(affected.qualifications & years),
+                self.qualifications_config,
+                self.driver_id_to_name,
+                self.docs_data_dir,
+                self.script_hashes["qualifications"],
+            )
+        for year in sorted(affected.deuxieme_pilote & years):
+            generate_deuxieme_pilote.generate_deuxieme_pilote_annuel(
+                snapshot,
+                year,
+                self.deuxieme_pilote_config,
+                self.constructor_id_to_name,
+                self.docs_data_dir,
+                self.script_hashes["deuxieme_pilote"],
+            )
+            generate_deuxieme_pilote_par_course.generate_deuxieme_pilote_par_course(
+                snapshot,
+                year,
+                self.deuxieme_pilote_config,
+                os.path.join(self.docs_data_dir, "deuxieme_pilote_par_course"),
+                self.script_hashes["deuxieme_pilote_par_course"],
+                self.constructor_id_to_name,
+                self.driver_id_to_name,
+            )
+        if affected.historique:
+            generate_historique.generate_historique_csv(
+                snapshot,
+                config_path("historique_points.json"),
+                os.path.join(self.docs_data_dir, "historique.csv"),
+                self.script_hashes["historique"],
+            )
+        if affected.elo:
+            self.regenerate_elo()
+        if affected.champions:
+            self.write_champions()
+        if affected:
+            # The pages version their data URLs with it.
+            write_data_manifest(self.docs_data_dir)
+
+    def regenerate_elo(self) -> bool:
+        snapshot = self.snapshot
+        config = self.elo_config
+        k = float(config.get("k", 24))
+        initial_elo = float(config.get("initial_elo", 1500))
+        scale = float(config.get("scale", 400))
+
+        years = generate_elo_pilotes.parse_years_arg(None, snapshot)
+        races = iter_races(snapshot, years)
+        params = generate_elo_pilotes.build_checkpoint_params(
+            snapshot=snapshot,
+            code_hash=generate_elo_pilotes.compute_code_hash(),
+            k=k,
+            initial_elo=initial_elo,
+            years=years,
+            scale=scale,
+        )
+        race_hashes = [(race_key(meta), race_source_hash(snapshot, meta)) for meta in races]
+
+        previous = self.elo_checkpoints
+        if (
+            self.elo_history is not None
+            and previous is not None
+            and previous.params == params
+            and len(previous.races) == len(race_hashes)
+            and first_changed_race(previous.races, race_hashes) == len(race_hashes)
+        ):
+            return False
+
+        resume = generate_elo_pilotes.find_resume_state(
+            previous,
+            params=params,
+            race_hashes=race_hashes,
+            drivers_out_dir=f"{self.elo_dir}/drivers",
+        )
+        history = EloHistoryBundle()
+        if resume is not None:
+            kept = (
+                self.elo_history.prefix(resume.race_count)
+                if self.elo_history is not None
+                else EloHistoryBundle.load_prefix(f"{self.elo_dir}/{BUNDLE_FILENAME}", resume.race_count)
+            )
+            if kept is None:
+                resume = None
+            else:
+                history = kept
+
+        with OutputSink(workers=int(config.get("output_threads", 8))) as sink:
+            checkpoints = generate_elo_pilotes.generate_all(
+                snapshot=snapshot,
+                races=races,
+                driver_id_to_name=self.driver_id_to_name,
+                constructor_id_to_name=self.constructor_id_to_name,
+                output_root=self.elo_dir,
+                k=k,
+                initial_elo=initial_elo,
+                engine=str(config.get("engine", "auto")),
+                params=params,
+                resume=resume,
+                stream_driver_csv=str(config.get("driver_csv", "stream")) == "stream",
+                max_open_files=int(config.get("max_open_driver_files", 64)),
+                history=history,
+                scale=scale,
+                sink=sink,
+            )
+        save_checkpoints(default_checkpoint_path(self.elo_dir), checkpoints)
+        generate_elo_pilotes.save_cache(
+            f"{self.elo_dir}/elo_pilotes.hash",
+            generate_elo_pilotes.build_cache_value(
+                source_hash=compute_source_hash(snapshot, races),
+                script_hash=self.script_hashes["elo_pilotes"],
+                k=k,
+                initial_elo=initial_elo,
+                years=years,
+                scale=scale,
+            ),
+        )
+        self.elo_checkpoints, self.elo_history = checkpoints, history
+        return True
+
+    def write_champions(self) -> None:
+        snapshot = self.snapshot
+        years = [int(year) for year in snapshot.years() if snapshot.race_dirs(year)]
+        seasons = generate_champions_table.collect_season_results(
+            snapshot,
+            years,
+            docs_data_dir=self.docs_data_dir,
+            qualifications_config=self.qualifications_config,
+            deuxieme_pilote_config=self.deuxieme_pilote_config,
+            driver_id_to_name=self.driver_id_to_name,
+            constructor_id_to_name=self.constructor_id_to_name,
+            elo_champions=generate_champions_table.load_elo_champions(self.elo_dir),
+        )
+        write_champions_csv(
+            os.path.join(self.docs_data_dir, "champions.csv"),
+            champions_table(
+                snapshot,
+                seasons,
+                driver_id_to_name=self.driver_id_to_name,
+                constructor_id_to_name=self.constructor_id_to_name,
+            ),
+        )
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Surveille f1db et régénère uniquement les sorties touchées par chaque "
+            "modification (qualifications et deuxième pilote de l'année, ELO à partir "
+            "de la course, champions), en gardant les données en mémoire."
+        )
+    )
+    parser.add_argument(
+        "--yaml-dir",
+        default="../../data/f1db/src/data",
+        help="Chemin vers f1db YAML (défaut: ../../data/f1db/src/data).",
+    )
+    parser.add_argument(
+        "--docs-data-dir",
+        default="../../docs/data",
+        help="Chemin vers docs/data (défaut: ../../docs/data).",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.3,
+        help="Intervalle de scrutation des fichiers, en secondes (défaut: 0.3).",
+    )
+    parser.add_argument(
+        "--settle",
+        type=float,
+        default=0.1,
+        help="Délai sans modification avant de régénérer, en secondes (défaut: 0.1).",
+    )
+
+    args = parser.parse_args(argv)
+    yaml_dir = generate_elo_pilotes.resolve_from_script_dir(args.yaml_dir)
+    docs_data_dir = generate_elo_pilotes.resolve_from_script_dir(args.docs_data_dir)
+    if not os.path.isdir(yaml_dir):
+        print(f"Dossier introuvable: {yaml_dir}", file=sys.stderr)
+        return 2
+
+    # Watcher first: a change made during the initial catch-up is not lost.
+    watcher = PollingWatcher(yaml_dir)
+    started = time.perf_counter()
+    session = WatchSession(yaml_dir, docs_data_dir)
+    session.regenerate(session.everything())
+    print(
+        f"Données à jour ({take_output_stats().summary()}, {time.perf_counter() - started:.2f}s). "
+        f"Surveillance de {yaml_dir} (Ctrl+C pour arrêter)."
+    )
+
+    retry: List[str] = []
+    try:
+        while True:
+            changed = sorted(set(retry) | set(watcher.wait_for_changes(interval=args.interval, settle=args.settle)))
+            started = time.perf_counter()
+            try:
+                if not session.refresh_snapshot() and not retry:
+                    continue  # touched but identical content
+                affected = affected_outputs(changed, session.snapshot.years())
+                session.regenerate(affected)
+            except Exception as e:
+                # Typically a file caught mid-write: retried with the next change.
+                retry = changed
+                print(f"Erreur: {e}", file=sys.stderr)
+                continue
+            retry = []
+            print(
+                f"{len(changed)} fichier(s) modifié(s) -> {affected.describe()} "
+                f"({take_output_stats().summary()}, {time.perf_counter() - started:.2f}s)"
+            )
+            session.save_snapshot()
+    except KeyboardInterrupt:
+        print("Surveillance arrêtée.")
+        return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))